@@ -22,6 +22,76 @@ class Settings(BaseSettings):
     DB_CONN_STR: str
     COLUMNS_TO_READ: List = columns_to_read
 
+    # shared API rate limit. backend is one of: local, file, redis
+    RATE_LIMIT_BACKEND: str = "file"
+    RATE_LIMIT_REDIS_URL: str = "redis://redis:6379/1"
+    RATE_LIMIT_LOCK_PATH: str = "/tmp/ctgov_rate_limiter"
+    RATE_LIMIT_BURST: int = 1
+    # a failed page is retried after an exponential backoff with full jitter, from
+    # RETRY_BACKOFF_SECONDS doubling up to RETRY_BACKOFF_MAX_SECONDS. Retry-After is honoured
+    RETRY_BACKOFF_SECONDS: float = 2.0
+    RETRY_BACKOFF_MAX_SECONDS: float = 60.0
+
+    # sharded extraction. shards start at each boundary date (YYYY-MM-DD);
+    # when no boundaries are set, yearly shards from EXTRACT_SHARD_START_YEAR are used
+    EXTRACT_SHARD_BOUNDARIES: List[str] = []
+    EXTRACT_SHARD_START_YEAR: int = 2016
+
+    # landing compaction. pages are rolled up into files of about LANDING_TARGET_FILE_MB
+    # (0 writes one file per page), with row groups of at least LANDING_ROW_GROUP_ROWS studies
+    LANDING_TARGET_FILE_MB: int = 128
+    LANDING_ROW_GROUP_ROWS: int = 10000
+    LANDING_COMPRESSION: str = "zstd"
+    LANDING_COMPRESSION_LEVEL: int = 3
+    LANDING_USE_DICTIONARY: bool = True
+    # landing files are streamed to S3 as multipart uploads
+    LANDING_UPLOAD_PART_MB: int = 16
+    LANDING_UPLOAD_MAX_IN_FLIGHT: int = 4
+
+    # extraction checkpoints. backend is one of: s3, local, variable. s3 has atomic
+    # compare-and-swap and TTL garbage collection; variable (Airflow Variables) is the legacy
+    # backend, kept as an opt-in, whose checkpoints are only cleared by the run's own cleanup.
+    # writes are coalesced to one every CHECKPOINT_FLUSH_PAGES saved pages or
+    # CHECKPOINT_FLUSH_SECONDS
+    CHECKPOINT_BACKEND: str = "s3"
+    CHECKPOINT_S3_PREFIX: str = "checkpoints/"
+    CHECKPOINT_LOCAL_DIR: str = "/tmp/ctgov_checkpoints"
+    CHECKPOINT_FLUSH_PAGES: int = 10
+    CHECKPOINT_FLUSH_SECONDS: float = 60
+    CHECKPOINT_TTL_HOURS: int = 72
+
+    # rebuild extraction progress from landing files and their sidecars when a task is retried
+    EXTRACT_RESUME_FROM_STORAGE: bool = True
+    EXTRACT_RESUME_VERIFY_CHECKSUMS: bool = True
+
+    # processes transforming landing files in parallel. 0 uses every core, 1 runs serially
+    TRANSFORM_WORKERS: int = 0
+    # processes used to hash surrogate keys of large batches in the transform. 0 uses every core
+    TRANSFORM_KEY_WORKERS: int = 1
+    # surrogate keys are carried as 16-character hex strings or as int64 (BIGINT) values of
+    # the same hash. keys.keys_to_hex and keys.keys_to_int64 convert between the two
+    TRANSFORM_KEY_FORMAT: str = "hex"
+    # LRU memo of dimension keys shared across the files of a transform run (0 disables it).
+    # with a path, it is saved when the run is committed (Transformer.commit_run) and reloaded
+    # by the next one. pool workers send the keys they hash back to the run for saving
+    TRANSFORM_KEY_CACHE_SIZE: int = 500_000
+    TRANSFORM_KEY_CACHE_PATH: str = ""
+    # persistent index of the dimension keys emitted by every run (empty disables it). members
+    # in it are not emitted again. compact or rebuild it with key_index.py
+    TRANSFORM_KEY_INDEX_DIR: str = ""
+    # content hash of every study as of the last successful transform (empty disables it).
+    # unchanged studies are skipped and each run emits a study_changes change set
+    TRANSFORM_CHANGE_INDEX_DIR: str = ""
+    # landing files are transformed this many studies at a time
+    TRANSFORM_BATCH_ROWS: int = 5_000
+    # output tables are buffered as typed Arrow columns and flushed to the spill files once
+    # a table holds this many rows or megabytes
+    TRANSFORM_FLUSH_ROWS: int = 100_000
+    TRANSFORM_FLUSH_MB: int = 64
+    # directory of the spill files workers hand their output over in. they are as large as the
+    # run's output, so keep them on disk. empty uses the system temporary directory
+    TRANSFORM_SPILL_DIR: str = ""
+
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=False, extra="ignore"
     )
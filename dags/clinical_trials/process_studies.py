@@ -1,8 +1,12 @@
-from airflow.sdk import dag, task
+from typing import Dict, List
+
+from airflow.sdk import dag, task, Param
 from pendulum import datetime
 from airflow.providers.amazon.aws.hooks.s3 import S3Hook
 from airflow.sdk.definitions.context import get_current_context
+from include.etl.cleanup import CleanUp
 from include.etl.extraction.extraction import Extractor
+from include.etl.extraction.sharding import plan_shards, merge_shard_manifests
 
 
 @dag(
@@ -11,19 +15,67 @@ from include.etl.extraction.extraction import Extractor
     catchup=False,
     schedule=None,
     tags=["ctgov"],
+    params={
+        # full requests the whole catalogue. incremental is opt-in and pulls only studies
+        # updated since the last successful run's watermark (falling back to full without one)
+        "extraction_mode": Param("full", enum=["full", "incremental"]),
+        # warehouse requests only the fields the transformer reads. use full to archive
+        # complete study documents
+        "projection": Param("warehouse", enum=["warehouse", "full"]),
+    },
 )
 def process_ct_gov():
+    """
+    Extract ClinicalTrials.gov studies into S3 landing files.
+
+    A default-triggered run is a full extraction. Trigger with extraction_mode=incremental to
+    pull only studies updated since the last successful run. The run's checkpoints are cleared
+    by the last task, once the shard manifests are merged.
+    """
+
+    @task
+    def plan_extract_shards() -> List[Dict]:
+        context = get_current_context()
+
+        # a delta is small enough for a single chain, so incremental runs use one catch-all shard
+        if context["params"]["extraction_mode"] == "incremental":
+            return plan_shards(context["ds"], boundaries=[])
+        return plan_shards(context["ds"])
 
     @task
-    def extract():
+    def extract(shard: Dict):
         context = get_current_context()
         s3_hook = S3Hook(aws_conn_id="aws_airflow")
 
-        e = Extractor(context=context, s3_hook=s3_hook)
+        e = Extractor(
+            context=context,
+            s3_hook=s3_hook,
+            writer_workers=2,
+            shard=shard,
+            mode=context["params"]["extraction_mode"],
+            projection=context["params"]["projection"],
+        )
 
         return e.make_requests()
 
-    extract_task = extract()
+    @task
+    def merge_manifests(shard_results: List[Dict]):
+        context = get_current_context()
+        s3_hook = S3Hook(aws_conn_id="aws_airflow")
+
+        return merge_shard_manifests(context, s3_hook, shard_results)
+
+    @task
+    def clean_up(shards: List[Dict]):
+        context = get_current_context()
+        s3_hook = S3Hook(aws_conn_id="aws_airflow")
+
+        # clears this run's checkpoints and collects those of earlier runs past the TTL
+        return CleanUp(context, s3_hook=s3_hook).clear_all_checkpoints(shards=shards)
+
+    shards = plan_extract_shards()
+    extract_tasks = extract.expand(shard=shards)
+    merge_manifests(extract_tasks) >> clean_up(shards)
 
 
 process_ct_gov()
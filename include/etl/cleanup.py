@@ -1,48 +1,80 @@
 import logging
-from airflow.models.variable import Variable
+from typing import Dict, List
+
+from include.etl.extraction.checkpoint_store import build_checkpoint_store, checkpoint_key
+from config.env_config import config
 
 
 class CleanUp:
-    def __init__(self, context):
+    def __init__(self, context, s3_hook=None):
         self.context = context
         self.execution_date = self.context["ds"]
+        self.dag_id = self.context["dag"].dag_id
+        self.run_id = self.context["run_id"]
+        self.s3_hook = s3_hook
         self.log = logging.getLogger("airflow.task")
 
-    def clear_all_checkpoints(self):
+    def run_checkpoint_keys(self, shards: List[Dict] | None = None) -> List[str]:
+        """
+        Every checkpoint key a task of this DAG run can have written.
+
+        Args:
+            shards: Shards the run extracted (see plan_shards), None for an unsharded run
+
+        Returns:
+            List[str]: Keys for every task of the DAG, per shard when shards are given
         """
-        Clear all checkpoint variables for this DAG run after successful completion.
-        Must be the last task to run in the DAG.
+        shard_ids = [None] + [shard["shard_id"] for shard in shards or []]
+        return [
+            checkpoint_key(self.dag_id, self.run_id, task_id, shard_id)
+            for task_id in self.context["dag"].task_ids
+            for shard_id in shard_ids
+        ]
+
+    def clear_all_checkpoints(self, ttl_hours: int | None = None, shards: List[Dict] | None = None):
         """
-        dag = self.context["dag"]
+        Clear the checkpoints of this DAG run after successful completion, and garbage collect
+        checkpoints of earlier runs that are older than the TTL (runs that failed for good or
+        were never cleaned up). Must be the last task to run in the DAG.
 
-        task_ids = [task.task_id for task in dag.tasks]
+        Checkpoints of this run are matched on dag_id and run_id, so cleaning up one DAG never
+        touches the in-flight checkpoints of another DAG's run on the same logical date.
+        Backends that can list their keys find them through the checkpoint store. The variable
+        backend cannot, so the keys this run can have written are passed to it as well.
 
-        self.log.info(f"Starting checkpoint cleanup for {self.execution_date}...")
-        self.log.info(f"DAG has {len(task_ids)} tasks")
-        self.log.info(f"-------------")
+        Args:
+            ttl_hours: Maximum checkpoint age. Defaults to config.CHECKPOINT_TTL_HOURS
+            shards: Shards the run extracted (see plan_shards), None for an unsharded run
+        """
+        ttl_hours = config.CHECKPOINT_TTL_HOURS if ttl_hours is None else ttl_hours
+        store = build_checkpoint_store(
+            config.CHECKPOINT_BACKEND,
+            s3_hook=self.s3_hook,
+            bucket=config.CTGOV_BUCKET,
+            prefix=config.CHECKPOINT_S3_PREFIX,
+            directory=config.CHECKPOINT_LOCAL_DIR,
+        )
 
-        cleared_count = 0
-        not_found_count = 0
+        self.log.info(
+            f"Starting checkpoint cleanup for {self.dag_id} run {self.run_id} "
+            f"({config.CHECKPOINT_BACKEND} backend, TTL {ttl_hours}h)..."
+        )
 
-        for task_id in task_ids:
-            checkpoint_key = f"{task_id}_{self.execution_date}"
-            try:
-                Variable.delete(checkpoint_key)
-                self.log.info(f"Cleared checkpoint: {checkpoint_key}")
-                cleared_count += 1
-            except KeyError:
-                self.log.debug(f"No checkpoint for: {checkpoint_key}")
-                not_found_count += 1
-            except Exception as e:
-                self.log.error(f"Failed to clear {checkpoint_key}: {e}")
+        cleared = store.collect_garbage(
+            ttl_seconds=ttl_hours * 3600,
+            dag_id=self.dag_id,
+            run_id=self.run_id,
+            keys=self.run_checkpoint_keys(shards),
+        )
+        for key in cleared:
+            self.log.info(f"Cleared checkpoint: {key}")
 
-        self.log.info(f"total tasks: {len(task_ids)}")
-        self.log.info(f"Cleared: {cleared_count}")
-        self.log.info(f"Not found: {not_found_count}")
+        self.log.info(f"Cleared: {len(cleared)}")
 
         return {
             "execution_date": self.execution_date,
-            "total_tasks": len(task_ids),
-            "checkpoints_cleared": cleared_count,
-            "checkpoints_not_found": not_found_count,
+            "dag_id": self.dag_id,
+            "run_id": self.run_id,
+            "checkpoints_cleared": len(cleared),
+            "cleared_keys": cleared,
         }
@@ -0,0 +1,312 @@
+import abc
+import fcntl
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from airflow.models import Variable
+
+from include.monitoring.exceptions import CheckpointConflictError
+
+
+def checkpoint_key(dag_id: str, run_id: str, task_id: str, shard_id: str | None = None) -> str:
+    """Build the checkpoint key: {dag_id}_{run_id}_{task_id}[_{shard_id}]"""
+    key = f"{dag_id}_{run_id}_{task_id}"
+    return f"{key}_{shard_id}" if shard_id else key
+
+
+class CheckpointStore(abc.ABC):
+    """
+    Versioned key-value store for extraction checkpoints.
+
+    Each key holds a record:
+
+        {"checkpoint": {...}, "version": int, "updated_at": float, "dag_id": str, "run_id": str, ...}
+
+    Writes are compare-and-swap on the version: write only succeeds if the stored version is
+    still the one the writer expects, and bumps it by one. A missing key has version 0.
+    Metadata other than "checkpoint" is used by collect_garbage.
+
+    Subclasses implement read, write, delete and keys.
+    """
+
+    def __init__(self):
+        self.log = logging.getLogger("airflow.task")
+
+    @abc.abstractmethod
+    def read(self, key: str) -> Tuple[Dict | None, int]:
+        """
+        Returns:
+            Tuple of (record or None, version)
+        """
+
+    @abc.abstractmethod
+    def write(self, key: str, record: Dict, expected_version: int) -> int:
+        """
+        Atomically replace the record if its version is still expected_version.
+
+        Returns:
+            int: The new version
+
+        Raises:
+            CheckpointConflictError: When the stored version differs
+        """
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abc.abstractmethod
+    def keys(self) -> List[str]:
+        """Every key the backend can list."""
+
+    def records(self, keys: Iterable[str] = ()) -> Iterator[Tuple[str, Dict]]:
+        for key in sorted(set(self.keys()).union(keys)):
+            record, _ = self.read(key)
+            if record is not None:
+                yield key, record
+
+    def collect_garbage(
+        self,
+        ttl_seconds: float,
+        dag_id: str | None = None,
+        run_id: str | None = None,
+        keys: Iterable[str] = (),
+        now: float | None = None,
+    ) -> List[str]:
+        """
+        Delete checkpoints older than the TTL, and every checkpoint of the DAG run
+        dag_id/run_id. Runs are matched on both ids: DAGs share the store, and their runs can
+        share a logical date.
+
+        Args:
+            ttl_seconds: Maximum age since the last write
+            dag_id: DAG of the run whose checkpoints are no longer needed, regardless of age
+            run_id: Run whose checkpoints are no longer needed, regardless of age
+            keys: Keys to check besides the ones the backend lists, for backends that
+                cannot list their keys
+            now: Current epoch time (defaults to time.time())
+
+        Returns:
+            List[str]: Deleted keys
+        """
+        now = time.time() if now is None else now
+        deleted = []
+        for key, record in list(self.records(keys)):
+            expired = now - record.get("updated_at", 0) > ttl_seconds
+            finished = (
+                dag_id is not None
+                and record.get("dag_id") == dag_id
+                and record.get("run_id") == run_id
+            )
+            if expired or finished:
+                self.delete(key)
+                deleted.append(key)
+        return deleted
+
+    def _parse(self, raw: str) -> Dict:
+        try:
+            record = json.loads(raw)
+        except json.JSONDecodeError as e:
+            self.log.error(f"Failed to parse checkpoint JSON: {e}\nJSON DATA\n\n{raw}")
+            # treated as an empty checkpoint that the next write may replace
+            return {"checkpoint": None, "version": 0, "updated_at": 0}
+
+        if "checkpoint" not in record:
+            # checkpoint written before versioning, as a bare Variable value
+            record = {"checkpoint": record, "version": 0, "updated_at": 0}
+        return record
+
+
+class VariableCheckpointStore(CheckpointStore):
+    """
+    Checkpoints stored as Airflow Variables, one per checkpoint key. Legacy backend, only used
+    when CHECKPOINT_BACKEND is set to variable.
+
+    Variables cannot be listed from a task, and there is no shared index of keys: every
+    writer would read-modify-write it, and concurrent shard tasks would drop each other's
+    entries. keys() is therefore empty and collect_garbage only sees the keys it is given,
+    which CleanUp derives from the run. Checkpoints of runs that never reach CleanUp are not
+    collected by TTL; use the s3 or local backend where that matters.
+
+    The Variable API has no conditional update, so the compare-and-swap is a read followed by
+    a write. It catches a stale attempt overwriting a newer one, but two writers racing within
+    that window are not detected. Only attempts of the same task write the same key.
+    """
+
+    def read(self, key: str) -> Tuple[Dict | None, int]:
+        try:
+            record = self._parse(Variable.get(key))
+        except KeyError:
+            return None, 0
+        return record, record["version"]
+
+    def write(self, key: str, record: Dict, expected_version: int) -> int:
+        _, current_version = self.read(key)
+        if current_version != expected_version:
+            raise CheckpointConflictError(key, expected_version, current_version)
+
+        record = {**record, "version": expected_version + 1}
+        Variable.set(key, json.dumps(record))
+        return record["version"]
+
+    def delete(self, key: str) -> None:
+        try:
+            Variable.delete(key)
+        except KeyError:
+            pass
+
+    def keys(self) -> List[str]:
+        return []
+
+
+class S3CheckpointStore(CheckpointStore):
+    """
+    Checkpoints stored as JSON objects under {prefix}{key}.json.
+
+    Compare-and-swap uses S3 conditional writes: the object is replaced with If-Match on the
+    ETag that was read (or If-None-Match for a new key), so a concurrent writer between the
+    read and the write makes the write fail instead of being lost.
+    """
+
+    def __init__(self, s3_hook, bucket: str, prefix: str = "checkpoints/"):
+        super().__init__()
+        self.client = s3_hook.get_conn()
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}.json"
+
+    def _get(self, key: str) -> Tuple[Dict | None, str | None]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self.client.exceptions.NoSuchKey:
+            return None, None
+        return self._parse(response["Body"].read().decode()), response["ETag"]
+
+    def read(self, key: str) -> Tuple[Dict | None, int]:
+        record, _ = self._get(key)
+        return record, record["version"] if record else 0
+
+    def write(self, key: str, record: Dict, expected_version: int) -> int:
+        current, etag = self._get(key)
+        current_version = current["version"] if current else 0
+        if current_version != expected_version:
+            raise CheckpointConflictError(key, expected_version, current_version)
+
+        record = {**record, "version": expected_version + 1}
+        condition = {"IfMatch": etag} if etag else {"IfNoneMatch": "*"}
+        try:
+            self.client.put_object(
+                Bucket=self.bucket,
+                Key=self._object_key(key),
+                Body=json.dumps(record).encode(),
+                ContentType="application/json",
+                **condition,
+            )
+        except self.client.exceptions.ClientError as e:
+            status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            if status in (409, 412):
+                raise CheckpointConflictError(key, expected_version, self.read(key)[1]) from e
+            raise
+        return record["version"]
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def keys(self) -> List[str]:
+        keys = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                keys.append(obj["Key"][len(self.prefix) : -len(".json")])
+        return keys
+
+
+class LocalCheckpointStore(CheckpointStore):
+    """
+    Checkpoints stored as JSON files in a local directory, for tests and local runs.
+
+    Writes hold an exclusive flock on a per-key lock file and replace the data file
+    atomically, so the compare-and-swap is safe across processes on one host.
+    """
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def read(self, key: str) -> Tuple[Dict | None, int]:
+        try:
+            with open(self._path(key)) as f:
+                record = self._parse(f.read())
+        except FileNotFoundError:
+            return None, 0
+        return record, record["version"]
+
+    def write(self, key: str, record: Dict, expected_version: int) -> int:
+        with open(f"{self._path(key)}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                _, current_version = self.read(key)
+                if current_version != expected_version:
+                    raise CheckpointConflictError(key, expected_version, current_version)
+
+                record = {**record, "version": expected_version + 1}
+                tmp_path = f"{self._path(key)}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(record, f)
+                os.replace(tmp_path, self._path(key))
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return record["version"]
+
+    def delete(self, key: str) -> None:
+        for path in (self._path(key), f"{self._path(key)}.lock"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def keys(self) -> List[str]:
+        return [
+            name[: -len(".json")]
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        ]
+
+
+def build_checkpoint_store(
+    backend: str,
+    s3_hook=None,
+    bucket: str | None = None,
+    prefix: str = "checkpoints/",
+    directory: str | None = None,
+) -> CheckpointStore:
+    """
+    Build a checkpoint store for the configured backend.
+
+    Args:
+        backend: One of "s3", "local" or "variable" (legacy)
+        s3_hook: S3 connection hook for the s3 backend
+        bucket: Bucket for the s3 backend
+        prefix: Key prefix for the s3 backend
+        directory: Directory for the local backend
+
+    Returns:
+        CheckpointStore
+    """
+    if backend == "variable":
+        return VariableCheckpointStore()
+    if backend == "s3":
+        return S3CheckpointStore(s3_hook, bucket, prefix)
+    if backend == "local":
+        return LocalCheckpointStore(directory)
+
+    raise ValueError(f"Unknown checkpoint backend: {backend}")
@@ -0,0 +1,351 @@
+import json
+import logging
+import threading
+from typing import Dict, List, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from include.etl.extraction.landing import (
+    LANDING_SCHEMA,
+    LANDING_SCHEMA_FINGERPRINT,
+    LANDING_SCHEMA_VERSION,
+    STAT_FIELDS,
+)
+from include.etl.extraction.s3_stream import S3MultipartWriter
+
+
+def column_stats(batch: pa.RecordBatch) -> Dict[str, Dict]:
+    """Min and max of each STAT_FIELDS field in an encoded page, None when all null."""
+    stats = {}
+    for name, path in STAT_FIELDS.items():
+        min_max = pc.min_max(pc.struct_field(batch.column("studies"), path))
+        stats[name] = {"min": min_max["min"].as_py(), "max": min_max["max"].as_py()}
+    return stats
+
+
+def _merge_stats(pages: List[Dict]) -> Dict[str, Dict]:
+    stats = {}
+    for name in STAT_FIELDS:
+        mins = [p[name]["min"] for p in pages if p[name]["min"] is not None]
+        maxes = [p[name]["max"] for p in pages if p[name]["max"] is not None]
+        stats[name] = {"min": min(mins, default=None), "max": max(maxes, default=None)}
+    return stats
+
+
+def sidecar_key(file_key: str) -> str:
+    """{prefix}/pages-000001.parquet -> {prefix}/_landing/pages-000001.parquet.json"""
+    prefix, _, name = file_key.rpartition("/")
+    return f"{prefix}/_landing/{name}.json"
+
+
+class LandingFileWriter:
+    """
+    Rolls landing pages up into large Parquet files instead of one small object per page.
+
+    Pages are appended in page order. Batches are buffered until row_group_rows rows are
+    waiting and then written as one row group, so a row group never splits a page. Row groups
+    are streamed straight into a multipart upload of {prefix}/pages-{first:06d}.parquet as
+    they are encoded (see S3MultipartWriter), and once the file reaches target_file_bytes its
+    footer is written and the upload completed.
+
+    A page only counts as saved once the upload of the file holding it completes and its
+    sidecar has been written. If an upload fails, the file is aborted and the writer stops
+    accepting pages.
+
+    File entries carry the statistics readers need to plan work without opening the file:
+    byte size, SHA-256, schema fingerprint, row and row group counts, min/max NCT ID and last
+    update date (also per page), and the page and token range.
+
+    Sidecars: every file gets a JSON sidecar at sidecar_key(file) holding its entry plus the API request and schema version it was written
+    with. They live under {prefix}/_landing/, which Parquet dataset readers skip, and let
+    reconcile_landing rebuild extraction progress from storage alone. add and flush return
+    the page entries that became durable so the caller can advance its checkpoint over them;
+    pages still buffered are simply fetched again after a retry. Each page entry records
+    where the page landed:
+
+        {"page", "page_token", "next_page_token", "file", "row_group", "row_offset", "rows"}
+
+    Writer threads may hand pages over out of order. Pages ahead of the next expected page
+    wait in a reorder buffer until the gap is filled. Only the buffer is shared under a lock:
+    the thread that hands over the next expected page writes it and every page behind it,
+    encoding and uploading outside that lock, while other threads leave their page in the
+    buffer and return at once to fetch and encode the next one.
+
+    The token a page was fetched with is the next token of the page before it, so callers
+    only pass the token a page returned. The first page takes its token from the checkpoint.
+
+    Attributes:
+        s3_hook: S3 connection hook used for uploads
+        bucket (str): Destination bucket
+        prefix (str): S3 prefix files are written under
+        target_file_bytes (int): Encoded size at which a file is closed (0 closes after every page)
+        row_group_rows (int): Minimum rows per row group
+        compression (str): Parquet compression codec
+        compression_level (int|None): Codec level
+        use_dictionary (bool): Dictionary encode columns
+        part_size (int): Bytes per multipart upload part
+        max_in_flight_parts (int): Maximum parts uploading concurrently
+        files (List[Dict]): Files uploaded so far, including those restored from a checkpoint
+    """
+
+    def __init__(
+        self,
+        s3_hook,
+        bucket: str,
+        prefix: str,
+        next_page: int,
+        page_token: str | None,
+        target_file_bytes: int = 128 * 1024 * 1024,
+        row_group_rows: int = 10000,
+        compression: str = "zstd",
+        compression_level: int | None = 3,
+        use_dictionary: bool = True,
+        part_size: int = 16 * 1024 * 1024,
+        max_in_flight_parts: int = 4,
+        files: List[Dict] | None = None,
+        request: Dict | None = None,
+    ):
+        """
+        Args:
+            next_page (int): First page this writer will receive
+            page_token (str|None): Token that page is fetched with
+            files (List[Dict]|None): Files saved by earlier attempts, from the checkpoint
+            request (Dict|None): API query the pages were fetched with, recorded in sidecars
+        """
+        self.s3_hook = s3_hook
+        self.bucket = bucket
+        self.prefix = prefix
+        self.target_file_bytes = target_file_bytes
+        self.row_group_rows = row_group_rows
+        self.compression = compression
+        self.compression_level = compression_level
+        self.use_dictionary = use_dictionary
+        self.part_size = part_size
+        self.max_in_flight_parts = max_in_flight_parts
+        self.files: List[Dict] = list(files or [])
+        self.request = request or {}
+        self.log = logging.getLogger("airflow.task")
+
+        # guards the reorder buffer and page sequence, never held while encoding or uploading
+        self._lock = threading.Lock()
+        # held by the one thread writing pages to the file in progress
+        self._file_lock = threading.Lock()
+        self._draining = False
+        self._next_page = next_page
+        self._page_token = page_token
+        self._waiting: Dict[int, Tuple[pa.RecordBatch, str | None, Dict]] = {}
+        # set once a file has been discarded. later pages would leave a gap, so none are accepted
+        self._discarded = False
+
+        self._sink: S3MultipartWriter | None = None
+        self._writer: pq.ParquetWriter | None = None
+        self._file_pages: List[Dict] = []
+        self._row_group_batches: List[pa.RecordBatch] = []
+        self._row_group_rows = 0
+        self._row_groups = 0
+
+    def add(
+        self, page_number: int, batch: pa.RecordBatch, next_page_token: str | None
+    ) -> List[Dict]:
+        """
+        Append an encoded page.
+
+        Args:
+            page_number (int): Page the batch was encoded from
+            batch (pa.RecordBatch): Page encoded with LANDING_SCHEMA
+            next_page_token (str|None): Token returned by the page
+
+        Returns:
+            List[Dict]: Entries of pages that became durable, in page order. They can include
+            pages handed over by other threads while this one was writing
+        """
+        stats = column_stats(batch)
+        with self._lock:
+            if self._discarded:
+                raise RuntimeError(
+                    f"Landing writer stopped after a failed upload, page {page_number} not saved"
+                )
+            self._waiting[page_number] = (batch, next_page_token, stats)
+            if self._draining:
+                # the thread writing picks the page up once it reaches it
+                return []
+            self._draining = True
+
+        saved = []
+        try:
+            with self._file_lock:
+                while True:
+                    with self._lock:
+                        ready = self._take_ready()
+                        if not ready:
+                            self._draining = False
+                            return saved
+                    for page in ready:
+                        saved.extend(self._append(*page))
+        except BaseException:
+            with self._lock:
+                self._draining = False
+            raise
+
+    def flush(self) -> List[Dict]:
+        """
+        Upload the file in progress, even if it is below the target size.
+
+        Pages waiting in the reorder buffer are not contiguous with what has been written and
+        are left out.
+
+        Returns:
+            List[Dict]: Entries of pages that became durable
+        """
+        with self._file_lock:
+            if self._discarded:
+                return []
+            return self._close_file()
+
+    def _take_ready(self) -> List[Tuple]:
+        """Pop the pages that continue the sequence. Called with self._lock held."""
+        ready = []
+        while self._next_page in self._waiting:
+            ready.append((self._next_page, *self._waiting.pop(self._next_page)))
+            self._next_page += 1
+        return ready
+
+    def _append(
+        self, page_number: int, batch: pa.RecordBatch, next_page_token: str | None, stats: Dict
+    ) -> List[Dict]:
+        self._file_pages.append(
+            {
+                "page": page_number,
+                "page_token": self._page_token,
+                "next_page_token": next_page_token,
+                "row_group": self._row_groups,
+                "row_offset": self._row_group_rows,
+                "rows": batch.num_rows,
+                **stats,
+            }
+        )
+        self._page_token = next_page_token
+        self._row_group_batches.append(batch)
+        self._row_group_rows += batch.num_rows
+
+        if self._row_group_rows >= self.row_group_rows:
+            self._write_row_group()
+
+        if self.target_file_bytes <= 0 or self._encoded_bytes() >= self.target_file_bytes:
+            return self._close_file()
+        return []
+
+    def _encoded_bytes(self) -> int:
+        # row groups are only encoded when written, so the open row group is not counted
+        return self._sink.tell() if self._sink else 0
+
+    def _write_row_group(self) -> None:
+        if not self._row_group_batches:
+            return
+
+        if self._writer is None:
+            key = f"{self.prefix}/pages-{self._file_pages[0]['page']:06d}.parquet"
+            self._sink = S3MultipartWriter(
+                self.s3_hook.get_conn(),
+                self.bucket,
+                key,
+                part_size=self.part_size,
+                max_in_flight=self.max_in_flight_parts,
+            )
+            self._writer = pq.ParquetWriter(
+                self._sink,
+                LANDING_SCHEMA,
+                compression=self.compression,
+                compression_level=self.compression_level,
+                use_dictionary=self.use_dictionary,
+            )
+
+        table = pa.Table.from_batches(self._row_group_batches, schema=LANDING_SCHEMA)
+        try:
+            self._writer.write_table(table, row_group_size=max(table.num_rows, 1))
+        except Exception:
+            self._discard_file()
+            raise
+
+        self._row_group_batches = []
+        self._row_group_rows = 0
+        self._row_groups += 1
+
+    def _close_file(self) -> List[Dict]:
+        if not self._file_pages:
+            return []
+
+        self._write_row_group()
+        try:
+            self._writer.close()
+            self._sink.close()
+        except Exception:
+            self._discard_file()
+            raise
+
+        key = self._sink.key
+        first, last = self._file_pages[0]["page"], self._file_pages[-1]["page"]
+        file_entry = {
+            "key": key,
+            "first_page": first,
+            "last_page": last,
+            "rows": sum(p["rows"] for p in self._file_pages),
+            "row_groups": self._row_groups,
+            "bytes": self._sink.stats["bytes"],
+            "sha256": self._sink.stats["sha256"],
+            "schema_fingerprint": LANDING_SCHEMA_FINGERPRINT,
+            **_merge_stats(self._file_pages),
+            "tokens": {
+                "first": self._file_pages[0]["page_token"],
+                "last": self._file_pages[-1]["next_page_token"],
+            },
+            "upload": self._sink.stats,
+            "pages": [{**p, "file": key} for p in self._file_pages],
+        }
+
+        sidecar = {
+            **file_entry,
+            "request": self.request,
+            "schema_version": LANDING_SCHEMA_VERSION,
+        }
+        try:
+            self.s3_hook.load_string(
+                string_data=json.dumps(sidecar),
+                key=sidecar_key(key),
+                bucket_name=self.bucket,
+                replace=True,
+            )
+        except Exception:
+            self._discard_file()
+            raise
+
+        self.files.append(file_entry)
+        self.log.info(
+            f"Saved pages {first}-{last} ({file_entry['rows']} rows, {self._row_groups} row groups, "
+            f"{file_entry['bytes']} bytes) at s3://{self.bucket}/{key}"
+        )
+
+        self._reset_file()
+        return file_entry["pages"]
+
+    def _discard_file(self) -> None:
+        """Abort the upload in progress. Its pages were never saved and are fetched again."""
+        if self._sink is not None:
+            self._sink.abort()
+        self.log.warning(
+            f"Discarded landing file starting at page {self._file_pages[0]['page']} "
+            f"({len(self._file_pages)} pages)"
+        )
+        self._reset_file()
+        with self._lock:
+            self._discarded = True
+
+    def _reset_file(self) -> None:
+        self._sink = None
+        self._writer = None
+        self._file_pages = []
+        self._row_group_batches = []
+        self._row_group_rows = 0
+        self._row_groups = 0
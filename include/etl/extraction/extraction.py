@@ -1,53 +1,145 @@
 import requests
+import hashlib
 import logging
-import io
-import pyarrow as pa
-import pyarrow.parquet as pq
-from datetime import datetime
-import pandas as pd
-from typing import Dict
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 import json
 import time
+import queue
+import threading
 
 from airflow.models import Variable
 from airflow.utils.context import Context
 
-from include.monitoring.exceptions import RequestExhaustionError
+from include.etl.extraction.checkpoint_store import (
+    CheckpointStore,
+    build_checkpoint_store,
+    checkpoint_key,
+)
+from include.etl.extraction.compaction import LandingFileWriter
+from include.etl.extraction.http_client import CTGovClient
+from include.etl.extraction.landing import (
+    LANDING_SCHEMA_FINGERPRINT,
+    LANDING_SCHEMA_VERSION,
+    LandingEncoder,
+)
+from include.etl.extraction.projection import PROJECTIONS, build_fields_projection
+from include.etl.extraction.reconcile import reconcile_landing
+from include.etl.extraction.rate_limiter import build_rate_limiter
+from include.monitoring.exceptions import CheckpointConflictError, RequestExhaustionError
 from config.env_config import config
 
 
+WATERMARK_KEY = "ctgov_last_update_watermark"
+# v2 lists every landing file with its size, checksum, schema fingerprint, row counts,
+# min/max NCT ID and last update date, and page/token range
+MANIFEST_VERSION = 2
+
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP date), None if absent."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
 class StateHandler:
     """
     Manages extraction state persistence and recovery for clinical trials data extraction.
 
-    This stateless utility class handles checkpoint operations using Airflow Variables,
-    enabling extraction jobs to resume from their last successful point after failures or retries.
-    State is stored per task_id and execution_date combination, ensuring isolation between
-    different DAG runs.
+    This class handles checkpoint operations against a pluggable CheckpointStore
+    (config.CHECKPOINT_BACKEND: S3 objects, local files or, legacy, Airflow Variables), enabling
+    extraction jobs to resume from their last successful point after failures or retries.
+    State is stored per dag_id, run_id and task_id combination, ensuring isolation between
+    different DAG runs, including runs of different DAGs on the same logical date. Sharded extraction adds the shard id to the key so that mapped task
+    instances (which share a task_id) keep separate checkpoints.
 
     The state includes:
     - last_saved_page: The page number that was successfully saved
     - last_saved_token: The pagination token for the next page
     - next_page_url: The constructed URL for the next API request
     - previous_token: The token used for the current page (for verification)
+    - landing_files: Landing files uploaded so far, with the pages each one holds
+
+    Write coalescing: record_progress is called as pages are saved but only writes to the
+    store every config.CHECKPOINT_FLUSH_PAGES pages or config.CHECKPOINT_FLUSH_SECONDS
+    seconds. save_checkpoint always writes, and is used on failure and completion.
+
+    Compare-and-swap: every write expects the version this handler last read or wrote. If
+    another attempt of the same task wrote in between, the write is retried on top of it when
+    that attempt is older, and fails with CheckpointConflictError when it is newer, so a stale
+    attempt can never roll a retry's progress back.
 
     Attributes:
         context (Context): Airflow task context containing execution metadata
         execution_date (str): The logical date of the DAG run (format: YYYY-MM-DD)
+        shard_id (str|None): Shard this state belongs to, None for unsharded extraction
+        store (CheckpointStore): Backend checkpoints are persisted to
+        flush_pages (int): Saved pages between coalesced checkpoint writes
+        flush_seconds (float): Seconds between coalesced checkpoint writes
         log (logging.Logger): Airflow task logger for tracking state operations
     """
 
-    def __init__(self, context: Context):
+    def __init__(
+        self,
+        context: Context,
+        shard_id: str | None = None,
+        s3_hook=None,
+        store: CheckpointStore | None = None,
+    ):
         """
         Initialize the StateHandler with Airflow task context.
         Args:
             context (Context): Airflow task context containing execution metadata,
             task instance, and other runtime information
+            shard_id (str|None): Shard this state belongs to, None for unsharded extraction
+            s3_hook: S3 connection hook, required by the s3 checkpoint backend
+            store (CheckpointStore|None): Checkpoint backend. Built from config when not given
         """
         self.context = context
         self.execution_date = self.context.get("ds")
+        self.shard_id = shard_id
         self.log = logging.getLogger("airflow.task")
 
+        self.store = store or build_checkpoint_store(
+            config.CHECKPOINT_BACKEND,
+            s3_hook=s3_hook,
+            bucket=config.CTGOV_BUCKET,
+            prefix=config.CHECKPOINT_S3_PREFIX,
+            directory=config.CHECKPOINT_LOCAL_DIR,
+        )
+        self.flush_pages = config.CHECKPOINT_FLUSH_PAGES
+        self.flush_seconds = config.CHECKPOINT_FLUSH_SECONDS
+
+        self._version: int | None = None
+        self._pending: Dict | None = None
+        self._flushed_page = 0
+        self._flushed_at = time.monotonic()
+
+    def checkpoint_key(self, task_id: str) -> str:
+        """Build the checkpoint key: {dag_id}_{run_id}_{task_id}[_{shard_id}]"""
+        return checkpoint_key(
+            self.context["dag"].dag_id, self.context["run_id"], task_id, self.shard_id
+        )
+
+    def is_retry(self) -> bool:
+        """Whether this attempt is a retry, the only case in which earlier progress is resumed."""
+        ti = self.context.get("task_instance")
+        return ti is not None and ti.try_number > 1
+
     def determine_state(self) -> Dict:
         """
         Determine the starting point for data extraction by checking for saved checkpoints.
@@ -57,7 +149,10 @@ class StateHandler:
         - On retry attempts: Attempts to load checkpoint from previous run
         - On checkpoint errors: Falls back to default state with appropriate logging
 
-        The checkpoint key is constructed as: {task_id}_{execution_date}
+        The checkpoint key is constructed as: {dag_id}_{run_id}_{task_id}[_{shard_id}]
+
+        The checkpoint version is read on every attempt, including first runs, so that later
+        writes can be compare-and-swapped against it.
 
         Returns:
             Dict: State dictionary containing:
@@ -65,11 +160,12 @@ class StateHandler:
                 - last_saved_token (str|None): Pagination token for next page
                 - next_page_url (str): Full URL for next API request
                 - previous_token (str|None): Token from previous page (for verification)
+                - landing_files (List[Dict]): Landing files uploaded by earlier attempts
 
         Note:
             - Handles missing checkpoints by starting fresh
             - Logs checkpoint loading failures for debugging
-            - JSON parsing errors are caught and logged with full JSON data
+            - Unreadable checkpoints are logged and replaced on the next write
         """
 
         self.log.info("Determining starting point for extractor...")
@@ -78,6 +174,7 @@ class StateHandler:
             "last_saved_token": None,
             "next_page_url": config.FIRST_PAGE_URL,
             "previous_token": None,
+            "landing_files": [],
         }
 
         ti = self.context.get("task_instance")
@@ -85,63 +182,85 @@ class StateHandler:
             self.log.warning("No task instance found in context, starting fresh")
             return default_state
 
-        self.log.info(f"Current try_number: {ti.try_number}")
-        if ti.try_number == 1:
-            self.log.info("First run. Starting fresh extraction")
-            return default_state
-
-        checkpoint_key = f"{ti.task_id}_{self.execution_date}"
+        checkpoint_key = self.checkpoint_key(ti.task_id)
 
         try:
-            checkpoint_json = Variable.get(checkpoint_key)
-            checkpoint = json.loads(checkpoint_json)
-            last_saved_page = checkpoint.get("last_saved_page")
-            last_saved_token = checkpoint.get("last_saved_token")
-
+            record, self._version = self.store.read(checkpoint_key)
+        except Exception as e:
             self.log.info(
-                f"Checkpoint loaded - Key: {checkpoint_key}, Page: {last_saved_page}, Token: {last_saved_token}"
+                f"ERROR finding checkpoint for key: {checkpoint_key} \n Error: {e}"
             )
-            self.log.info(f"Resuming from page {last_saved_page + 1}")
+            self.log.info(f"Defaulting to 0")
+            return default_state
 
-            return {
-                "last_saved_page": last_saved_page,
-                "last_saved_token": last_saved_token,
-                "next_page_url": f"{config.BASE_URL}{last_saved_token}",
-            }
-        except KeyError:
+        self.log.info(f"Current try_number: {ti.try_number}")
+        if ti.try_number == 1:
+            self.log.info("First run. Starting fresh extraction")
+            return default_state
+
+        if record is None or record["checkpoint"] is None:
             self.log.info(f"No checkpoint found for key: {checkpoint_key}")
             self.log.info(f"  Starting fresh from page 0")
             return default_state
 
-        except json.JSONDecodeError as e:
-            self.log.error(
-                f"Failed to parse checkpoint JSON: {e}\n"
-                f"JSON DATA\n\n"
-                f"{checkpoint_json}"
-            )
+        checkpoint = record["checkpoint"]
+        last_saved_page = checkpoint.get("last_saved_page")
+        last_saved_token = checkpoint.get("last_saved_token")
 
-            self.log.info(f"Starting fresh from page 0")
-            return default_state
+        self.log.info(
+            f"Checkpoint loaded - Key: {checkpoint_key}, Version: {self._version}, Page: {last_saved_page}, Token: {last_saved_token}"
+        )
+        self.log.info(f"Resuming from page {last_saved_page + 1}")
+        self._flushed_page = last_saved_page
 
-        except Exception as e:
-            self.log.info(
-                f"ERROR finding checkpoint for key: {checkpoint_key} \n Error: {e}"
-            )
-            self.log.info(f"Defaulting to 0")
-            return default_state
+        return {
+            "last_saved_page": last_saved_page,
+            "last_saved_token": last_saved_token,
+            "next_page_url": f"{config.BASE_URL}{last_saved_token}",
+            "previous_token": checkpoint.get("previous_token"),
+            "landing_files": checkpoint.get("landing_files", []),
+        }
+
+    def record_progress(
+        self,
+        previous_token: str,
+        last_saved_page: int,
+        last_saved_token: str,
+        landing_files: List[Dict] | None = None,
+    ) -> None:
+        """
+        Note extraction progress and write a checkpoint once enough has accumulated.
+
+        Takes the same arguments as save_checkpoint. The checkpoint is written when
+        flush_pages pages have been saved or flush_seconds have passed since the last write;
+        otherwise it is held until the next call or save_checkpoint.
+        """
+        self._pending = self._checkpoint_value(
+            previous_token, last_saved_page, last_saved_token, landing_files
+        )
+
+        due = (
+            last_saved_page - self._flushed_page >= self.flush_pages
+            or time.monotonic() - self._flushed_at >= self.flush_seconds
+        )
+        if due:
+            self.flush()
 
     def save_checkpoint(
-        self, previous_token: str, last_saved_page: int, last_saved_token: str
+        self,
+        previous_token: str,
+        last_saved_page: int,
+        last_saved_token: str,
+        landing_files: List[Dict] | None = None,
     ) -> None:
         """
-        Persist current extraction state to Airflow Variables for retry recovery.
+        Persist current extraction state to the checkpoint store for retry recovery.
 
         Saves a checkpoint that allows the extraction process to resume from its current
-        position if the task fails or is retried. The checkpoint is stored as a JSON string
-        in an Airflow Variable, using a composite key of task_id and execution_date.
+        position if the task fails or is retried, bypassing write coalescing.
 
-        This method overwrites any previous checkpoint for the same task_id + execution_date
-        combination, ensuring only the most recent state is preserved, and the Metadata db is not bloated
+        This method overwrites any previous checkpoint for the same dag run + task_id
+        combination, ensuring only the most recent state is preserved
 
         Args:
             previous_token (str): The pagination token that was used for the current page.
@@ -150,35 +269,126 @@ class StateHandler:
                                  Next extraction will start from last_saved_page + 1.
             last_saved_token (str): The pagination token for the next page to be fetched.
                                   Used to construct the next_page_url.
+            landing_files (List[Dict]|None): Landing files uploaded so far. Carried across
+                                  attempts so the manifest can map every page to its file.
 
         Returns:
             None
 
         Side Effects:
-            - Creates or updates an Airflow Variable with key: {task_id}_{execution_date}
+            - Creates or updates the checkpoint with key: {dag_id}_{run_id}_{task_id}[_{shard_id}]
             - Logs checkpoint details including page number and tokens
 
+        Raises:
+            CheckpointConflictError: When a newer attempt has written the checkpoint
+
         Note:
             Checkpoints are saved:
-            - After each successful page save
+            - Every flush_pages saved pages or flush_seconds (via record_progress)
             - Before raising exceptions on failures
             - At the end of successful extraction runs
         """
+        self._pending = self._checkpoint_value(
+            previous_token, last_saved_page, last_saved_token, landing_files
+        )
+        self.flush()
+
+    def flush(self) -> None:
+        """Write the pending checkpoint, if any, with compare-and-swap."""
+        if self._pending is None:
+            return
 
         ti = self.context.get("task_instance")
-        checkpoint_key = f"{ti.task_id}_{self.execution_date}"
+        checkpoint_key = self.checkpoint_key(ti.task_id)
+        checkpoint_value = self._pending
+
+        record = {
+            "checkpoint": checkpoint_value,
+            "updated_at": time.time(),
+            "execution_date": self.execution_date,
+            "dag_id": self.context["dag"].dag_id,
+            "run_id": self.context["run_id"],
+            "try_number": ti.try_number,
+        }
+
+        if self._version is None:
+            _, self._version = self.store.read(checkpoint_key)
 
-        checkpoint_value = {
+        try:
+            self._version = self.store.write(checkpoint_key, record, self._version)
+        except CheckpointConflictError as e:
+            current, current_version = self.store.read(checkpoint_key)
+            if current is not None and current.get("try_number", 0) > ti.try_number:
+                self.log.error(f"Newer attempt owns checkpoint {checkpoint_key}, stopping: {e}")
+                raise
+
+            # an older attempt wrote after we read. this attempt supersedes it
+            self.log.warning(f"Overwriting checkpoint left by an earlier attempt: {e}")
+            self._version = self.store.write(checkpoint_key, record, current_version)
+
+        self._pending = None
+        self._flushed_page = checkpoint_value["last_saved_page"]
+        self._flushed_at = time.monotonic()
+        self.log.info(
+            f"Checkpoint saved - Key: {checkpoint_key}, Version: {self._version}, Page: {checkpoint_value['last_saved_page']}, Previous token: {checkpoint_value['previous_token']}, Current token: {checkpoint_value['last_saved_token']}"
+        )
+
+    @staticmethod
+    def _checkpoint_value(
+        previous_token: str,
+        last_saved_page: int,
+        last_saved_token: str,
+        landing_files: List[Dict] | None,
+    ) -> Dict:
+        return {
             "last_saved_page": last_saved_page,
             "last_saved_token": last_saved_token,
             "next_page_url": f"{config.BASE_URL}{last_saved_token}",
             "previous_token": previous_token,
+            "landing_files": landing_files or [],
         }
 
-        Variable.set(checkpoint_key, json.dumps(checkpoint_value))
-        self.log.info(
-            f"Checkpoint saved - Key: {checkpoint_key}, Page: {last_saved_page}, Previous token: {previous_token}, Current token: {last_saved_token}"
-        )
+    def get_watermark(self) -> str | None:
+        """
+        Load the last update high-watermark recorded by the last successful extraction.
+
+        Unlike checkpoints, the watermark is not scoped to a task or DAG run: it carries over
+        from one run to the next and is never cleared by CleanUp.
+
+        Returns:
+            str|None: Highest lastUpdatePostDate (YYYY-MM-DD) seen by the last successful run,
+            or None if no run has completed yet
+        """
+        try:
+            watermark = json.loads(Variable.get(WATERMARK_KEY))
+            self.log.info(
+                f"Watermark loaded - {watermark.get('watermark')} (recorded by run {watermark.get('run_id')})"
+            )
+            return watermark.get("watermark")
+        except KeyError:
+            self.log.info(f"No watermark found for key: {WATERMARK_KEY}")
+            return None
+        except json.JSONDecodeError as e:
+            self.log.error(f"Failed to parse watermark JSON: {e}")
+            return None
+
+    def save_watermark(self, watermark: str, mode: str) -> None:
+        """
+        Persist the last update high-watermark after a successful extraction.
+
+        Args:
+            watermark (str): Highest lastUpdatePostDate (YYYY-MM-DD) seen by the run
+            mode (str): Extraction mode of the run that produced the watermark
+        """
+        watermark_value = {
+            "watermark": watermark,
+            "mode": mode,
+            "execution_date": self.execution_date,
+            "run_id": self.context.get("run_id"),
+        }
+
+        Variable.set(WATERMARK_KEY, json.dumps(watermark_value))
+        self.log.info(f"Watermark saved - Key: {WATERMARK_KEY}, Watermark: {watermark}")
 
 
 class Extractor:
@@ -186,10 +396,10 @@ class Extractor:
     Orchestrates paginated API extraction of clinical trials data with fault tolerance.
 
     This class implements is an  extraction pipeline that:
-    - Fetches paginated data from the Clinical Trials API
+    - Fetches paginated data from the Clinical Trials API over a pooled keep-alive session
     - Converts responses to Parquet format for efficient storage
     - Saves data incrementally to S3 with page-level granularity
-    - Handles rate limiting
+    - Handles rate limiting against a quota shared by every extract task
     - Maintains checkpoints for recovery from failures
     - Generates extraction manifests for downstream processing
 
@@ -201,25 +411,70 @@ class Extractor:
     Flow:
     1. Initialize with context and determine starting state
     2. Loop through paginated API responses
-    3. Convert each response to Parquet format
-    4. Save to S3 with incremental page numbers
-    5. Update checkpoints after each successful save
+    3. Encode each response with the pinned landing schema
+    4. Roll pages up into large Parquet files and save them to S3
+    5. Advance checkpoint state over pages whose file has been saved
     6. Generate manifest on completion
 
+    Landing files: pages are compacted into files of about config.LANDING_TARGET_FILE_MB
+    (see LandingFileWriter). A page is only counted as saved once its file is uploaded, so
+    resume still works at page granularity: on failure the file in progress is flushed before
+    the checkpoint is saved, and any page that could not be flushed is fetched again. The
+    manifest lists every file with the pages, tokens and row groups it holds.
+
+    Two extraction modes are supported:
+    - Serial (writer_workers == 0): fetch, encode and upload each page before requesting the next
+    - Pipelined (writer_workers > 0): a fetcher walks the pagination chain into a bounded queue
+      while writer threads encode and upload pages concurrently. Checkpoint state only advances
+      over pages that have been saved contiguously, so resume semantics are identical to serial mode.
+
+    Incremental mode: only studies whose lastUpdatePostDate is on or after the watermark of
+    the last successful run are requested, and pages are saved under delta/{execution_date}/.
+    The highest lastUpdatePostDate among saved pages becomes the new watermark once the run
+    completes. The watermark day itself is re-requested since several updates can be posted on
+    the same day. Full mode requests the whole catalogue and also records a watermark, so an
+    incremental run can follow a full refresh. Without a stored watermark, incremental mode
+    falls back to a full extraction.
+
+    Sharding: when a shard is given, every request carries the shard's API filter, pages are
+    saved under {execution_date}/{shard_id}/ and the checkpoint key includes the shard id.
+    The run manifest is then written by merge_shard_manifests instead of the extractor.
+
+    Projection: by default ("warehouse") the API is asked only for the paths the transformer
+    reads, derived from SINGLE_FIELDS and NESTED_FIELDS by build_fields_projection. Results
+    tables the warehouse does not load (baseline characteristics, outcome measures, adverse
+    events) make up most of a full document, so this shrinks transfer, Parquet and parse cost.
+    "full" requests complete documents for archival runs.
+
     Attributes:
         context (Context): Airflow task context for execution metadata
          execution_date (str): Logical date of the DAG run
+         mode (str): "full" or "incremental"
+         watermark (str|None): Lower bound of lastUpdatePostDate requested in incremental mode
+         shard (Dict|None): Shard being extracted ({"shard_id", "filter"}), None for the whole catalogue
+         prefix (str): S3 prefix pages are saved under
+         filters (List[str]): API filter.advanced expressions applied to every request
+         projection (str): "warehouse" or "full"
+         fields (List[str]): API fields projection applied to every request (empty for full documents)
+         request_signature (Dict): Filters and projection of the API query, recorded with landing files
          log (logging.Logger): Airflow task logger
          state (StateHandler): Handler for checkpoint operations
-         timeout (int): HTTP request timeout in seconds
+         timeout (int): HTTP request timeout in seconds. Used as the read timeout unless read_timeout is given
+         http (CTGovClient): Pooled HTTP transport with separate connect/read timeouts
+         request_timings (Dict[int, Dict]): DNS/connect/TLS/TTFB/download timings per fetched page
+         encoder (LandingEncoder): Encodes pages with the pinned landing schema and tracks schema drift
+         landing (LandingFileWriter): Rolls encoded pages up into large Parquet files
          max_retries (int): Maximum retry attempts per page
+         page_limit (int|None): Maximum page number to extract (None for the full catalogue)
+         writer_workers (int): Number of writer threads in pipelined mode (0 for serial mode)
+         queue_size (int): Maximum number of fetched pages waiting to be written in pipelined mode
          last_saved_page (int): Counter for successfully saved pages
          next_page_url (str|None): URL for the next API request
          last_saved_token (str|None): Current pagination token
          previous_token (str|None): Previous pagination token (for verification)
          max_requests (int): Maximum requests allowed in the time window (default: 50)
          window (int): Time window in seconds for rate limiting (default: 60)
-         requests (list): Timestamps of recent requests for rate limiting
+         rate_limiter (RateLimiter): Token bucket pacing requests, shared through config.RATE_LIMIT_BACKEND
          s3_hook: S3 connection hook for file operations
 
 
@@ -229,16 +484,56 @@ class Extractor:
     """
 
     def __init__(
-        self, context: Context, s3_hook, timeout: int = 30, max_retries: int = 3
+        self,
+        context: Context,
+        s3_hook,
+        timeout: int = 30,
+        max_retries: int = 3,
+        writer_workers: int = 0,
+        queue_size: int = 4,
+        connect_timeout: float = 5.0,
+        read_timeout: float | None = None,
+        shard: Dict | None = None,
+        mode: str = "full",
+        projection: str = "warehouse",
     ):
 
         self.context = context
         self.execution_date = self.context.get("ds")
         self.log = logging.getLogger("airflow.task")
-        self.state = StateHandler(self.context)
+
+        self.shard = shard
+        shard_id = shard["shard_id"] if shard else None
+        self.state = StateHandler(self.context, shard_id=shard_id, s3_hook=s3_hook)
+
+        self.mode = mode
+        self.watermark: str | None = None
+
+        self.prefix = f"{self.execution_date}/{shard_id}" if shard else self.execution_date
+        self.manifest_key = f"{self.execution_date}_manifest.json"
+        self.filters: List[str] = [shard["filter"]] if shard else []
+
+        if projection not in PROJECTIONS:
+            raise ValueError(f"Unknown projection: {projection}")
+        self.projection = projection
+        self.fields: List[str] = build_fields_projection() if projection == "warehouse" else []
+
+        if self.mode == "incremental":
+            self.watermark = self.state.get_watermark()
+            if self.watermark:
+                self.filters.append(f"AREA[LastUpdatePostDate]RANGE[{self.watermark},MAX]")
+                self.prefix = f"delta/{self.prefix}"
+                self.manifest_key = f"delta/{self.manifest_key}"
+            else:
+                self.log.warning("No watermark recorded yet, falling back to full extraction")
+                self.mode = "full"
         self.timeout: int = timeout
 
         self.max_retries: int = max_retries
+        self.page_limit: int | None = 2  # test volume
+        self.writer_workers: int = writer_workers
+        self.queue_size: int = queue_size
+
         self.last_saved_page: int = 0
         self.next_page_url: str | None = None
         self.last_saved_token: str | None = None
@@ -246,53 +541,239 @@ class Extractor:
 
         self.max_requests: int = 50
         self.window: int = 60
-        self.requests = []
+        self.rate_limiter = build_rate_limiter(
+            config.RATE_LIMIT_BACKEND,
+            max_requests=self.max_requests,
+            window=self.window,
+            burst=config.RATE_LIMIT_BURST,
+            redis_url=config.RATE_LIMIT_REDIS_URL,
+            lock_path=config.RATE_LIMIT_LOCK_PATH,
+        )
+
+        self.s3_hook = s3_hook
+        self.request_signature = {
+            "filters": self.filters,
+            "projection": self.projection,
+            "fields_sha256": hashlib.sha256(",".join(self.fields).encode()).hexdigest(),
+        }
 
         initial_state = self.state.determine_state()
+        if config.EXTRACT_RESUME_FROM_STORAGE and self.state.is_retry():
+            initial_state = self.reconcile_state(initial_state)
+
         self.last_saved_page = initial_state.get("last_saved_page")
-        self.next_page_url = initial_state.get("next_page_url")
+        self.last_saved_token = initial_state.get("last_saved_token")
+        self.previous_token = initial_state.get("previous_token")
+        landing_files = initial_state.get("landing_files", [])
+        # rebuilt rather than read from state so that the shard's query parameters are carried over
+        self.next_page_url = self.build_page_url(self.last_saved_token)
+
+        self.http = CTGovClient(
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout if read_timeout is not None else timeout,
+        )
+        self.request_timings: Dict[int, Dict] = {}
+        self.encoder = LandingEncoder()
+        self.landing = LandingFileWriter(
+            s3_hook,
+            bucket=config.CTGOV_BUCKET,
+            prefix=self.prefix,
+            next_page=self.last_saved_page + 1,
+            page_token=self.last_saved_token,
+            target_file_bytes=config.LANDING_TARGET_FILE_MB * 1024 * 1024,
+            row_group_rows=config.LANDING_ROW_GROUP_ROWS,
+            compression=config.LANDING_COMPRESSION,
+            compression_level=config.LANDING_COMPRESSION_LEVEL,
+            use_dictionary=config.LANDING_USE_DICTIONARY,
+            part_size=config.LANDING_UPLOAD_PART_MB * 1024 * 1024,
+            max_in_flight_parts=config.LANDING_UPLOAD_MAX_IN_FLIGHT,
+            files=landing_files,
+            request=self.request_signature,
+        )
 
-        self.s3_hook = s3_hook
+        # pipelined mode bookkeeping. pages saved out of order wait here until the gap before them closes
+        self._progress_lock = threading.Lock()
+        self._pending_pages: Dict[int, Tuple[str | None, str | None]] = {}
+        self._writer_error: Exception | None = None
 
         self.log.info(
             f"Initializing Extractor...\n"
             f"Last saved page: {self.last_saved_page}\n"
-            f"Starting URL: {self.next_page_url}"
+            f"Starting URL: {self.next_page_url}\n"
+            f"Shard: {shard_id or 'none'}\n"
+            f"Extraction mode: {self.mode}\n"
+            f"Watermark: {self.watermark or 'none'}\n"
+            f"Projection: {self.projection} ({len(self.fields) or 'all'} fields)\n"
+            f"Writer mode: {'pipelined' if self.writer_workers > 0 else 'serial'}"
         )
 
+    def reconcile_state(self, checkpoint_state: Dict) -> Dict:
+        """
+        Replace checkpoint state with what is verifiably landed in S3 (see reconcile_landing).
+
+        Storage is the source of truth: a crash can lose a checkpoint write after files were
+        saved (storage is ahead), and a checkpoint can name files that are gone or corrupt
+        (storage is behind). Either way extraction resumes right after the last verified page.
+        Like the checkpoint, storage is only resumed from on retries: a first attempt starts
+        fresh and leaves the prefix alone. If storage cannot be read, the checkpoint is used.
+
+        Args:
+            checkpoint_state (Dict): State from StateHandler.determine_state
+
+        Returns:
+            Dict: State to resume from
+        """
+        try:
+            stored_state = reconcile_landing(
+                self.s3_hook,
+                config.CTGOV_BUCKET,
+                self.prefix,
+                self.request_signature,
+                verify_checksums=config.EXTRACT_RESUME_VERIFY_CHECKSUMS,
+            )
+        except Exception as e:
+            self.log.error(f"Storage reconciliation failed, resuming from checkpoint: {e}")
+            return checkpoint_state
+
+        if stored_state["last_saved_page"] != checkpoint_state["last_saved_page"]:
+            self.log.warning(
+                f"Checkpoint is at page {checkpoint_state['last_saved_page']} but storage holds "
+                f"verified pages up to {stored_state['last_saved_page']}. Resuming from storage"
+            )
+        return stored_state
+
     def wait_if_needed(self):
         """
-        Implements a sliding window rate limiter that allows a maximum of 50 requests
-        per 60-second window. (standard for clinicaltrials.gov)
+        Pace requests to a maximum of 50 requests per 60-second window.
+        (standard for clinicaltrials.gov)
 
-        Algorithm:
-        1. Remove timestamps older than the current window (60 seconds)
-        2. If at max capacity (50 requests), calculate required sleep time
-        3. Sleep until the oldest request falls outside the window
-        4. Clear request history and record current request timestamp
+        The limit is enforced by a token bucket rather than a per-instance request log, so
+        requests are spaced evenly (window / max_requests apart) instead of bursting the whole
+        quota and then stalling. The bucket lives in the backend selected by
+        config.RATE_LIMIT_BACKEND; with the redis backend every extract task across workers
+        and DAG runs draws from the same quota.
 
         Returns:
             None
 
         Side Effects:
-            - Modifies self.requests list by pruning old timestamps
-            - May sleep the current thread if rate limit is reached
-            - Appends current timestamp to self.requests
+            - May sleep the current thread until the next request slot is due
+        """
+        self.rate_limiter.acquire()
 
+    def build_page_url(self, page_token: str | None) -> str:
         """
-        now = time.time()
+        Build the request URL for a page, applying this extractor's API filters and fields
+        projection.
 
-        # remove timestamps outside current window
-        self.requests = [
-            req_time for req_time in self.requests if now - req_time < self.window
-        ]
+        The API requires every query parameter to be repeated alongside pageToken, so filters
+        and fields are added to both the first page URL and continuation URLs.
+
+        Args:
+            page_token (str|None): Pagination token, None for the first page
+
+        Returns:
+            str: Fully constructed URL
+        """
+        url = config.FIRST_PAGE_URL if page_token is None else f"{config.BASE_URL}{page_token}"
+        if not self.filters and not self.fields:
+            return url
+
+        parts = urlsplit(url)
+        query = dict(parse_qsl(parts.query, keep_blank_values=True))
+
+        if self.filters:
+            filters = list(self.filters)
+            if query.get("filter.advanced"):
+                filters.insert(0, query["filter.advanced"])
+            query["filter.advanced"] = " AND ".join(f"({f})" for f in filters) if len(filters) > 1 else filters[0]
+
+        if self.fields:
+            query["fields"] = ",".join(self.fields)
+
+        return urlunsplit(parts._replace(query=urlencode(query, safe="[],:()")))
+
+    def has_more_pages(self, page_number: int) -> bool:
+        """Check whether page_number is within the configured page limit."""
+        return self.page_limit is None or page_number <= self.page_limit
+
+    def retry_delay(self, attempt: int, response: requests.Response | None = None) -> float:
+        """
+        Seconds to wait before retrying a page after a failed attempt.
+
+        Exponential backoff with full jitter, so that retries of concurrent tasks spread out
+        instead of arriving together. When the server sent Retry-After (429, 503), at least
+        that long.
+
+        Args:
+            attempt (int): The attempt that failed, from 1
+            response (requests.Response|None): Its response, None when the request raised
+
+        Returns:
+            float: Seconds to wait
+        """
+        cap = min(
+            config.RETRY_BACKOFF_MAX_SECONDS, config.RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+        )
+        delay = random.uniform(0, cap)
+        if response is not None:
+            retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+        return delay
+
+    def fetch_page(self, page_number: int, url: str) -> Dict:
+        """
+        Fetch and decode a single page, retrying up to max_retries times.
+
+        Every attempt, retries included, takes a slot from the shared rate limiter, and a
+        failed attempt backs off (see retry_delay) before the next one.
+
+        Args:
+            page_number (int): The page being fetched. Used for logging and error reporting.
+            url (str): Fully constructed URL for the page.
+
+        Returns:
+            Dict: Decoded JSON response for the page
+
+        Raises:
+            RequestExhaustionError: When the page could not be fetched after max_retries attempts
+        """
+        for attempt in range(1, self.max_retries + 1):
+            self.wait_if_needed()
+
+            response = None
+            try:
+                response, timing = self.http.get(url)
+            except requests.RequestException as e:
+                self.log.warning(
+                    f"Request for page {page_number} failed on attempt {attempt}: {e}"
+                )
+            else:
+                if response.status_code == 200:
+                    self.request_timings[page_number] = timing
+                    self.log.info(
+                        f"Successfully made request to page {page_number} "
+                        f"(ttfb: {timing['ttfb']}s, download: {timing['download']}s, "
+                        f"{timing['wire_bytes']} bytes {timing['content_encoding']}, "
+                        f"reused connection: {timing['reused_connection']})"
+                    )
+                    return response.json()
 
-        if len(self.requests) >= self.max_requests:
-            sleep_time = self.window - (now - self.requests[0])
-            time.sleep(sleep_time)
-            self.requests = []
+                self.log.warning(
+                    f"Request for page {page_number} returned {response.status_code} on attempt {attempt}"
+                )
+
+            if attempt < self.max_retries:
+                delay = self.retry_delay(attempt, response)
+                self.log.info(f"Retrying page {page_number} in {delay:.1f}s")
+                time.sleep(delay)
 
-        self.requests.append(time.time())
+        raise RequestExhaustionError(
+            page_number=page_number,
+            max_attempts=self.max_retries,
+            url=url,
+        )
 
     def make_requests(self) -> Dict:
         """
@@ -323,188 +804,369 @@ class Extractor:
 
          Note:
              - current_page is used for logging only; progress tracking uses last_saved_page
-             - The infinite while loop breaks when no next_page_token is found
+             - The loop breaks when no next_page_token is found
              - Previous token tracking enables verification that all data was extracted
              - Rate limit check is ran before each request to prevent API throttling
+             - Delegates to make_requests_pipelined when writer_workers > 0
         """
+        if self.last_saved_page > 0 and self.last_saved_token is None:
+            self.log.info("Checkpoint shows the final page was already saved")
+            return self.complete_extraction()
+
+        if self.writer_workers > 0:
+            return self.make_requests_pipelined()
 
-        while self.last_saved_page < 2:  # test volume
-            current_page = self.last_saved_page + 1
+        current_page = self.last_saved_page + 1
+        fetch_url = self.next_page_url
+
+        while self.has_more_pages(current_page):
             # current page is used for logging and error reporting within the namespace of this function, and
-            # not for tracking progress. progress is tracked by self.last_saved_page
-            next_page_token = None
+            # not for tracking progress. progress is tracked by self.last_saved_page, which only
+            # advances once the landing file holding a page has been saved
 
             try:
                 self.log.info(f"Starting from page {current_page}")
 
-                self.wait_if_needed()
+                data = self.fetch_page(current_page, fetch_url)
+                next_page_token = data.get("nextPageToken")
+
+                self.save_response(current_page, data)
 
-                for attempt in range(1, self.max_retries + 1):
-                    response = requests.get(self.next_page_url, timeout=self.timeout)
+            except Exception as e:
+                self.handle_failure(current_page, e)
 
-                    if response.status_code == 200:
-                        self.log.info(
-                            f"Successfully made request to page {current_page}"
-                        )
-                        data = response.json()
-                        next_page_token = data.get("nextPageToken")
+            if not next_page_token:
+                # All pages extracted.
+                # tracking self.previous_token is important here. Saving second to last page
+                # is useful to verify if all data was truly extracted
+                self.log.info(f"Next page not found on page {current_page}")
+                break
 
-                        self.previous_token = self.last_saved_token
-                        self.last_saved_token = next_page_token
+            fetch_url = self.build_page_url(next_page_token)
+            current_page += 1
 
-                        self.save_response(current_page, data)
-                        self.next_page_url = f"{config.BASE_URL}{self.last_saved_token}"
-                        break
+        return self.complete_extraction()
 
-                    elif attempt >= self.max_retries and response.status_code != 200:
+    def make_requests_pipelined(self) -> Dict:
+        """
+        Producer/consumer variant of make_requests.
 
-                        self.state.save_checkpoint(
-                            self.previous_token,
-                            self.last_saved_page,
-                            self.last_saved_token,
-                        )
+        The calling thread is the fetcher: it walks the pagination chain in token order, applying
+        the rate limiter before each request, and puts fetched pages on a bounded queue. Writer
+        threads take pages off the queue and encode/upload them with write_page, so Parquet
+        encoding and S3 uploads overlap with the next request instead of adding to it.
 
-                        ti = self.context["task_instance"]
+        Because writers can finish out of order, the landing writer holds pages back until every
+        page before them has been encoded, and a page only advances last_saved_page (and the
+        tokens that go into checkpoints) once its landing file has been saved. A failure in any
+        writer stops the fetcher; the checkpoint then points at the end of the contiguous run
+        of saved pages, exactly as it would in serial mode.
 
-                        # construct failure metadata for notifier
-                        failure_metadata = {
-                            "status": "failed",
-                            "pages_extracted": self.last_saved_page,
-                            "last_valid_token": self.previous_token,
-                            "error_type": RequestExhaustionError,
-                            "error_message": f"Failed to fetch page {current_page} after {self.max_retries} attempts. URL: {self.next_page_url}",
-                        }
+        Returns:
+            Dict: Extraction metadata, identical in shape to make_requests
 
-                        ti.xcom_push(key="metadata", value=failure_metadata)
+        Raises:
+            RequestExhaustionError: When a page fails to fetch or save.
+                Checkpoint is saved before raising, allowing recovery.
+        """
+        pages: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        writers = [
+            threading.Thread(
+                target=self._write_pages, args=(pages,), name=f"extract-writer-{i}", daemon=True
+            )
+            for i in range(self.writer_workers)
+        ]
+        for writer in writers:
+            writer.start()
 
-                        # raise for logging
-                        raise RequestExhaustionError(
-                            page_number=current_page,
-                            max_attempts=self.max_retries,
-                            url=self.next_page_url,
-                        )
+        current_page = self.last_saved_page + 1
+        fetch_url = self.next_page_url
+        fetch_error: Exception | None = None
 
-                if not next_page_token:
-                    # All pages extracted.
-                    # tracking self.previous_token is important here. Saving second to last page
-                    # is useful to verify if all data was truly extracted
+        try:
+            while self.has_more_pages(current_page) and self._writer_error is None:
+                self.log.info(f"Fetching page {current_page}")
 
+                data = self.fetch_page(current_page, fetch_url)
+                next_page_token = data.get("nextPageToken")
+
+                # blocks while queue_size pages are waiting, which bounds memory held by the pipeline
+                pages.put((current_page, data))
+
+                if not next_page_token:
                     self.log.info(f"Next page not found on page {current_page}")
+                    break
 
-                    self.state.save_checkpoint(
-                        self.previous_token, self.last_saved_page, self.last_saved_token
-                    )
+                fetch_url = self.build_page_url(next_page_token)
+                current_page += 1
 
-                    manifest = {
-                        "location": f"s3://{config.CTGOV_BUCKET}/{self.execution_date}",
-                        "created_at": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
-                        "metrics": {
-                            "page_count": self.last_saved_page,
-                        },
-                        "lineage": {
-                            "dag_id": self.context["dag"].dag_id,
-                            "run_id": self.context["run_id"],
-                            "execution_date": self.execution_date,
-                        },
-                    }
-
-                    manifest_key = f"{self.execution_date}_manifest.json"
-
-                    self.s3_hook.load_string(
-                        string_data=json.dumps(manifest, indent=2),
-                        key=manifest_key,
-                        bucket_name=config.CTGOV_BUCKET,
-                        replace=True,
-                    )
+        except Exception as e:
+            fetch_error = e
 
-                    self.log.info(
-                        f"Manifest saved to s3://{config.CTGOV_BUCKET}/{self.execution_date}/{manifest_key}"
-                    )
+        finally:
+            for _ in writers:
+                pages.put(None)
+            for writer in writers:
+                writer.join()
+
+        if fetch_error or self._writer_error:
+            # report the first page that is not safely stored, not the page the fetcher had reached
+            self.handle_failure(self.last_saved_page + 1, fetch_error or self._writer_error)
+
+        return self.complete_extraction()
+
+    def _write_pages(self, pages: queue.Queue) -> None:
+        """Writer loop for pipelined mode. Runs until it receives the None sentinel."""
+        while True:
+            item = pages.get()
+            if item is None:
+                return
 
-                    metadata = {
-                        "pages_extracted": self.last_saved_page,
-                        "last_valid_token": self.previous_token,
-                        "final_token": self.last_saved_token,
-                        "data_location": f"s3://{config.CTGOV_BUCKET}/{self.execution_date}/",
-                    }
-                    return metadata
+            page_number, data = item
+            if self._writer_error is not None:
+                # keep draining so the fetcher never blocks on a full queue
+                continue
 
+            try:
+                saved_pages = self.write_page(page_number, data)
+                self.mark_pages_saved(saved_pages)
             except Exception as e:
-                self.log.info(f"{str(e)}")
+                self.log.error(f"Failed to save page {page_number}: {e}")
+                with self._progress_lock:
+                    if self._writer_error is None:
+                        self._writer_error = e
 
-                self.state.save_checkpoint(
-                    self.previous_token, self.last_saved_page, self.last_saved_token
-                )
+    def mark_pages_saved(self, saved_pages: List[Dict]) -> None:
+        """
+        Advance progress over pages whose landing file has been saved, and pass it on to the
+        (coalesced) checkpoint.
 
-                ti = self.context["task_instance"]
-
-                # construct failure metadata for notifier
-                failure_metadata = {
-                    "status": "failed",
-                    "pages_extracted": self.last_saved_page,
-                    "last_valid_token": self.previous_token,
-                    "error_type": RequestExhaustionError,
-                    "error_message": f"Failed to fetch page {current_page} after {self.max_retries} attempts. URL: {self.next_page_url}",
-                }
-
-                ti.xcom_push(key="metadata", value=failure_metadata)
-                # raise for logging
-                raise RequestExhaustionError(
-                    page_number=current_page,
-                    max_attempts=self.max_retries,
-                    url=self.next_page_url,
+        Args:
+            saved_pages (List[Dict]): Page entries returned by LandingFileWriter
+        """
+        if not saved_pages:
+            return
+
+        for page in saved_pages:
+            self.mark_page_saved(page["page"], page["page_token"], page["next_page_token"])
+
+        with self._progress_lock:
+            self.state.record_progress(
+                self.previous_token,
+                self.last_saved_page,
+                self.last_saved_token,
+                self.landing.files,
+            )
+
+    def mark_page_saved(
+        self, page_number: int, page_token: str | None, next_page_token: str | None
+    ) -> None:
+        """
+        Record a saved page and advance progress over any contiguous run of saved pages.
+
+        Args:
+            page_number (int): The page that was saved
+            page_token (str|None): The token used to fetch the page
+            next_page_token (str|None): The token returned by the page
+        """
+        with self._progress_lock:
+            self._pending_pages[page_number] = (page_token, next_page_token)
+
+            while self.last_saved_page + 1 in self._pending_pages:
+                page_token, next_page_token = self._pending_pages.pop(
+                    self.last_saved_page + 1
                 )
+                self.last_saved_page += 1
+                self.previous_token = page_token
+                self.last_saved_token = next_page_token
+                self.next_page_url = self.build_page_url(next_page_token)
+
+    def handle_failure(self, current_page: int, error: Exception) -> None:
+        """
+        Save what has been extracted, push failure metadata for the notifier and raise.
+
+        Pages still buffered in the landing writer are flushed first so the checkpoint covers
+        every page fetched before the failure.
+
+        Args:
+            current_page (int): The page that could not be extracted
+            error (Exception): The underlying error
+
+        Raises:
+            RequestExhaustionError: Always
+        """
+        self.log.info(f"{str(error)}")
+        self.http.close()
+
+        try:
+            self.mark_pages_saved(self.landing.flush())
+        except Exception as e:
+            self.log.error(f"Failed to save buffered pages, they will be fetched again: {e}")
+
+        self.state.save_checkpoint(
+            self.previous_token,
+            self.last_saved_page,
+            self.last_saved_token,
+            self.landing.files,
+        )
+
+        ti = self.context["task_instance"]
+
+        # construct failure metadata for notifier
+        failure_metadata = {
+            "status": "failed",
+            "pages_extracted": self.last_saved_page,
+            "last_valid_token": self.previous_token,
+            "error_type": RequestExhaustionError,
+            "error_message": f"Failed to fetch page {current_page} after {self.max_retries} attempts. URL: {self.next_page_url}",
+        }
+
+        ti.xcom_push(key="metadata", value=failure_metadata)
+        # raise for logging
+        raise RequestExhaustionError(
+            page_number=current_page,
+            max_attempts=self.max_retries,
+            url=self.next_page_url,
+        )
+
+    def complete_extraction(self) -> Dict:
+        """
+        Save the final checkpoint and write the extraction manifest.
+
+        For a shard the manifest is returned in the metadata instead of being written, so the
+        merge step can produce a single manifest for the run.
+
+        Returns:
+            Dict: Extraction metadata for XCom
+        """
+        self.http.close()
+
+        self.mark_pages_saved(self.landing.flush())
+        self.state.save_checkpoint(
+            self.previous_token,
+            self.last_saved_page,
+            self.last_saved_token,
+            self.landing.files,
+        )
+
+        manifest = {
+            "manifest_version": MANIFEST_VERSION,
+            "location": f"s3://{config.CTGOV_BUCKET}/{self.prefix}",
+            "created_at": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+            "metrics": {
+                "page_count": self.last_saved_page,
+                "file_count": len(self.landing.files),
+                "row_count": sum(f["rows"] for f in self.landing.files),
+                "upload": {
+                    "bytes": sum(f["upload"]["bytes"] for f in self.landing.files),
+                    "seconds": round(sum(f["upload"]["seconds"] for f in self.landing.files), 4),
+                    "blocked_seconds": round(
+                        sum(f["upload"]["blocked_seconds"] for f in self.landing.files), 4
+                    ),
+                },
+                "http": self.http.stats,
+            },
+            "files": self.landing.files,
+            "mode": self.mode,
+            "projection": {"name": self.projection, "fields": self.fields},
+            "schema": {
+                "version": LANDING_SCHEMA_VERSION,
+                "fingerprint": LANDING_SCHEMA_FINGERPRINT,
+                "drift": self.encoder.drift_counts,
+            },
+            "watermark": {
+                "previous": self.watermark,
+                # taken from landing file stats, so pages saved by earlier attempts count too
+                "current": max(
+                    (f["last_updated"]["max"] for f in self.landing.files if f["last_updated"]["max"]),
+                    default=self.watermark,
+                ),
+            },
+            "lineage": {
+                "dag_id": self.context["dag"].dag_id,
+                "run_id": self.context["run_id"],
+                "execution_date": self.execution_date,
+            },
+        }
+
+        metadata = {
+            "pages_extracted": self.last_saved_page,
+            "last_valid_token": self.previous_token,
+            "final_token": self.last_saved_token,
+            "data_location": f"s3://{config.CTGOV_BUCKET}/{self.prefix}/",
+        }
+
+        if self.shard:
+            # shard manifests are combined into the run manifest by merge_shard_manifests
+            manifest["shard"] = self.shard
+            metadata["manifest"] = manifest
+            return metadata
+
+        self.s3_hook.load_string(
+            string_data=json.dumps(manifest, indent=2),
+            key=self.manifest_key,
+            bucket_name=config.CTGOV_BUCKET,
+            replace=True,
+        )
+
+        self.log.info(
+            f"Manifest saved to s3://{config.CTGOV_BUCKET}/{self.manifest_key}"
+        )
+
+        if manifest["watermark"]["current"]:
+            self.state.save_watermark(manifest["watermark"]["current"], self.mode)
+
+        return metadata
 
     def save_response(self, page_number: int, data: Dict) -> None:
         """
-        Convert API response to Parquet format and persist to S3.
+        Encode an API response and hand it to the landing writer.
 
         This method handles the transformation and storage of a single page of API data:
-        1. Converts JSON response dict to pandas DataFrame
-        2. Transforms DataFrame to PyArrow Table for efficient Parquet encoding
-        3. Writes Parquet data to in-memory buffer
-        4. Uploads buffer contents to S3 with structured key naming
-        5. Increments page counter after successful save
+        1. Encodes the JSON response into an Arrow record batch with the pinned landing schema
+        2. Appends the batch to the landing file in progress
+        3. Once the landing file is uploaded, advances progress over every page it holds
 
         Args:
             page_number (int): The logical page number for this data chunk.
                 Used for file naming and progress tracking.
                 Should match current_page from calling context.
-            data (Dict): JSON response data from the API. Should be a dictionary
-                that can be converted to a pandas DataFrame.
+            data (Dict): JSON response data from the API
 
         Returns:
             None
 
         Side Effects:
-            - Creates a Parquet file in S3
-            - Increments self.last_saved_page counter
-            - Logs successful save with S3 destination path
+            - Uploads a Parquet file to S3 when the landing file reaches its target size
+            - Advances self.last_saved_page and the checkpoint tokens over saved pages
 
         Note:
-            - Uses in-memory buffer to avoid disk I/O
-            - Replaces existing file if page is re-processed
-            - Page counter incremented only after successful S3 upload
-            - Destination path logged for debugging and verification
+            - Page counter only advances after a successful S3 upload, so it can lag the
+              page just fetched by up to one landing file
+            - Encoding is done by write_page, which pipelined mode calls directly
         """
+        saved_pages = self.write_page(page_number, data)
+        self.mark_pages_saved(saved_pages)
 
-        df = pd.DataFrame(data)
-        table = pa.Table.from_pandas(df)
+        if saved_pages:
+            self.log.info(
+                f"Successfully saved pages {saved_pages[0]['page']}-{self.last_saved_page} "
+                f"at s3://{config.CTGOV_BUCKET}/{saved_pages[-1]['file']}"
+            )
 
-        buffer = io.BytesIO()
-        pq.write_table(table, buffer)
-        buffer.seek(0)
+    def write_page(self, page_number: int, data: Dict) -> List[Dict]:
+        """
+        Encode a single page with the pinned landing schema and append it to the landing file.
 
-        bucket = config.CTGOV_BUCKET
-        key = f"{self.execution_date}/{page_number}.parquet"
+        Unlike save_response this does not touch extractor progress, so it is safe to call
+        from writer threads.
 
-        self.s3_hook.load_bytes(
-            bytes_data=buffer.getvalue(), key=key, bucket_name=bucket, replace=True
-        )
-
-        self.last_saved_page += 1
+        Args:
+            page_number (int): The logical page number, used for ordering and file naming
+            data (Dict): JSON response data from the API
 
-        destination = f"s3://{bucket}/{key}" if key else "Unknown"
-        self.log.info(
-            f"Successfully saved page {self.last_saved_page} at {destination}"
-        )
+        Returns:
+            List[Dict]: Entries of pages whose landing file was saved by this call
+        """
+        batch = self.encoder.encode(data)
+        return self.landing.add(page_number, batch, data.get("nextPageToken"))
@@ -0,0 +1,211 @@
+import socket
+import sys
+import threading
+import time
+from typing import Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util import connection as urllib3_connection
+from urllib3.util.request import ACCEPT_ENCODING
+
+
+# connection phase timings for the request currently in flight on this thread.
+# populated by the timed connections below, which only CTGovClient's pools use, and read back
+# by CTGovClient.get
+_phase_timings = threading.local()
+
+
+def _reset_phase_timings() -> None:
+    _phase_timings.dns = 0.0
+    _phase_timings.connect = 0.0
+    _phase_timings.tls = 0.0
+    _phase_timings.new_connection = False
+
+
+class _TimedConnectionMixin:
+    """
+    Opens the socket like urllib3's HTTPConnection._new_conn, timing DNS resolution and TCP
+    connect apart.
+
+    The host is resolved here first and each resolved address is handed to urllib3's
+    create_connection, so socket options and timeouts stay urllib3's, and errors are raised as
+    the same urllib3 exceptions. Reused keep-alive connections never get here, which is how a
+    request is identified as having reused a connection.
+    """
+
+    def _new_conn(self) -> socket.socket:
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self.host, self.port, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        resolved = time.perf_counter()
+
+        last_error = None
+        for *_, sockaddr in addresses:
+            try:
+                sock = urllib3_connection.create_connection(
+                    (sockaddr[0], self.port),
+                    self.timeout,
+                    source_address=self.source_address,
+                    socket_options=self.socket_options,
+                )
+                break
+            except socket.timeout as e:
+                raise ConnectTimeoutError(
+                    self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})"
+                ) from e
+            except OSError as e:
+                last_error = e
+        else:
+            raise NewConnectionError(
+                self, f"Failed to establish a new connection: {last_error}"
+            ) from last_error
+
+        sys.audit("http.client.connect", self, self.host, self.port)
+        _phase_timings.dns = resolved - start
+        _phase_timings.connect = time.perf_counter() - resolved
+        _phase_timings.new_connection = True
+        return sock
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self) -> None:
+        start = time.perf_counter()
+        super().connect()
+        # connect() covers socket creation plus the TLS handshake
+        _phase_timings.tls = max(
+            time.perf_counter() - start - _phase_timings.dns - _phase_timings.connect, 0.0
+        )
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose pools hand out connections that record DNS, connect and TLS handshake
+    timings. Other urllib3 clients in the process (e.g. boto3) are not affected.
+    """
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            **self.poolmanager.pool_classes_by_scheme,
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+class CTGovClient:
+    """
+    Long-lived HTTP transport for the ClinicalTrials.gov API.
+
+    Wraps a requests.Session so that every page reuses pooled keep-alive connections instead of
+    paying a TCP + TLS handshake per request, negotiates compressed transfer explicitly and
+    captures per-request timings.
+
+    Compression: Accept-Encoding is taken from urllib3, which only advertises encodings it can
+    decode in this environment (gzip and deflate always, br when the brotli package is installed).
+
+    Timings captured per request (seconds):
+    - dns: host resolution (0 when the connection was reused)
+    - connect: TCP connect (0 when the connection was reused)
+    - tls: TLS handshake (0 when the connection was reused)
+    - ttfb: time from sending the request to receiving response headers
+    - download: time to read and decode the body
+    - total: wall time of the request
+
+    Attributes:
+        connect_timeout (float): Seconds to wait for a connection to be established
+        read_timeout (float): Seconds to wait between bytes once connected
+        session (requests.Session): Pooled session used for all requests
+        stats (Dict): Aggregate counters across all requests made by this client
+    """
+
+    def __init__(
+        self, connect_timeout: float = 5.0, read_timeout: float = 30.0, pool_maxsize: int = 4
+    ):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        adapter = _TimedHTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {
+                "Accept": "application/json",
+                "Accept-Encoding": ACCEPT_ENCODING,
+                "Connection": "keep-alive",
+            }
+        )
+
+        self.stats = {
+            "requests": 0,
+            "new_connections": 0,
+            "wire_bytes": 0,
+            "decoded_bytes": 0,
+            "total_seconds": 0.0,
+        }
+
+    def get(self, url: str) -> Tuple[requests.Response, Dict]:
+        """
+        Perform a GET request and fully read the body.
+
+        Args:
+            url (str): URL to request
+
+        Returns:
+            Tuple of (response, timing). The response body is already loaded, so
+            response.json() does not touch the network.
+        """
+        _reset_phase_timings()
+        start = time.perf_counter()
+
+        response = self.session.get(
+            url, timeout=(self.connect_timeout, self.read_timeout), stream=True
+        )
+        headers_received = time.perf_counter()
+
+        content = response.content
+        finished = time.perf_counter()
+
+        handshake = _phase_timings.dns + _phase_timings.connect + _phase_timings.tls
+        timing = {
+            "dns": round(_phase_timings.dns, 4),
+            "connect": round(_phase_timings.connect, 4),
+            "tls": round(_phase_timings.tls, 4),
+            "ttfb": round(max(headers_received - start - handshake, 0.0), 4),
+            "download": round(finished - headers_received, 4),
+            "total": round(finished - start, 4),
+            "reused_connection": not _phase_timings.new_connection,
+            "content_encoding": response.headers.get("Content-Encoding", "identity"),
+            "wire_bytes": response.raw.tell(),
+            "decoded_bytes": len(content),
+        }
+
+        self.stats["requests"] += 1
+        self.stats["new_connections"] += int(_phase_timings.new_connection)
+        self.stats["wire_bytes"] += timing["wire_bytes"]
+        self.stats["decoded_bytes"] += timing["decoded_bytes"]
+        self.stats["total_seconds"] = round(self.stats["total_seconds"] + timing["total"], 4)
+
+        return response, timing
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self.session.close()
@@ -0,0 +1,578 @@
+import hashlib
+import json
+import logging
+import threading
+from typing import Dict, List, Tuple
+
+import pyarrow as pa
+
+
+LANDING_SCHEMA_VERSION = "1"
+
+
+def _s(*names: str) -> List[pa.Field]:
+    """String fields."""
+    return [pa.field(name, pa.string()) for name in names]
+
+
+def _b(*names: str) -> List[pa.Field]:
+    """Boolean fields."""
+    return [pa.field(name, pa.bool_()) for name in names]
+
+
+def _struct(name: str, *fields: pa.Field | List[pa.Field]) -> pa.Field:
+    flat = []
+    for f in fields:
+        flat.extend(f if isinstance(f, list) else [f])
+    return pa.field(name, pa.struct(flat))
+
+
+def _list(name: str, item: pa.DataType) -> pa.Field:
+    return pa.field(name, pa.list_(item))
+
+
+def _date_struct(name: str) -> pa.Field:
+    return _struct(name, _s("date", "type"))
+
+
+_CONTACT = pa.struct(_s("name", "role", "phone", "phoneExt", "email"))
+_MESH = pa.struct(_s("id", "term"))
+_OUTCOME = pa.struct(_s("measure", "description", "timeFrame"))
+
+# Pinned Arrow type of one study document. Covers every module the warehouse reads (see
+# transformer_config) plus their siblings. Bump LANDING_SCHEMA_VERSION on any change.
+STUDY_TYPE = pa.struct(
+    [
+        _struct(
+            "protocolSection",
+            _struct(
+                "identificationModule",
+                _s("nctId", "briefTitle", "officialTitle", "acronym"),
+                _struct("orgStudyIdInfo", _s("id", "type", "link")),
+                _list("secondaryIdInfos", pa.struct(_s("id", "type", "domain", "link"))),
+                _struct("organization", _s("fullName", "class")),
+                _list("nctIdAliases", pa.string()),
+            ),
+            _struct(
+                "statusModule",
+                _s(
+                    "statusVerifiedDate",
+                    "overallStatus",
+                    "lastKnownStatus",
+                    "whyStopped",
+                    "studyFirstSubmitDate",
+                    "studyFirstSubmitQcDate",
+                    "resultsFirstSubmitDate",
+                    "resultsFirstSubmitQcDate",
+                    "lastUpdateSubmitDate",
+                ),
+                _b("delayedPosting"),
+                _struct(
+                    "expandedAccessInfo",
+                    _b("hasExpandedAccess"),
+                    _s("nctId", "statusForNctId"),
+                ),
+                _date_struct("startDateStruct"),
+                _date_struct("primaryCompletionDateStruct"),
+                _date_struct("completionDateStruct"),
+                _date_struct("studyFirstPostDateStruct"),
+                _date_struct("resultsFirstPostDateStruct"),
+                _date_struct("lastUpdatePostDateStruct"),
+            ),
+            _struct(
+                "sponsorCollaboratorsModule",
+                _struct(
+                    "responsibleParty",
+                    _s(
+                        "type",
+                        "investigatorFullName",
+                        "investigatorTitle",
+                        "investigatorAffiliation",
+                        "oldNameTitle",
+                        "oldOrganization",
+                    ),
+                ),
+                _struct("leadSponsor", _s("name", "class")),
+                _list("collaborators", pa.struct(_s("name", "class"))),
+            ),
+            _struct(
+                "oversightModule",
+                _b(
+                    "oversightHasDmc",
+                    "isFdaRegulatedDrug",
+                    "isFdaRegulatedDevice",
+                    "isUnapprovedDevice",
+                    "isPpsd",
+                    "isUsExport",
+                    "fdaaa801Violation",
+                ),
+            ),
+            _struct("descriptionModule", _s("briefSummary", "detailedDescription")),
+            _struct(
+                "conditionsModule",
+                _list("conditions", pa.string()),
+                _list("keywords", pa.string()),
+            ),
+            _struct(
+                "designModule",
+                _s("studyType", "targetDuration"),
+                _b("patientRegistry"),
+                _list("phases", pa.string()),
+                _struct(
+                    "designInfo",
+                    _s(
+                        "allocation",
+                        "interventionModel",
+                        "interventionModelDescription",
+                        "primaryPurpose",
+                        "observationalModel",
+                        "timePerspective",
+                    ),
+                    _struct(
+                        "maskingInfo",
+                        _s("masking", "maskingDescription"),
+                        _list("whoMasked", pa.string()),
+                    ),
+                ),
+                _struct("bioSpec", _s("retention", "description")),
+                _struct("enrollmentInfo", pa.field("count", pa.int64()), _s("type")),
+            ),
+            _struct(
+                "armsInterventionsModule",
+                _list(
+                    "armGroups",
+                    pa.struct(
+                        _s("label", "type", "description")
+                        + [_list("interventionNames", pa.string())]
+                    ),
+                ),
+                _list(
+                    "interventions",
+                    pa.struct(
+                        _s("type", "name", "description")
+                        + [
+                            _list("armGroupLabels", pa.string()),
+                            _list("otherNames", pa.string()),
+                        ]
+                    ),
+                ),
+            ),
+            _struct(
+                "outcomesModule",
+                _list("primaryOutcomes", _OUTCOME),
+                _list("secondaryOutcomes", _OUTCOME),
+                _list("otherOutcomes", _OUTCOME),
+            ),
+            _struct(
+                "eligibilityModule",
+                _s(
+                    "eligibilityCriteria",
+                    "sex",
+                    "genderDescription",
+                    "minimumAge",
+                    "maximumAge",
+                    "studyPopulation",
+                    "samplingMethod",
+                ),
+                _b("healthyVolunteers", "genderBased"),
+                _list("stdAges", pa.string()),
+            ),
+            _struct(
+                "contactsLocationsModule",
+                _list("centralContacts", _CONTACT),
+                _list("overallOfficials", pa.struct(_s("name", "affiliation", "role"))),
+                _list(
+                    "locations",
+                    pa.struct(
+                        _s("facility", "status", "city", "state", "zip", "country")
+                        + [
+                            _list("contacts", _CONTACT),
+                            _struct(
+                                "geoPoint",
+                                pa.field("lat", pa.float64()),
+                                pa.field("lon", pa.float64()),
+                            ),
+                        ]
+                    ),
+                ),
+            ),
+            _struct(
+                "referencesModule",
+                _list(
+                    "references",
+                    pa.struct(
+                        _s("pmid", "type", "citation")
+                        + [_list("retractions", pa.struct(_s("pmid", "source")))]
+                    ),
+                ),
+                _list("seeAlsoLinks", pa.struct(_s("label", "url"))),
+                _list("availIpds", pa.struct(_s("id", "type", "url", "comment"))),
+            ),
+            _struct(
+                "ipdSharingStatementModule",
+                _s("ipdSharing", "description", "timeFrame", "accessCriteria", "url"),
+                _list("infoTypes", pa.string()),
+            ),
+        ),
+        _struct(
+            "resultsSection",
+            _struct(
+                "participantFlowModule",
+                _s("preAssignmentDetails", "recruitmentDetails", "typeUnitsAnalyzed"),
+                _list("groups", pa.struct(_s("id", "title", "description"))),
+                _list(
+                    "periods",
+                    pa.struct(
+                        _s("title")
+                        + [
+                            _list(
+                                "milestones",
+                                pa.struct(
+                                    _s("type", "comment")
+                                    + [
+                                        _list(
+                                            "achievements",
+                                            pa.struct(
+                                                _s("groupId", "comment", "numSubjects", "numUnits")
+                                            ),
+                                        )
+                                    ]
+                                ),
+                            ),
+                            _list(
+                                "dropWithdraws",
+                                pa.struct(
+                                    _s("type", "comment")
+                                    + [
+                                        _list(
+                                            "reasons",
+                                            pa.struct(_s("groupId", "comment", "numSubjects")),
+                                        )
+                                    ]
+                                ),
+                            ),
+                        ]
+                    ),
+                ),
+            ),
+            _struct(
+                "moreInfoModule",
+                _struct("limitationsAndCaveats", _s("description")),
+                _struct(
+                    "certainAgreement",
+                    _b("piSponsorEmployee", "restrictiveAgreement"),
+                    _s("restrictionType", "otherDetails"),
+                ),
+                _struct(
+                    "pointOfContact", _s("title", "organization", "email", "phone", "phoneExt")
+                ),
+            ),
+        ),
+        _struct(
+            "annotationSection",
+            _struct(
+                "annotationModule",
+                _struct(
+                    "unpostedAnnotation",
+                    _s("unpostedResponsibleParty"),
+                    _list(
+                        "unpostedEvents",
+                        pa.struct(_s("type", "date") + _b("dateUnknown")),
+                    ),
+                ),
+                _struct(
+                    "violationAnnotation",
+                    _list(
+                        "violationEvents",
+                        pa.struct(
+                            _s(
+                                "type",
+                                "description",
+                                "creationDate",
+                                "issuedDate",
+                                "releaseDate",
+                                "postedDate",
+                            )
+                        ),
+                    ),
+                ),
+            ),
+        ),
+        _struct(
+            "documentSection",
+            _struct(
+                "largeDocumentModule",
+                _b("noSap"),
+                _list(
+                    "largeDocs",
+                    pa.struct(
+                        _s("typeAbbrev", "label", "date", "uploadDate", "filename")
+                        + _b("hasProtocol", "hasSap", "hasIcf")
+                        + [pa.field("size", pa.int64())]
+                    ),
+                ),
+            ),
+        ),
+        _struct(
+            "derivedSection",
+            _struct(
+                "miscInfoModule",
+                _s("versionHolder"),
+                _list("removedCountries", pa.string()),
+                _struct(
+                    "submissionTracking",
+                    _s("estimatedResultsFirstSubmitDate"),
+                    _struct("firstMcpInfo", _date_struct("postDateStruct")),
+                    _list(
+                        "submissionInfos",
+                        pa.struct(
+                            _s("releaseDate", "unreleaseDate", "resetDate")
+                            + _b("unreleaseDateUnknown")
+                            + [pa.field("mcpReleaseN", pa.int64())]
+                        ),
+                    ),
+                ),
+            ),
+            _struct(
+                "conditionBrowseModule",
+                _list("meshes", _MESH),
+                _list("ancestors", _MESH),
+            ),
+            _struct(
+                "interventionBrowseModule",
+                _list("meshes", _MESH),
+                _list("ancestors", _MESH),
+            ),
+        ),
+        pa.field("hasResults", pa.bool_()),
+    ]
+)
+
+# Parts of the document that are deliberately left out of STUDY_TYPE. They are kept verbatim
+# in the unmapped column and are not reported as drift.
+UNTYPED_PATHS = {
+    "resultsSection.baselineCharacteristicsModule",
+    "resultsSection.outcomeMeasuresModule",
+    "resultsSection.adverseEventsModule",
+    "derivedSection.conditionBrowseModule.browseLeaves",
+    "derivedSection.conditionBrowseModule.browseBranches",
+    "derivedSection.interventionBrowseModule.browseLeaves",
+    "derivedSection.interventionBrowseModule.browseBranches",
+}
+
+# study fields summarised per page and file (min/max) so readers can prune without opening
+# files. Paths into STUDY_TYPE
+STAT_FIELDS = {
+    "nct_id": ["protocolSection", "identificationModule", "nctId"],
+    "last_updated": ["protocolSection", "statusModule", "lastUpdatePostDateStruct", "date"],
+}
+
+LANDING_SCHEMA = pa.schema(
+    [
+        pa.field("studies", STUDY_TYPE),
+        # JSON of everything in the study that STUDY_TYPE does not hold, so nothing is lost
+        pa.field("unmapped", pa.string()),
+        pa.field("nextPageToken", pa.string()),
+    ],
+    metadata={"clinexa.landing_schema_version": LANDING_SCHEMA_VERSION},
+)
+
+# identifies the exact physical schema, including changes that forgot to bump the version
+LANDING_SCHEMA_FINGERPRINT = hashlib.sha256(LANDING_SCHEMA.serialize().to_pybytes()).hexdigest()[:16]
+
+
+class _StructLayout:
+    """
+    Field names of a struct type, and its fields that hold structs (directly or as list
+    elements), which are the only ones an unknown key can hide under.
+    """
+
+    def __init__(self, arrow_type: pa.StructType):
+        self.names = frozenset(field.name for field in arrow_type)
+        self.nested: List[Tuple[str, bool, "_StructLayout"]] = []
+        for field in arrow_type:
+            if pa.types.is_struct(field.type):
+                self.nested.append((field.name, False, _StructLayout(field.type)))
+            elif pa.types.is_list(field.type) and pa.types.is_struct(field.type.value_type):
+                self.nested.append((field.name, True, _StructLayout(field.type.value_type)))
+
+
+_STUDY_LAYOUT = _StructLayout(STUDY_TYPE)
+
+
+class LandingEncoder:
+    """
+    Encodes API pages straight into Arrow record batches with the pinned LANDING_SCHEMA.
+
+    Building the batch from the JSON with a declared type avoids pandas object boxing and
+    per-page type inference, and gives every landed page the same schema regardless of which
+    optional fields happen to appear on it.
+
+    Drift handling:
+    - Unknown fields: keys that STUDY_TYPE does not declare (outside UNTYPED_PATHS) are
+      reported as drift. Their values are stored in the unmapped column as a JSON object that
+      mirrors the document structure; list elements are keyed by their index.
+    - Type mismatches: if a page does not fit the pinned types, it is re-encoded with
+      mismatched values nulled out. Those values are reported as drift and kept in unmapped.
+
+    Every newly seen drift path is logged once as a warning. Counts are available in
+    drift_counts and are safe to read after concurrent use from writer threads.
+
+    Attributes:
+        drift_counts (Dict[str, int]): Occurrences per drifted path. "[]" marks list elements
+            and a " (type)" suffix marks a type mismatch rather than an unknown field
+    """
+
+    def __init__(self):
+        self.log = logging.getLogger("airflow.task")
+        self.drift_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def encode(self, data: Dict) -> pa.RecordBatch:
+        """
+        Encode one API response page.
+
+        Args:
+            data (Dict): JSON response data from the API
+
+        Returns:
+            pa.RecordBatch: One row per study, conforming to LANDING_SCHEMA
+        """
+        studies = data.get("studies", [])
+        drift: Dict[str, int] = {}
+
+        unmapped = [self._unmapped(study, _STUDY_LAYOUT, "", drift) for study in studies]
+
+        try:
+            typed = pa.array(studies, type=STUDY_TYPE)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            self.log.warning(f"Page does not match landing schema v{LANDING_SCHEMA_VERSION}: {e}")
+            coerced = []
+            for i, study in enumerate(studies):
+                value, lost = self._coerce(study, STUDY_TYPE, "", drift)
+                coerced.append(value)
+                if lost is not None:
+                    unmapped[i] = self._merge(unmapped[i] or {}, lost)
+            typed = pa.array(coerced, type=STUDY_TYPE)
+
+        self._record_drift(drift)
+
+        return pa.RecordBatch.from_arrays(
+            [
+                typed,
+                pa.array(
+                    [json.dumps(u) if u else None for u in unmapped], type=pa.string()
+                ),
+                pa.array([data.get("nextPageToken")] * len(studies), type=pa.string()),
+            ],
+            schema=LANDING_SCHEMA,
+        )
+
+    def _unmapped(self, value, layout: _StructLayout, path: str, drift: Dict):
+        """
+        Collect the parts of a struct value that layout does not declare.
+
+        Keys are compared as sets, and only the struct and list-of-struct fields present are
+        descended into, so documents without drift are checked without visiting their
+        scalar fields one by one.
+        """
+        if not isinstance(value, dict):
+            return None  # type mismatch, handled by _coerce
+
+        remainder = {}
+        if not value.keys() <= layout.names:
+            for key, child in value.items():
+                if key not in layout.names:
+                    remainder[key] = child
+                    child_path = f"{path}.{key}" if path else key
+                    if child_path not in UNTYPED_PATHS:
+                        drift[child_path] = drift.get(child_path, 0) + 1
+
+        for key, is_list, child_layout in layout.nested:
+            child = value.get(key)
+            if child is None:
+                continue
+            child_path = f"{path}.{key}" if path else key
+            if not is_list:
+                child_remainder = self._unmapped(child, child_layout, child_path, drift)
+            elif isinstance(child, list):
+                child_remainder = {}
+                for i, item in enumerate(child):
+                    item_remainder = self._unmapped(item, child_layout, f"{child_path}[]", drift)
+                    if item_remainder is not None:
+                        child_remainder[str(i)] = item_remainder
+            else:
+                continue
+            if child_remainder:
+                remainder[key] = child_remainder
+        return remainder or None
+
+    def _coerce(self, value, arrow_type: pa.DataType, path: str, drift: Dict) -> Tuple:
+        """
+        Fit value to arrow_type.
+
+        Returns:
+            Tuple of (value that converts to arrow_type, original values that did not fit or None)
+        """
+        if value is None:
+            return None, None
+
+        if pa.types.is_struct(arrow_type):
+            if not isinstance(value, dict):
+                return self._mismatch(value, path, drift)
+
+            typed, lost = {}, {}
+            for field in arrow_type:
+                child_path = f"{path}.{field.name}" if path else field.name
+                typed[field.name], child_lost = self._coerce(
+                    value.get(field.name), field.type, child_path, drift
+                )
+                if child_lost is not None:
+                    lost[field.name] = child_lost
+            return typed, lost or None
+
+        if pa.types.is_list(arrow_type):
+            if not isinstance(value, list):
+                return self._mismatch(value, path, drift)
+
+            typed, lost = [], {}
+            for i, item in enumerate(value):
+                item_typed, item_lost = self._coerce(item, arrow_type.value_type, f"{path}[]", drift)
+                typed.append(item_typed)
+                if item_lost is not None:
+                    lost[str(i)] = item_lost
+            return typed, lost or None
+
+        if pa.types.is_boolean(arrow_type):
+            fits = isinstance(value, bool)
+        elif pa.types.is_integer(arrow_type):
+            fits = isinstance(value, int) and not isinstance(value, bool)
+        elif pa.types.is_floating(arrow_type):
+            fits = isinstance(value, (int, float)) and not isinstance(value, bool)
+        else:
+            fits = isinstance(value, str)
+
+        return (value, None) if fits else self._mismatch(value, path, drift)
+
+    @staticmethod
+    def _mismatch(value, path: str, drift: Dict) -> Tuple:
+        key = f"{path} (type)"
+        drift[key] = drift.get(key, 0) + 1
+        return None, value
+
+    def _merge(self, target: Dict, source: Dict) -> Dict:
+        for key, value in source.items():
+            if isinstance(value, dict) and isinstance(target.get(key), dict):
+                self._merge(target[key], value)
+            else:
+                target[key] = value
+        return target
+
+    def _record_drift(self, drift: Dict[str, int]) -> None:
+        with self._lock:
+            for path, count in drift.items():
+                if path not in self.drift_counts:
+                    self.log.warning(
+                        f"Schema drift against landing schema v{LANDING_SCHEMA_VERSION}: {path}"
+                    )
+                self.drift_counts[path] = self.drift_counts.get(path, 0) + count
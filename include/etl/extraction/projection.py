@@ -0,0 +1,39 @@
+from typing import Dict, List
+
+from include.etl.transformation.transformer_config import NESTED_FIELDS, SINGLE_FIELDS
+
+
+PROJECTIONS = ("warehouse", "full")
+
+
+def build_fields_projection(
+    single_fields: Dict[str, str] = SINGLE_FIELDS,
+    nested_fields: Dict[str, Dict] = NESTED_FIELDS,
+) -> List[str]:
+    """
+    Derive the API `fields` projection from the transformer config.
+
+    Every SINGLE_FIELDS path and every NESTED_FIELDS index_field is requested. The API returns
+    the whole subtree of a branch path, so nested entities come back with all of their fields,
+    and paths already covered by a requested ancestor are dropped to keep the URL short.
+
+    Args:
+        single_fields (Dict[str, str]): Column name -> dotted study path
+        nested_fields (Dict[str, Dict]): Entity name -> config with an index_field path
+
+    Returns:
+        List[str]: Sorted dotted paths to pass as the fields query parameter
+    """
+    paths = set(single_fields.values())
+    paths.update(
+        entity["index_field"] for entity in nested_fields.values() if entity.get("index_field")
+    )
+
+    projection = []
+    for path in sorted(paths):
+        # sorted order puts an ancestor directly before its descendants
+        if projection and path.startswith(f"{projection[-1]}."):
+            continue
+        projection.append(path)
+
+    return projection
@@ -0,0 +1,215 @@
+import abc
+import fcntl
+import logging
+import os
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # only required by RedisRateLimiter
+    redis = None
+
+
+class RateLimiter(abc.ABC):
+    """
+    Smooth request pacing using the generic cell rate algorithm (GCRA), a token bucket
+    expressed as a single timestamp.
+
+    The bucket state is the theoretical arrival time (TAT) of the next request. Every call to
+    acquire reserves the next free slot and sleeps until it is due, so callers are spaced
+    `window / max_requests` seconds apart instead of bursting the whole quota and stalling.
+    `burst` allows that many requests back to back after an idle period.
+
+    Because the state is one number, it can live in any store that supports an atomic
+    read-modify-write. Subclasses only implement `reserve`, which atomically advances the TAT
+    and returns how long the caller must wait. Sharing the store shares the quota, so every
+    extract task on every worker draws from the same API budget.
+
+    Attributes:
+        max_requests (int): Requests allowed per window
+        window (float): Window length in seconds
+        burst (int): Requests allowed back to back after an idle period
+        interval (float): Seconds between requests at the sustained rate
+        tolerance (float): How far ahead of the TAT a request may run (burst allowance)
+    """
+
+    def __init__(self, max_requests: int = 50, window: float = 60, burst: int = 1):
+        self.max_requests = max_requests
+        self.window = window
+        self.burst = max(burst, 1)
+        self.interval = window / max_requests
+        self.tolerance = (self.burst - 1) * self.interval
+        self.log = logging.getLogger("airflow.task")
+
+    def schedule(self, tat: float | None, now: float) -> tuple[float, float]:
+        """
+        Reserve a slot against the current bucket state.
+
+        Args:
+            tat: Stored theoretical arrival time, or None for an empty bucket
+            now: Current time on the store's clock
+
+        Returns:
+            Tuple of (seconds to wait, new theoretical arrival time)
+        """
+        tat = max(tat if tat is not None else now, now)
+        wait = max(tat - self.tolerance - now, 0.0)
+        return wait, tat + self.interval
+
+    @abc.abstractmethod
+    def reserve(self) -> float:
+        """Atomically reserve the next slot and return the seconds to wait for it."""
+
+    def acquire(self) -> float:
+        """
+        Block until the caller may send a request.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        wait = self.reserve()
+        if wait > 0:
+            self.log.debug(f"Rate limiter pacing request by {wait:.2f}s")
+            time.sleep(wait)
+        return wait
+
+
+class LocalRateLimiter(RateLimiter):
+    """In-process bucket. Only paces threads of a single extractor."""
+
+    def __init__(self, max_requests: int = 50, window: float = 60, burst: int = 1):
+        super().__init__(max_requests, window, burst)
+        self._lock = threading.Lock()
+        self._tat: float | None = None
+
+    def reserve(self) -> float:
+        with self._lock:
+            wait, self._tat = self.schedule(self._tat, time.monotonic())
+        return wait
+
+
+class FileRateLimiter(RateLimiter):
+    """
+    Bucket stored in a local file guarded by an exclusive flock.
+
+    Shares the quota between processes on the same host, which makes it a stand-in for the
+    Redis backend in local runs and tests.
+    """
+
+    def __init__(
+        self, path: str, max_requests: int = 50, window: float = 60, burst: int = 1
+    ):
+        super().__init__(max_requests, window, burst)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def reserve(self) -> float:
+        with open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                stored = f.read().strip()
+                tat = float(stored) if stored else None
+
+                wait, new_tat = self.schedule(tat, time.time())
+
+                f.seek(0)
+                f.truncate()
+                f.write(repr(new_tat))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return wait
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Bucket stored in Redis and shared by every Celery worker and DAG run.
+
+    The reservation runs as a Lua script so it is atomic across clients, and it uses the Redis
+    server clock so worker clock skew does not affect pacing. The key expires once the bucket
+    has been idle for a full window.
+    """
+
+    # returns the wait as a string: Lua numbers are truncated to integers in replies
+    RESERVE_SCRIPT = """
+    local interval = tonumber(ARGV[1])
+    local tolerance = tonumber(ARGV[2])
+    local ttl_ms = tonumber(ARGV[3])
+
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+    local tat = tonumber(redis.call('GET', KEYS[1])) or now
+    if tat < now then
+        tat = now
+    end
+
+    local wait = tat - tolerance - now
+    if wait < 0 then
+        wait = 0
+    end
+
+    redis.call('SET', KEYS[1], tostring(tat + interval), 'PX', ttl_ms)
+    return tostring(wait)
+    """
+
+    def __init__(
+        self,
+        url: str,
+        key: str = "ctgov_api",
+        max_requests: int = 50,
+        window: float = 60,
+        burst: int = 1,
+    ):
+        if redis is None:
+            raise ImportError(
+                "The redis package is required for the redis rate limiter backend"
+            )
+
+        super().__init__(max_requests, window, burst)
+        self.key = f"rate_limiter:{key}"
+        self.client = redis.Redis.from_url(url)
+        self._reserve = self.client.register_script(self.RESERVE_SCRIPT)
+
+    def reserve(self) -> float:
+        ttl_ms = int((self.window + self.tolerance) * 1000)
+        wait = self._reserve(
+            keys=[self.key], args=[self.interval, self.tolerance, ttl_ms]
+        )
+        return float(wait)
+
+
+def build_rate_limiter(
+    backend: str,
+    max_requests: int = 50,
+    window: float = 60,
+    burst: int = 1,
+    redis_url: str | None = None,
+    lock_path: str | None = None,
+    key: str = "ctgov_api",
+) -> RateLimiter:
+    """
+    Build a rate limiter for the configured backend.
+
+    Args:
+        backend: One of "local", "file" or "redis"
+        max_requests: Requests allowed per window
+        window: Window length in seconds
+        burst: Requests allowed back to back after an idle period
+        redis_url: Connection URL for the redis backend
+        lock_path: State file for the file backend
+        key: Name of the shared bucket. Limiters with the same key share a quota
+
+    Returns:
+        RateLimiter
+    """
+    if backend == "local":
+        return LocalRateLimiter(max_requests, window, burst)
+    if backend == "file":
+        return FileRateLimiter(lock_path, max_requests, window, burst)
+    if backend == "redis":
+        return RedisRateLimiter(redis_url, key, max_requests, window, burst)
+
+    raise ValueError(f"Unknown rate limiter backend: {backend}")
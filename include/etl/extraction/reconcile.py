@@ -0,0 +1,160 @@
+import hashlib
+import io
+import json
+import logging
+import re
+import struct
+from typing import Dict, List
+
+import pyarrow.parquet as pq
+
+from include.etl.extraction.compaction import sidecar_key
+from include.etl.extraction.landing import LANDING_SCHEMA_VERSION
+
+
+def reconcile_landing(
+    s3_hook, bucket: str, prefix: str, request: Dict, verify_checksums: bool = True
+) -> Dict:
+    """
+    Rebuild extraction progress from the landing files already in S3.
+
+    Sidecars under {prefix}/_landing/ are walked in page order from page 1. A file is accepted
+    when it continues the chain (its first page follows the previous file's last page), was
+    written with the same API request and landing schema version, and the object matches its
+    sidecar:
+    - size equals the recorded byte count
+    - the Parquet footer has the recorded row groups, and each row group holds exactly the
+      rows of the pages recorded in it
+    - the SHA-256 of the object matches (when verify_checksums is set)
+
+    The walk stops at the first file that fails. Files after that point, files without a
+    sidecar and sidecars without a file are deleted: the pages they hold are fetched again,
+    and removing them keeps duplicate or partial data out of the prefix.
+
+    Only this writer's own objects are considered: {prefix}/pages-*.parquet and their sidecars,
+    directly under the prefix. An unsharded prefix ({ds}) is the parent of the shard prefixes
+    ({ds}/{shard_id}), and may hold files of older layouts, none of which are touched.
+
+    Args:
+        s3_hook: S3 connection hook
+        bucket (str): Landing bucket
+        prefix (str): Prefix of the run (or shard) being resumed
+        request (Dict): API query of the current extractor. Files fetched with a different
+            query (filters or projection) cannot be resumed from
+        verify_checksums (bool): Stream every object to verify its checksum. Size and footer
+            checks are always done
+
+    Returns:
+        Dict: State in the shape of StateHandler.determine_state
+    """
+    log = logging.getLogger("airflow.task")
+    client = s3_hook.get_conn()
+
+    own_data_key = re.compile(rf"{re.escape(prefix)}/pages-\d+\.parquet")
+    own_sidecar_key = re.compile(rf"{re.escape(prefix)}/_landing/pages-\d+\.parquet\.json")
+
+    keys = s3_hook.list_keys(bucket_name=bucket, prefix=f"{prefix}/") or []
+    sidecar_keys = sorted(k for k in keys if own_sidecar_key.fullmatch(k))
+    data_keys = {k for k in keys if own_data_key.fullmatch(k)}
+
+    sidecars = []
+    for key in sidecar_keys:
+        try:
+            sidecars.append(json.loads(s3_hook.read_key(key, bucket_name=bucket)))
+        except Exception as e:
+            log.warning(f"Unreadable sidecar {key}: {e}")
+    sidecars.sort(key=lambda s: s["first_page"])
+
+    files: List[Dict] = []
+    next_page = 1
+    for sidecar in sidecars:
+        if sidecar["first_page"] != next_page:
+            break
+
+        problem = _verify(client, bucket, sidecar, request, data_keys, verify_checksums)
+        if problem:
+            log.warning(f"Stopping resume at page {next_page}: {sidecar['key']} {problem}")
+            break
+
+        files.append({k: v for k, v in sidecar.items() if k not in ("request", "schema_version")})
+        next_page = sidecar["last_page"] + 1
+
+    verified = {f["key"] for f in files}
+    stale = sorted(
+        [k for k in data_keys if k not in verified]
+        + [k for k in sidecar_keys if k not in {sidecar_key(f) for f in verified}]
+    )
+    if stale:
+        log.warning(f"Deleting {len(stale)} unverified landing objects under {prefix}/")
+        s3_hook.delete_objects(bucket=bucket, keys=stale)
+
+    state = {
+        "last_saved_page": 0,
+        "last_saved_token": None,
+        "previous_token": None,
+        "landing_files": files,
+    }
+    if files:
+        last_page = files[-1]["pages"][-1]
+        state.update(
+            {
+                "last_saved_page": last_page["page"],
+                "last_saved_token": last_page["next_page_token"],
+                "previous_token": last_page["page_token"],
+            }
+        )
+
+    log.info(
+        f"Storage reconciliation: {len(files)} verified landing files, "
+        f"pages 1-{state['last_saved_page']} under s3://{bucket}/{prefix}/"
+    )
+    return state
+
+
+def _verify(
+    client, bucket: str, sidecar: Dict, request: Dict, data_keys: set, verify_checksums: bool
+) -> str | None:
+    """Return why a landing file cannot be resumed from, or None if it checks out."""
+    key = sidecar["key"]
+    if key not in data_keys:
+        return "is missing"
+    if sidecar.get("request") != request:
+        return "was fetched with a different API request"
+    if sidecar.get("schema_version") != LANDING_SCHEMA_VERSION:
+        return f"has landing schema v{sidecar.get('schema_version')}"
+
+    size = client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+    if size != sidecar["bytes"]:
+        return f"is {size} bytes, expected {sidecar['bytes']}"
+
+    metadata = _read_footer(client, bucket, key, size)
+    if metadata.num_row_groups != sidecar["row_groups"]:
+        return f"has {metadata.num_row_groups} row groups, expected {sidecar['row_groups']}"
+
+    expected_rows = [0] * metadata.num_row_groups
+    for page in sidecar["pages"]:
+        expected_rows[page["row_group"]] += page["rows"]
+    actual_rows = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+    if actual_rows != expected_rows:
+        return f"has row groups of {actual_rows} rows, expected {expected_rows}"
+
+    if verify_checksums:
+        digest = hashlib.sha256()
+        body = client.get_object(Bucket=bucket, Key=key)["Body"]
+        for chunk in body.iter_chunks(chunk_size=1024 * 1024):
+            digest.update(chunk)
+        if digest.hexdigest() != sidecar["sha256"]:
+            return "does not match its checksum"
+
+    return None
+
+
+def _read_footer(client, bucket: str, key: str, size: int) -> pq.FileMetaData:
+    """Read Parquet metadata with two ranged GETs instead of downloading the object."""
+    tail = client.get_object(Bucket=bucket, Key=key, Range=f"bytes={size - 8}-")["Body"].read()
+    footer_length = struct.unpack("<I", tail[:4])[0]
+
+    start = size - 8 - footer_length
+    footer = client.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-")["Body"].read()
+    # the leading magic only makes the buffer look like a file. metadata offsets are not followed
+    return pq.read_metadata(io.BytesIO(b"PAR1" + footer))
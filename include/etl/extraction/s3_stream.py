@@ -0,0 +1,199 @@
+import hashlib
+import io
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List
+
+# S3 rejects multipart parts below 5 MiB (except the last one)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class S3MultipartWriter(io.RawIOBase):
+    """
+    Write-only file object that streams into an S3 multipart upload.
+
+    Bytes written are appended to a part buffer. Each time the buffer reaches part_size it is
+    handed to a thread pool as the next UploadPart and a fresh buffer is started, so encoding
+    continues while earlier parts are in flight. At most max_in_flight parts are uploading at
+    once; write blocks when that limit is reached, which caps memory at roughly
+    (max_in_flight + 1) * part_size however large the object grows. The full payload is never
+    held or copied as one buffer. A SHA-256 of the object is computed as it is written.
+
+    The upload is only created once the first part is full. An object smaller than one part
+    is sent with a single PutObject on close.
+
+    Closing completes the upload. Call abort instead to discard it, which also removes any
+    parts already uploaded. An error from a background part surfaces on the next write or on
+    close.
+
+    Attributes:
+        client: boto3 S3 client
+        bucket (str): Destination bucket
+        key (str): Destination key
+        part_size (int): Bytes per part (at least MIN_PART_SIZE)
+        max_in_flight (int): Maximum parts uploading concurrently
+        stats (Dict): Set once the upload completes:
+            - bytes, parts
+            - sha256: hex digest of the object
+            - seconds: time spent in S3 requests, summed over parts
+            - mib_per_second: bytes / seconds, the throughput of a single upload connection
+            - blocked_seconds: time the writer waited on uploads (full in-flight slots and
+              completion), i.e. what uploading added to the caller
+    """
+
+    def __init__(
+        self,
+        client,
+        bucket: str,
+        key: str,
+        part_size: int = 16 * 1024 * 1024,
+        max_in_flight: int = 4,
+    ):
+        super().__init__()
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.max_in_flight = max(max_in_flight, 1)
+        self.stats: Dict = {}
+        self.log = logging.getLogger("airflow.task")
+
+        self._buffer = bytearray()
+        self._position = 0
+        self._sha256 = hashlib.sha256()
+        self._upload_id: str | None = None
+        self._parts: List[Future] = []
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._pool: ThreadPoolExecutor | None = None
+        self._request_seconds = 0.0
+        self._blocked_seconds = 0.0
+        self._timing_lock = threading.Lock()
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("write to closed S3MultipartWriter")
+        self._raise_part_error()
+
+        view = memoryview(data).cast("B")
+        self._buffer += view
+        self._sha256.update(view)
+        self._position += len(view)
+
+        if len(self._buffer) >= self.part_size:
+            self._submit_part()
+        return len(view)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+
+        start = time.perf_counter()
+        try:
+            if self._upload_id is None:
+                # small object, a single request is cheaper than a multipart upload
+                self.client.put_object(Bucket=self.bucket, Key=self.key, Body=self._buffer)
+                part_count = 1
+            else:
+                if self._buffer:
+                    self._submit_part()
+                parts = [future.result() for future in self._parts]
+                self.client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    UploadId=self._upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+                part_count = len(parts)
+        except Exception:
+            self.abort()
+            raise
+
+        waited = time.perf_counter() - start
+        self._blocked_seconds += waited
+        if self._upload_id is None:
+            self._request_seconds += waited
+
+        seconds = self._request_seconds
+        self.stats = {
+            "bytes": self._position,
+            "parts": part_count,
+            "sha256": self._sha256.hexdigest(),
+            "seconds": round(seconds, 4),
+            "mib_per_second": round(self._position / 1024 / 1024 / seconds, 2) if seconds else None,
+            "blocked_seconds": round(self._blocked_seconds, 4),
+        }
+        self.log.info(
+            f"Uploaded s3://{self.bucket}/{self.key}: {self._position} bytes in {part_count} "
+            f"part(s), {self.stats['mib_per_second']} MiB/s per connection, "
+            f"writer blocked {self.stats['blocked_seconds']}s"
+        )
+
+        self._shutdown()
+        super().close()
+
+    def abort(self) -> None:
+        """Discard the upload and any parts already sent."""
+        if self.closed:
+            return
+
+        self._shutdown()
+        if self._upload_id is not None:
+            try:
+                self.client.abort_multipart_upload(
+                    Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+                )
+            except Exception as e:
+                self.log.error(f"Failed to abort multipart upload of {self.key}: {e}")
+        super().close()
+
+    def _submit_part(self) -> None:
+        if self._upload_id is None:
+            response = self.client.create_multipart_upload(Bucket=self.bucket, Key=self.key)
+            self._upload_id = response["UploadId"]
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_in_flight, thread_name_prefix="s3-part"
+            )
+
+        # blocks while max_in_flight parts are uploading
+        start = time.perf_counter()
+        self._slots.acquire()
+        self._blocked_seconds += time.perf_counter() - start
+
+        part_number = len(self._parts) + 1
+        body, self._buffer = self._buffer, bytearray()
+
+        future = self._pool.submit(self._upload_part, part_number, body)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._parts.append(future)
+
+    def _upload_part(self, part_number: int, body: bytearray) -> Dict:
+        start = time.perf_counter()
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+        with self._timing_lock:
+            self._request_seconds += time.perf_counter() - start
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    def _raise_part_error(self) -> None:
+        for future in self._parts:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+
+    def _shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        self._buffer = bytearray()
@@ -0,0 +1,157 @@
+import json
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List
+
+from airflow.utils.context import Context
+
+from include.etl.extraction.extraction import MANIFEST_VERSION, StateHandler
+from include.etl.extraction.landing import LANDING_SCHEMA_FINGERPRINT, LANDING_SCHEMA_VERSION
+from config.env_config import config
+
+
+def plan_shards(execution_date: str, boundaries: List[str] | None = None) -> List[Dict]:
+    """
+    Split the catalogue into disjoint shards by last update post date.
+
+    Each boundary date starts a new shard, so N boundaries produce N + 1 shards:
+    RANGE[MIN, b1 - 1 day], RANGE[b1, b2 - 1 day], ..., RANGE[bN, MAX]. The open-ended first
+    and last ranges guarantee every study falls into exactly one shard.
+
+    A study updated while the run is in progress can move from an earlier shard into the
+    last one and be seen twice (or, if its shard already finished, once). Downstream stages
+    dedupe on nct_id, and the next run picks up anything that moved.
+
+    Args:
+        execution_date (str): Logical date of the DAG run (YYYY-MM-DD)
+        boundaries (List[str]|None): Ascending shard start dates (YYYY-MM-DD). Defaults to
+            config.EXTRACT_SHARD_BOUNDARIES, or January 1st of every year from
+            config.EXTRACT_SHARD_START_YEAR up to the execution year when that is empty.
+            Later years hold most of the catalogue, so yearly shards are roughly balanced.
+
+    Returns:
+        List[Dict]: Shards as {"shard_id": str, "filter": str} for dynamic task mapping
+    """
+    if boundaries is None:
+        boundaries = config.EXTRACT_SHARD_BOUNDARIES or [
+            f"{year}-01-01"
+            for year in range(
+                config.EXTRACT_SHARD_START_YEAR, date.fromisoformat(execution_date).year + 1
+            )
+        ]
+
+    starts = ["MIN"] + sorted(boundaries)
+    shards = []
+    for i, lower in enumerate(starts):
+        if i + 1 < len(starts):
+            upper = (date.fromisoformat(starts[i + 1]) - timedelta(days=1)).isoformat()
+        else:
+            upper = "MAX"
+
+        shards.append(
+            {
+                "shard_id": f"{lower}_to_{upper}".lower(),
+                "filter": f"AREA[LastUpdatePostDate]RANGE[{lower},{upper}]",
+            }
+        )
+
+    return shards
+
+
+def merge_shard_manifests(context: Context, s3_hook, shard_results: Iterable[Dict]) -> Dict:
+    """
+    Combine the manifests returned by sharded extract tasks into a single run manifest,
+    and record the run's last update watermark once every shard has succeeded.
+
+    Args:
+        context (Context): Airflow task context of the merge task
+        s3_hook: S3 connection hook used to write the manifest
+        shard_results (Iterable[Dict]): Return values of the mapped extract tasks
+
+    Returns:
+        Dict: Extraction metadata for the whole run
+    """
+    log = logging.getLogger("airflow.task")
+    execution_date = context["ds"]
+
+    shard_manifests = [result["manifest"] for result in shard_results]
+    page_count = sum(m["metrics"]["page_count"] for m in shard_manifests)
+
+    # every shard of a run is extracted in the same mode
+    mode = shard_manifests[0]["mode"] if shard_manifests else "full"
+    prefix = f"delta/{execution_date}" if mode == "incremental" else execution_date
+
+    watermarks = [m["watermark"]["current"] for m in shard_manifests if m["watermark"]["current"]]
+    watermark = {
+        "previous": shard_manifests[0]["watermark"]["previous"] if shard_manifests else None,
+        "current": max(watermarks) if watermarks else None,
+    }
+
+    http_stats: Dict = {}
+    for m in shard_manifests:
+        for stat, value in m["metrics"].get("http", {}).items():
+            http_stats[stat] = http_stats.get(stat, 0) + value
+
+    drift: Dict = {}
+    for m in shard_manifests:
+        for path, count in m["schema"]["drift"].items():
+            drift[path] = drift.get(path, 0) + count
+
+    manifest = {
+        "manifest_version": MANIFEST_VERSION,
+        "location": f"s3://{config.CTGOV_BUCKET}/{prefix}",
+        "created_at": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+        "metrics": {
+            "page_count": page_count,
+            "shard_count": len(shard_manifests),
+            "file_count": sum(m["metrics"]["file_count"] for m in shard_manifests),
+            "row_count": sum(m["metrics"]["row_count"] for m in shard_manifests),
+            "upload": {
+                "bytes": sum(m["metrics"]["upload"]["bytes"] for m in shard_manifests),
+                "seconds": round(
+                    sum(m["metrics"]["upload"]["seconds"] for m in shard_manifests), 4
+                ),
+                "blocked_seconds": round(
+                    sum(m["metrics"]["upload"]["blocked_seconds"] for m in shard_manifests), 4
+                ),
+            },
+            "http": http_stats,
+        },
+        "mode": mode,
+        "projection": shard_manifests[0]["projection"] if shard_manifests else None,
+        "schema": {
+            "version": LANDING_SCHEMA_VERSION,
+            "fingerprint": LANDING_SCHEMA_FINGERPRINT,
+            "drift": drift,
+        },
+        # every landing file of the run, so readers need not walk the shards
+        "files": [{**f, "shard_id": m["shard"]["shard_id"]} for m in shard_manifests for f in m["files"]],
+        "watermark": watermark,
+        "shards": shard_manifests,
+        "lineage": {
+            "dag_id": context["dag"].dag_id,
+            "run_id": context["run_id"],
+            "execution_date": execution_date,
+        },
+    }
+
+    manifest_key = f"{prefix}_manifest.json"
+    s3_hook.load_string(
+        string_data=json.dumps(manifest, indent=2),
+        key=manifest_key,
+        bucket_name=config.CTGOV_BUCKET,
+        replace=True,
+    )
+    log.info(
+        f"Merged {len(shard_manifests)} shard manifests ({page_count} pages) "
+        f"into s3://{config.CTGOV_BUCKET}/{manifest_key}"
+    )
+
+    if watermark["current"]:
+        StateHandler(context, s3_hook=s3_hook).save_watermark(watermark["current"], mode)
+
+    return {
+        "pages_extracted": page_count,
+        "shard_count": len(shard_manifests),
+        "data_location": f"s3://{config.CTGOV_BUCKET}/{prefix}/",
+    }
@@ -0,0 +1,79 @@
+from typing import Dict, Tuple
+import numpy as np
+import pandas as pd
+
+from include.etl.transformation.transformer_config import SINGLE_FIELDS, SINGLE_FIELD_TYPES
+
+
+STRING_DTYPE = pd.StringDtype("pyarrow")
+
+_BOOLEANS = {True: True, False: False, "true": True, "false": False, "True": True, "False": False}
+
+
+def project_study_fields(
+    df_normalized: pd.DataFrame,
+    single_fields: Dict[str, str] = SINGLE_FIELDS,
+    field_types: Dict[str, str] = SINGLE_FIELD_TYPES,
+) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Build the study fact columns from normalized studies with one select and rename.
+
+    Paths missing from the batch become all-null columns. Every column is cast to its declared
+    type: values that cannot be coerced become null and are counted instead of raising.
+
+    Args:
+        df_normalized: Studies flattened to dotted-path columns, one row per study
+        single_fields: Column name -> dotted study path
+        field_types: Column name -> "date", "bool", "int" or "float". Others are strings
+
+    Returns:
+        Tuple of (study facts in single_fields order, column -> number of values that failed
+        to coerce, for columns with failures)
+    """
+    paths = list(single_fields.values())
+    df = df_normalized.reindex(columns=paths)
+    df.columns = list(single_fields)
+
+    failures = {}
+    for column in df.columns:
+        df[column], failed = cast_column(df[column], field_types.get(column, "string"))
+        if failed:
+            failures[column] = failed
+
+    return df, failures
+
+
+def cast_column(values: pd.Series, kind: str) -> Tuple[pd.Series, int]:
+    """
+    Cast a column to a warehouse type.
+
+    Returns:
+        Tuple of (cast column, number of non-null values that became null)
+    """
+    present = values.notna()
+
+    if kind == "date":
+        cast = parse_partial_dates(values)
+    elif kind == "bool":
+        cast = values.map(_BOOLEANS, na_action="ignore").astype("boolean")
+    elif kind == "int":
+        numbers = pd.to_numeric(values, errors="coerce")
+        numbers = numbers.where(numbers % 1 == 0)
+        cast = numbers.astype("Int64")
+    elif kind == "float":
+        cast = pd.to_numeric(values, errors="coerce").astype("Float64")
+    else:
+        cast = values.astype(STRING_DTYPE)
+
+    return cast, int((present & cast.isna()).sum())
+
+
+def parse_partial_dates(values: pd.Series) -> pd.Series:
+    """
+    Parse YYYY-MM-DD, YYYY-MM and YYYY strings. Partial dates resolve to the first day of the
+    month or year. Anything else becomes NaT.
+    """
+    text = values.astype(STRING_DTYPE).str.strip()
+    length = text.str.len().fillna(0).to_numpy()
+    padding = np.select([length == 7, length == 4], ["-01", "-01-01"], default="")
+    return pd.to_datetime(text + padding, format="%Y-%m-%d", errors="coerce")
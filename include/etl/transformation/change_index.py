@@ -0,0 +1,230 @@
+from typing import Dict
+import hashlib
+import logging
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from include.etl.transformation.extraction_plan import PLAN, ExtractionPlan
+from include.etl.transformation.study_reader import StudyReader
+from include.etl.extraction.landing import LANDING_SCHEMA_FINGERPRINT
+
+
+INSERTED = "inserted"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+DELETED = "deleted"
+
+_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_NULL_HASH = np.uint64(0x6A09E667F3BCC909)
+
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, so that combined hashes do not cancel out."""
+    h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def content_hashes(values: pa.Array) -> np.ndarray:
+    """
+    64-bit hash of each value of an Arrow array, nested values included.
+
+    Computed column by column: struct fields are combined in order, list elements with their
+    position, and scalars are hashed as strings. No value is converted to a Python object
+    except string leaves, which pandas hashes in C.
+
+    Returns:
+        np.ndarray: uint64 hash of each value
+    """
+    arrow_type = values.type
+    if pa.types.is_struct(arrow_type):
+        hashes = np.full(len(values), np.uint64(arrow_type.num_fields), dtype=np.uint64)
+        for i in range(arrow_type.num_fields):
+            hashes = _mix(hashes * _MULTIPLIER + content_hashes(pc.struct_field(values, [i])))
+    elif pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type):
+        parents = pc.list_parent_indices(values).to_numpy()
+        element_hashes = content_hashes(pc.list_flatten(values))
+        # position of each element within its list
+        positions = np.arange(len(parents)) - np.searchsorted(parents, parents)
+        element_hashes = _mix(element_hashes + positions.astype(np.uint64) * _MULTIPLIER)
+
+        lengths = pc.fill_null(pc.list_value_length(values), 0).to_numpy().astype(np.uint64)
+        hashes = lengths * _MULTIPLIER
+        if len(parents):
+            rows, starts = np.unique(parents, return_index=True)
+            hashes[rows] += np.add.reduceat(element_hashes, starts)
+        hashes = _mix(hashes)
+    else:
+        strings = values.cast(pa.string()).to_numpy(zero_copy_only=False)
+        hashes = pd.util.hash_array(strings, categorize=False)
+
+    valid = values.is_valid().to_numpy(zero_copy_only=False)
+    return np.where(valid, hashes, _NULL_HASH)
+
+
+def is_full_snapshot(manifest: Dict | None) -> bool:
+    """
+    Whether the landing files of an extraction manifest hold the whole registry, so studies
+    missing from them were deleted: a full-mode run manifest (see merge_shard_manifests or
+    Extractor.make_requests). Incremental deltas and single shards are not. Manifests written
+    before incremental extraction have no mode and were always full. Without a manifest
+    nothing is assumed to be deleted.
+    """
+    if not manifest or "shard" in manifest:
+        return False
+    return manifest.get("mode", "full") == "full"
+
+
+def plan_fingerprint(plan: ExtractionPlan = PLAN) -> str:
+    """Changes whenever the paths read, the output tables or the landing schema change."""
+    described = repr((plan.paths, plan.table_columns(), LANDING_SCHEMA_FINGERPRINT))
+    return hashlib.sha256(described.encode()).hexdigest()[:16]
+
+
+class ChangeIndex:
+    """
+    nct_id -> content hash and last update of every study as of the last successful run.
+
+    The hash covers every path of the extraction plan, so a study is unchanged when nothing
+    the transform reads from it has changed, even if it was re-landed. Unchanged studies are
+    skipped by the transform, and each run produces a change set of inserted, updated and
+    deleted NCT IDs for the loader.
+
+    The index is one Parquet file, replaced atomically by save() once a run has been loaded
+    (see Transformer.commit_run). It
+    records the plan fingerprint: after a change to the config or the landing schema every
+    study counts as updated. Deleting the file forces a full re-transform.
+
+    Args:
+        directory: Directory of the index file
+        plan: Compiled extraction plan, its paths are hashed
+    """
+
+    FILE_NAME = "study_versions.parquet"
+
+    def __init__(self, directory: str, plan: ExtractionPlan = PLAN):
+        self.directory = directory
+        self.path = os.path.join(directory, self.FILE_NAME)
+        self.plan = plan
+        self.fingerprint = plan_fingerprint(plan)
+        self.log = logging.getLogger("airflow.task")
+        self._previous: pd.DataFrame | None = None
+
+    @property
+    def previous(self) -> pd.DataFrame:
+        """The last successful run's index: nct_id (index), content_hash, last_updated."""
+        if self._previous is None:
+            self._previous = self._load()
+        return self._previous
+
+    def _load(self) -> pd.DataFrame:
+        empty = pd.DataFrame(
+            {"content_hash": pd.Series(dtype=np.int64), "last_updated": pd.Series(dtype=object)},
+            index=pd.Index([], name="nct_id", dtype=object),
+        )
+        try:
+            table = pq.read_table(self.path)
+        except FileNotFoundError:
+            return empty
+
+        fingerprint = (table.schema.metadata or {}).get(b"clinexa.plan_fingerprint", b"").decode()
+        if fingerprint != self.fingerprint:
+            self.log.warning(
+                f"Change index {self.path} was written for another extraction plan, "
+                f"every study will be transformed"
+            )
+            return empty
+        return table.to_pandas().set_index("nct_id")
+
+    def detect(self, studies: pa.StructArray) -> pd.DataFrame:
+        """
+        Classify a batch of studies against the last successful run.
+
+        Args:
+            studies: Landed study structs
+
+        Returns:
+            DataFrame aligned with studies: nct_id, content_hash (int64), last_updated and
+            change (inserted, updated or unchanged)
+        """
+        reader = StudyReader(studies, self.plan)
+        hashes = np.full(len(studies), np.uint64(len(self.plan.paths)), dtype=np.uint64)
+        for path in self.plan.paths:
+            hashes = _mix(hashes * _MULTIPLIER + content_hashes(reader.column(path)))
+
+        nct_path, _, _ = self.plan.single_fields["nct_id"]
+        updated_path, _, _ = self.plan.single_fields["last_updated"]
+        versions = pd.DataFrame(
+            {
+                "nct_id": reader.column(nct_path).to_numpy(zero_copy_only=False),
+                "content_hash": hashes.view(np.int64),
+                "last_updated": reader.column(updated_path).to_numpy(zero_copy_only=False),
+            }
+        )
+
+        position = self.previous.index.get_indexer(versions["nct_id"])
+        known = position >= 0
+        same = np.zeros(len(versions), dtype=bool)
+        same[known] = (
+            self.previous["content_hash"].to_numpy()[position[known]]
+            == versions["content_hash"].to_numpy()[known]
+        )
+        versions["change"] = np.select([same, known], [UNCHANGED, UPDATED], default=INSERTED)
+        return versions
+
+    def change_set(self, versions: pd.DataFrame, full_snapshot: bool) -> pd.DataFrame:
+        """
+        Changes of a run.
+
+        Args:
+            versions: detect() output of every study of the run
+            full_snapshot: The run saw the whole registry, so indexed studies it did not see
+                were deleted. Otherwise nothing is reported as deleted
+
+        Returns:
+            DataFrame of nct_id, change and last_updated, for changed studies only
+        """
+        changes = versions.loc[versions["change"] != UNCHANGED, ["nct_id", "change", "last_updated"]]
+        if full_snapshot:
+            deleted = self.previous.index.difference(pd.Index(versions["nct_id"]))
+            changes = pd.concat(
+                [
+                    changes,
+                    pd.DataFrame(
+                        {
+                            "nct_id": deleted,
+                            "change": DELETED,
+                            "last_updated": self.previous["last_updated"].reindex(deleted).to_numpy(),
+                        }
+                    ),
+                ],
+                ignore_index=True,
+            )
+        return changes.reset_index(drop=True)
+
+    def save(self, versions: pd.DataFrame, full_snapshot: bool) -> None:
+        """
+        Replace the index with the studies of a successful run. Without a full snapshot the
+        studies are upserted into the previous index instead.
+        """
+        current = versions.set_index("nct_id")[["content_hash", "last_updated"]]
+        if not full_snapshot:
+            current = pd.concat([self.previous.drop(current.index, errors="ignore"), current])
+
+        table = pa.Table.from_pandas(current.reset_index(), preserve_index=False)
+        table = table.replace_schema_metadata({"clinexa.plan_fingerprint": self.fingerprint})
+
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self.path)
+        self._previous = current
+
+    @staticmethod
+    def summary(changes: pd.DataFrame) -> Dict[str, int]:
+        counts = changes["change"].value_counts()
+        return {change: int(counts.get(change, 0)) for change in (INSERTED, UPDATED, DELETED)}
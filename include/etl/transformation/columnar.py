@@ -0,0 +1,567 @@
+from typing import Callable, Dict, List, Tuple
+import logging
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from include.etl.transformation.extraction_plan import PLAN, EntityPlan, ExtractionPlan
+from include.etl.transformation.data_quality import DataQualityHandler
+from include.etl.transformation.study_reader import StudyReader
+from include.etl.transformation.keys import keys_to_hex
+
+
+class ColumnarExtractor:
+    """
+    Extracts the nested entities of a whole batch of studies at once.
+
+    Works on the landed Arrow column of study structs instead of one normalized pandas row per
+    study. A list field is exploded for every study in one step (list_flatten plus
+    list_parent_indices to map each element back to its study), fields are read with
+    struct_field over the flattened elements, and keys are generated a column at a time.
+
+    Output tables have the same columns, keys and row order as the per-row extract_* methods
+    of Transformer, which remain the reference implementation (see
+    include/tests/transform_parity.py).
+
+    Args:
+        studies: StructArray of study documents (LANDING_SCHEMA "studies" column), already
+            filtered to studies with an NCT ID
+        study_keys: Surrogate key of each study, aligned with studies. Hex strings, or int64
+            when the batch key function produces int64 keys
+        generate_keys: Batch key function, Transformer.generate_keys
+        dimension_keys: Batch key function for dimension members (sponsors, conditions,
+            keywords, interventions, sites, contacts), Transformer.dimension_keys. Defaults to
+            generate_keys
+        dq_handler: Resolves conflicting location statuses
+        plan: Compiled extraction plan, see extraction_plan. Entities without a hand-written
+            method are extracted from it by extract_generic
+    """
+
+    def __init__(
+        self,
+        studies: pa.StructArray,
+        study_keys: np.ndarray,
+        generate_keys: Callable[..., np.ndarray],
+        dq_handler: DataQualityHandler = None,
+        dimension_keys: Callable[..., np.ndarray] = None,
+        plan: ExtractionPlan = PLAN,
+    ):
+        self.studies = studies
+        self.plan = plan
+        self.reader = StudyReader(studies, plan)
+        self.study_keys = np.asarray(study_keys)
+        # keys that include the study key always hash its hex form, so int64 keys stay
+        # convertible to the legacy hex keys
+        self.study_hex = (
+            keys_to_hex(self.study_keys)
+            if self.study_keys.dtype == np.int64
+            else self.study_keys.astype(object)
+        )
+        self.generate_keys = generate_keys
+        self.dimension_keys = dimension_keys or generate_keys
+        self.dq_handler = dq_handler or DataQualityHandler()
+        self.log = logging.getLogger("airflow.task")
+
+    def extract_all(self) -> Dict[str, pd.DataFrame]:
+        """
+        Returns:
+            Dict of table name -> DataFrame, before deduplication
+        """
+        tables = {}
+        tables["sponsors"], tables["study_sponsors"] = self.extract_sponsors()
+        tables["conditions"], tables["study_conditions"] = self.extract_conditions()
+        tables["keywords"], tables["study_keywords"] = self.extract_keywords()
+        tables["arm_group_interventions"] = self.extract_arm_groups()
+        tables["interventions"], tables["study_interventions"] = self.extract_interventions()
+        tables["central_contacts"], tables["study_central_contacts"] = (
+            self.extract_central_contacts()
+        )
+        tables["locations"], tables["study_locations"] = self.extract_locations()
+        tables["references"] = self.extract_references()
+        tables["links"] = self.extract_links()
+        tables["ipds"] = self.extract_ipds()
+        tables["flow_groups"] = self.extract_flow_groups()
+        tables["flow_period_events"] = self.extract_flow_events()
+        tables.update(self.extract_generic())
+        return tables
+
+    # ---- access helpers ----
+
+    def column(self, path: str | Tuple[str, ...]) -> pa.Array:
+        """Field at a dotted path, null wherever any ancestor is null. See StudyReader."""
+        return self.reader.column(path)
+
+    @staticmethod
+    def explode(lists: pa.Array) -> Tuple[np.ndarray, pa.Array]:
+        """
+        Flatten a list array.
+
+        Returns:
+            Tuple of (index of the parent row of each element, elements)
+        """
+        return pc.list_parent_indices(lists).to_numpy(), pc.list_flatten(lists)
+
+    @staticmethod
+    def explode_outer(lists: pa.Array) -> Tuple[np.ndarray, pa.Array, np.ndarray]:
+        """
+        Flatten a list array, keeping one null element for each empty or null list, in
+        parent order.
+
+        Returns:
+            Tuple of (parent index, elements, mask of the null placeholder elements)
+        """
+        parents, values = ColumnarExtractor.explode(lists)
+        lengths = pc.fill_null(pc.list_value_length(lists), 0).to_numpy()
+        empty = np.flatnonzero(lengths == 0)
+
+        parents = np.concatenate([parents, empty])
+        values = pa.concat_arrays([values, pa.nulls(len(empty), values.type)])
+        placeholder = np.concatenate(
+            [np.zeros(len(parents) - len(empty), dtype=bool), np.ones(len(empty), dtype=bool)]
+        )
+
+        order = np.argsort(parents, kind="stable")
+        return parents[order], values.take(pa.array(order)), placeholder[order]
+
+    @staticmethod
+    def field(values: pa.Array, name: str) -> pa.Array:
+        return pc.struct_field(values, [name])
+
+    @staticmethod
+    def py(values: pa.Array) -> np.ndarray:
+        """Arrow array as an object ndarray with None for nulls."""
+        return np.array(values.to_pylist(), dtype=object)
+
+    @staticmethod
+    def typed(values: pa.Array) -> np.ndarray | pd.Series:
+        """Booleans and integers as nullable pandas columns, anything else as with py."""
+        if pa.types.is_boolean(values.type):
+            return values.to_pandas().astype("boolean")
+        if pa.types.is_integer(values.type):
+            return values.to_pandas(integer_object_nulls=True).astype("Int64")
+        return ColumnarExtractor.py(values)
+
+    def keys(self, *columns) -> np.ndarray:
+        return self.generate_keys(*columns)
+
+    @staticmethod
+    def in_order(df: pd.DataFrame, *order: np.ndarray) -> pd.DataFrame:
+        """Stable sort by the given positions (most significant first)."""
+        if len(df) == 0:
+            return df.reset_index(drop=True)
+        return df.iloc[np.lexsort(order[::-1])].reset_index(drop=True)
+
+    # ---- entities ----
+
+    def extract_sponsors(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        lead = self.column(self.plan.entities["sponsor"].index_field)
+        lead_name, lead_class = self.field(lead, "name"), self.field(lead, "class")
+        has_lead = pc.and_(lead_name.is_valid(), lead_class.is_valid()).to_numpy(
+            zero_copy_only=False
+        )
+        lead_idx = np.flatnonzero(has_lead)
+        if len(lead_idx) < len(self.studies):
+            self.log.warning(f"No lead sponsor found for {len(self.studies) - len(lead_idx)} studies")
+
+        collab_idx, collaborators = self.explode(
+            self.column(self.plan.entities["collaborators"].index_field)
+        )
+
+        names = np.concatenate(
+            [self.py(lead_name)[lead_idx], self.py(self.field(collaborators, "name"))]
+        )
+        classes = np.concatenate(
+            [self.py(lead_class)[lead_idx], self.py(self.field(collaborators, "class"))]
+        )
+        study_idx = np.concatenate([lead_idx, collab_idx])
+        is_lead = np.concatenate(
+            [np.ones(len(lead_idx), dtype=bool), np.zeros(len(collab_idx), dtype=bool)]
+        )
+        sponsor_keys = self.dimension_keys(names, classes)
+
+        # lead sponsor first, then collaborators, study by study
+        order = (study_idx, ~is_lead)
+        sponsors = self.in_order(
+            pd.DataFrame({"sponsor_key": sponsor_keys, "name": names, "sponsor_class": classes}),
+            *order,
+        )
+        study_sponsors = self.in_order(
+            pd.DataFrame(
+                {
+                    "study_key": self.study_keys[study_idx],
+                    "sponsor_key": sponsor_keys,
+                    "is_lead": is_lead,
+                }
+            ),
+            *order,
+        )
+        return sponsors, study_sponsors
+
+    def _simple_array(self, entity: str, key_column: str, name_column: str):
+        study_idx, values = self.explode(self.column(self.plan.entities[entity].index_field))
+        names = self.py(values)
+        entity_keys = self.dimension_keys(names)
+
+        dimension = pd.DataFrame({key_column: entity_keys, name_column: names})
+        bridge = pd.DataFrame({"study_key": self.study_keys[study_idx], key_column: entity_keys})
+        return dimension, bridge, study_idx
+
+    def extract_conditions(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        conditions, study_conditions, study_idx = self._simple_array(
+            "conditions", "condition_key", "condition_name"
+        )
+        missing = len(self.studies) - len(np.unique(study_idx))
+        if missing:
+            self.log.warning(f"No conditions found for {missing} studies")
+        return conditions, study_conditions
+
+    def extract_keywords(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        keywords, study_keywords, _ = self._simple_array("keywords", "keyword_key", "keyword_name")
+        return keywords, study_keywords
+
+    def extract_interventions(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        study_idx, interventions = self.explode(
+            self.column(self.plan.entities["interventions"].index_field)
+        )
+        main_names = self.py(self.field(interventions, "name"))
+        types = self.py(self.field(interventions, "type"))
+        descriptions = self.py(self.field(interventions, "description"))
+
+        intervention_idx, other_names = self.explode(self.field(interventions, "otherNames"))
+        other_names = self.py(other_names)
+        # some studies put the main name in the list of other names
+        keep = np.array(
+            [o != m for o, m in zip(other_names, main_names[intervention_idx])], dtype=bool
+        )
+        intervention_idx, other_names = intervention_idx[keep], other_names[keep]
+
+        n_primary = len(main_names)
+        names = np.concatenate([main_names, other_names])
+        parent = np.concatenate([np.arange(n_primary), intervention_idx])
+        is_primary = np.concatenate(
+            [np.ones(n_primary, dtype=bool), np.zeros(len(other_names), dtype=bool)]
+        )
+        intervention_keys = self.dimension_keys(names, types[parent])
+
+        # each intervention's primary name, then its other names
+        order = (study_idx[parent], parent, ~is_primary)
+        intervention_names = self.in_order(
+            pd.DataFrame(
+                {
+                    "intervention_key": intervention_keys,
+                    "intervention_name": names,
+                    "intervention_type": types[parent],
+                    "description": descriptions[parent],  # other names inherit from parent
+                    "is_primary_name": is_primary,
+                }
+            ),
+            *order,
+        )
+        study_interventions = self.in_order(
+            pd.DataFrame(
+                {
+                    "study_key": self.study_keys[study_idx[parent]],
+                    "intervention_key": intervention_keys,
+                    "is_primary_name": is_primary,
+                }
+            ),
+            *order,
+        )
+        return intervention_names, study_interventions
+
+    def extract_arm_groups(self) -> pd.DataFrame:
+        study_idx, arms = self.explode(self.column(self.plan.entities["arm_groups"].index_field))
+        labels = self.py(self.field(arms, "label"))
+        descriptions = self.py(self.field(arms, "description"))
+        types = self.py(self.field(arms, "type"))
+        study_keys = self.study_keys[study_idx]
+        arm_keys = self.keys(self.study_hex[study_idx], labels, descriptions, types)
+
+        # arms without intervention names still get one row
+        arm_idx, intervention_names, _ = self.explode_outer(self.field(arms, "interventionNames"))
+
+        return pd.DataFrame(
+            {
+                "study_key": study_keys[arm_idx],
+                "arm_intervention_key": arm_keys[arm_idx],
+                "arm_label": labels[arm_idx],
+                "arm_description": descriptions[arm_idx],
+                "arm_type": types[arm_idx],
+                "arm_intervention_name": self.py(intervention_names),
+            }
+        )
+
+    def extract_central_contacts(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        study_idx, contacts = self.explode(
+            self.column(self.plan.entities["central_contacts"].index_field)
+        )
+        name, role, phone, email = (
+            self.py(self.field(contacts, f)) for f in ("name", "role", "phone", "email")
+        )
+        contact_keys = self.dimension_keys(name, role, phone, email)
+
+        central_contacts = pd.DataFrame(
+            {
+                "contact_key": contact_keys,
+                "contact_name": name,
+                "contact_role": role,
+                "contact_phone": phone,
+                "contact_email": email,
+            }
+        )
+        study_central_contacts = pd.DataFrame(
+            {"study_key": self.study_keys[study_idx], "contact_key": contact_keys}
+        )
+        return central_contacts, study_central_contacts
+
+    def extract_locations(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Extract locations with status resolution. The status of every site of a study is
+        resolved from the full set of that study's site statuses.
+        """
+        study_idx, locations = self.explode(self.column(self.plan.entities["locations"].index_field))
+        facility, city, state, country, status = (
+            self.py(self.field(locations, f))
+            for f in ("facility", "city", "state", "country", "status")
+        )
+        location_keys = self.dimension_keys(facility, city, state, country)
+
+        geo_point = self.field(locations, "geoPoint")
+        lat = self.field(geo_point, "lat").to_numpy(zero_copy_only=False)
+        lon = self.field(geo_point, "lon").to_numpy(zero_copy_only=False)
+
+        df_locations = pd.DataFrame(
+            {
+                "location_key": location_keys,
+                "facility": facility,
+                "city": city,
+                "state": state,
+                "country": country,
+                "status": status,
+                "lat": lat,
+                "lon": lon,
+            }
+        )
+
+        resolved_status, status_type = self.resolve_location_statuses(study_idx, status)
+        study_locations = pd.DataFrame(
+            {
+                "study_key": self.study_keys[study_idx],
+                "location_key": location_keys,
+                "status": resolved_status,
+                "status_type": status_type,  # ACTUAL, INFERRED or OVERALL
+                "contacts": self.field(locations, "contacts").to_pylist(),
+            }
+        )
+        return df_locations, study_locations
+
+    def resolve_location_statuses(
+        self, study_idx: np.ndarray, status: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Resolve one status per study from the set of its site statuses and broadcast it to the
+        study's sites.
+
+        Each study's status set is built as a bitmask over the distinct site statuses, so only
+        the few distinct sets are resolved, not every study or site.
+        """
+        if not len(study_idx):
+            return np.array([], dtype=object), np.array([], dtype=object)
+
+        encoded = pc.dictionary_encode(pa.array(status, type=pa.string()))
+        names = np.array(encoded.dictionary.to_pylist(), dtype=object)
+        has_status = (
+            pc.fill_null(pc.greater(pc.utf8_length(encoded.dictionary), 0), False)
+            .to_numpy(zero_copy_only=False)
+        )
+        # only the few statuses of the API enum are expected, wider masks fall back to ints
+        mask_type = np.uint64 if len(names) <= 64 else object
+        bits = np.array([1 << i for i in range(len(names))], dtype=mask_type)
+        bits[~has_status] = 0
+
+        site_bits = np.zeros(len(study_idx), dtype=mask_type)
+        codes = encoded.indices
+        valid = codes.is_valid().to_numpy(zero_copy_only=False)
+        site_bits[valid] = bits[codes.drop_null().to_numpy()]
+
+        # studies without sites keep a zero mask and are never looked up
+        study_masks = np.zeros(len(self.studies), dtype=mask_type)
+        np.bitwise_or.at(study_masks, study_idx, site_bits)
+
+        unique_masks, inverse = np.unique(study_masks[study_idx], return_inverse=True)
+        resolved = [
+            self.dq_handler.resolve_location_status(
+                None, {names[i] for i in range(len(names)) if int(mask) >> i & 1}
+            )
+            for mask in unique_masks
+        ]
+        resolved_status = np.array([r[0] for r in resolved], dtype=object)[inverse]
+        status_type = np.array([r[1] for r in resolved], dtype=object)[inverse]
+
+        # no site status: fall back to the study's overall status
+        no_status = study_masks[study_idx] == 0
+        if no_status.any():
+            overall_status = self.py(self.column("protocolSection.statusModule.overallStatus"))
+            resolved_status[no_status] = overall_status[study_idx[no_status]]
+        return resolved_status, status_type
+
+    def extract_references(self) -> pd.DataFrame:
+        study_idx, references = self.explode(
+            self.column(self.plan.entities["references"].index_field)
+        )
+        study_keys = self.study_keys[study_idx]
+        pmid = self.py(self.field(references, "pmid"))
+
+        return pd.DataFrame(
+            {
+                "study_key": study_keys,
+                "ref_key": self.keys(self.study_hex[study_idx], pmid),
+                "pmid": pmid,
+                "type": self.py(self.field(references, "type")),
+                "citation": self.py(self.field(references, "citation")),
+            }
+        )
+
+    def extract_links(self) -> pd.DataFrame:
+        study_idx, links = self.explode(self.column(self.plan.entities["see_also"].index_field))
+        study_keys = self.study_keys[study_idx]
+        label = self.py(self.field(links, "label"))
+        url = self.py(self.field(links, "url"))
+
+        return pd.DataFrame(
+            {
+                "study_key": study_keys,
+                "link_key": self.keys(self.study_hex[study_idx], label, url),
+                "label": label,
+                "url": url,
+            }
+        )
+
+    def extract_ipds(self) -> pd.DataFrame:
+        study_idx, ipds = self.explode(self.column(self.plan.entities["avail_ipds"].index_field))
+        study_keys = self.study_keys[study_idx]
+        ipd_id, ipd_type, ipd_url = (self.py(self.field(ipds, f)) for f in ("id", "type", "url"))
+
+        return pd.DataFrame(
+            {
+                "study_key": study_keys,
+                "ipd_key": self.keys(self.study_hex[study_idx], ipd_id, ipd_type, ipd_url),
+                "id": ipd_id,
+                "type": ipd_type,
+                "url": ipd_url,
+                "comment": self.py(self.field(ipds, "comment")),
+            }
+        )
+
+    def extract_flow_groups(self) -> pd.DataFrame:
+        study_idx, groups = self.explode(self.column(self.plan.entities["flow_groups"].index_field))
+        study_keys = self.study_keys[study_idx]
+        group_id = self.py(self.field(groups, "id"))
+
+        return pd.DataFrame(
+            {
+                "study_key": study_keys,
+                "group_key": self.keys(self.study_hex[study_idx], group_id),
+                "id": group_id,
+                "title": self.py(self.field(groups, "title")),
+                "description": self.py(self.field(groups, "description")),
+            }
+        )
+
+    def extract_flow_events(self) -> pd.DataFrame:
+        study_idx, periods = self.explode(self.column(self.plan.entities["flow_periods"].index_field))
+        study_keys = self.study_keys[study_idx]
+        period_titles = self.py(self.field(periods, "title"))
+        period_keys = self.keys(self.study_hex[study_idx], period_titles)
+
+        frames, orders = [], []
+        for event_class, events_field, counts_field in (
+            ("ACHIEVEMENT", "milestones", "achievements"),
+            ("WITHDRAWAL", "dropWithdraws", "reasons"),
+        ):
+            period_idx, events = self.explode(self.field(periods, events_field))
+            event_types = self.py(self.field(events, "type"))
+
+            # events without counts still get one row, for an unknown group
+            event_idx, counts, placeholder = self.explode_outer(self.field(events, counts_field))
+            group_id = self.py(self.field(counts, "groupId"))
+            group_id[placeholder] = "UNKNOWN"
+            parent = period_idx[event_idx]
+
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "study_key": study_keys[parent],
+                        "period_key": period_keys[parent],
+                        "event_class": event_class,
+                        "event_type": event_types[event_idx],
+                        "period_title": period_titles[parent],
+                        "group_id": group_id,
+                        "num_subjects": self.py(self.field(counts, "numSubjects")),
+                    }
+                )
+            )
+            orders.append(parent)
+
+        # milestones, then drop/withdraws, period by period
+        events = pd.concat(frames, ignore_index=True)
+        section = np.concatenate([np.zeros(len(orders[0])), np.ones(len(orders[1]))])
+        return self.in_order(events, np.concatenate(orders), section)
+
+    # ---- generic entities ----
+
+    def extract_generic(self) -> Dict[str, pd.DataFrame]:
+        """
+        Extract every entity of the plan without a hand-written method.
+
+        Entities feeding the same table are concatenated in config order.
+
+        Returns:
+            Dict of table name -> DataFrame, before deduplication
+        """
+        parts: Dict[str, List[pd.DataFrame]] = {}
+        for entity in self.plan.generic:
+            for table, df in self.extract_entity(entity).items():
+                parts.setdefault(table, []).append(df)
+        return {
+            table: dfs[0] if len(dfs) == 1 else pd.concat(dfs, ignore_index=True)
+            for table, dfs in parts.items()
+        }
+
+    def extract_entity(self, entity: EntityPlan) -> Dict[str, pd.DataFrame]:
+        """
+        Extract one generic entity, see EntityPlan.tables.
+
+        Member keys hash the member's fields. Study-level members also hash the study key and
+        the entity's constants, so the same member under two outcome types gets two keys.
+        """
+        study_idx, items = self.explode(self.column(entity.path))
+        values = [
+            items if f.source is None else self.field(items, f.source) for f in entity.fields
+        ]
+        fields = {f.column: self.typed(v) for f, v in zip(entity.fields, values)}
+        constants = {
+            column: pd.array([value] * len(study_idx), dtype="boolean" if isinstance(value, bool) else object)
+            for column, value in entity.constants.items()
+        }
+
+        study_keys = self.study_keys[study_idx]
+        if entity.bridge_table_name:
+            member_keys = self.dimension_keys(*values)
+            return {
+                entity.table_name: pd.DataFrame({entity.key_column: member_keys, **fields}),
+                entity.bridge_table_name: pd.DataFrame(
+                    {"study_key": study_keys, entity.key_column: member_keys, **constants}
+                ),
+            }
+
+        member_keys = self.keys(
+            self.study_hex[study_idx], *values,
+            *([str(value)] * len(study_idx) for value in entity.constants.values()),
+        )
+        return {
+            entity.table_name: pd.DataFrame(
+                {"study_key": study_keys, entity.key_column: member_keys, **fields, **constants}
+            )
+        }
@@ -1,4 +1,5 @@
-from typing import Set, Tuple
+from functools import lru_cache
+from typing import FrozenSet, Set, Tuple
 
 class DataQualityHandler:
     def __init__(self):
@@ -15,37 +16,41 @@ class DataQualityHandler:
         2. {RECRUITING, NOT_YET_RECRUITING} -> RECRUITING (progression)
         3. RECRUITING + final status -> final status (study ended)
         4. RECRUITING + other -> RECRUITING_STATUS_UNCLEAR
+
+        Rules 1-4 only depend on the set of statuses, of which there are few distinct ones,
+        so they are memoized per set.
         """
+        if not location_statuses:
+            return overall_status, "OVERALL"
 
-        actual = "ACTUAL"
-        inferred = "INFERRED"
-        overall = "OVERALL"
+        return _resolve_site_statuses(frozenset(location_statuses))
 
-        if not location_statuses:
-            status_type = overall
-            return overall_status, status_type
 
-        if len(location_statuses) == 1:
-            status_type = actual
-            return list(location_statuses)[0], status_type
+@lru_cache(maxsize=1024)
+def _resolve_site_statuses(location_statuses: FrozenSet[str]) -> Tuple[str, str]:
+    actual = "ACTUAL"
+    inferred = "INFERRED"
 
-        # progression case
-        if location_statuses == {"RECRUITING", "NOT_YET_RECRUITING"}:
-            status_type = inferred
-            return "RECRUITING", status_type
+    if len(location_statuses) == 1:
+        status_type = actual
+        return next(iter(location_statuses)), status_type
 
-        final_statuses = ["COMPLETED", "TERMINATED", "WITHDRAWN"]
+    # progression case
+    if location_statuses == {"RECRUITING", "NOT_YET_RECRUITING"}:
+        status_type = inferred
+        return "RECRUITING", status_type
 
-        if "RECRUITING" in location_statuses:
-            for final_status in final_statuses:
-                if final_status in location_statuses:
-                    status_type = inferred
-                    return final_status, status_type  # study ended, can't recruit
+    final_statuses = ["COMPLETED", "TERMINATED", "WITHDRAWN"]
 
-            # RECRUITING plus other ambiguous statuses
-            return "RECRUITING_STATUS_UNCLEAR", inferred
+    if "RECRUITING" in location_statuses:
+        for final_status in final_statuses:
+            if final_status in location_statuses:
+                status_type = inferred
+                return final_status, status_type  # study ended, can't recruit
 
-        # Multiple non-recruiting statuses - anyone works. makes no difference
-        return list(location_statuses)[0], inferred
+        # RECRUITING plus other ambiguous statuses
+        return "RECRUITING_STATUS_UNCLEAR", inferred
 
-    
+    # Multiple non-recruiting statuses - anyone works. makes no difference, but pick the same
+    # one every run (set order changes between processes)
+    return min(location_statuses), inferred
@@ -0,0 +1,172 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+import json
+import logging
+import os
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+class DimensionKeyCache:
+    """
+    Bounded LRU memo of natural key -> surrogate key, shared by every file of a Transformer run.
+
+    Sponsors, conditions, keywords, interventions, sites and contacts recur across tens of
+    thousands of studies. The cache is keyed by the "|"-joined natural key (the exact input of
+    the hash). Each batch is dictionary-encoded first, so a value repeated within a file is
+    looked up once, and only values missing from the cache are hashed. The least recently used
+    entries are evicted beyond max_entries.
+
+    It also tracks which dimension members have been emitted in this run. claim() lets a
+    dimension row through only the first time its key is seen, so a member is never emitted
+    twice however many files it appears in. That record is kept per dimension for the whole
+    run and is not subject to eviction.
+
+    With a path, the memo (not the emitted record) is loaded on creation and written by save(),
+    so later runs start warm. A file written with a different key mode or format is ignored.
+    Pool workers cannot save it themselves: with track_new they record the entries they hash,
+    take_new() hands those back with each file's result and the parent merge()s them before
+    saving.
+
+    Attributes:
+        hits, misses, evictions: Lookups answered from the memo, values hashed, entries evicted
+        suppressed: Dimension rows dropped because they were emitted before in this run
+    """
+
+    def __init__(self, max_entries: int, mode: str = "sha256", key_format: str = "hex", path: str | None = None):
+        self.max_entries = max_entries
+        self.mode = mode
+        self.key_format = key_format
+        self.path = path
+        self.log = logging.getLogger("airflow.task")
+
+        self._entries: OrderedDict = OrderedDict()
+        self._emitted: Dict[str, set] = {}
+        # entries hashed since the last take_new, only recorded with track_new
+        self.track_new = False
+        self._new: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.suppressed = 0
+
+        if path:
+            self.load()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "suppressed": self.suppressed,
+        }
+
+    def keys(self, joined: pa.Array, hasher: Callable[[pa.Array], np.ndarray]) -> np.ndarray:
+        """
+        Keys of a batch of joined natural keys.
+
+        Args:
+            joined: Output of keys.join_columns
+            hasher: Hashes an array of joined values, e.g. keys.hash_joined with the run's
+                mode and format
+
+        Returns:
+            np.ndarray: Keys aligned with joined
+        """
+        encoded = pc.dictionary_encode(joined)
+        uniques = encoded.dictionary.to_pylist()
+
+        unique_keys = [self._get(value) for value in uniques]
+        missing = [i for i, key in enumerate(unique_keys) if key is None]
+        self.hits += len(uniques) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            hashed = hasher(pa.array([uniques[i] for i in missing], type=pa.string()))
+            for i, key in zip(missing, hashed.tolist()):
+                unique_keys[i] = key
+                self._put(uniques[i], key)
+
+        dtype = np.int64 if self.key_format == "int64" else object
+        unique_keys = np.array(unique_keys, dtype=dtype)
+        return unique_keys[encoded.indices.to_numpy(zero_copy_only=False)]
+
+    def claim(self, dimension: str, keys: Sequence) -> np.ndarray:
+        """
+        Mark dimension members as emitted.
+
+        Returns:
+            np.ndarray: True for keys not emitted before in this run (first occurrence only)
+        """
+        emitted = self._emitted.setdefault(dimension, set())
+        new = np.zeros(len(keys), dtype=bool)
+        for i, key in enumerate(keys):
+            if key not in emitted:
+                emitted.add(key)
+                new[i] = True
+        self.suppressed += int(len(keys) - new.sum())
+        return new
+
+    def _get(self, value: str):
+        key = self._entries.get(value)
+        if key is not None:
+            self._entries.move_to_end(value)
+        return key
+
+    def take_new(self) -> List[Tuple[str, object]]:
+        """Entries hashed since the last call, least recently used first. Needs track_new."""
+        new, self._new = list(self._new.items()), OrderedDict()
+        return new
+
+    def merge(self, entries: Iterable[Tuple[str, object]]) -> None:
+        """Add entries learned by another cache, e.g. a pool worker's take_new."""
+        for value, key in entries:
+            self._entries.pop(value, None)
+            self._put(value, key)
+
+    def _put(self, value: str, key) -> None:
+        self._entries[value] = key
+        if self.track_new:
+            self._new[value] = key
+            if len(self._new) > self.max_entries:
+                self._new.popitem(last=False)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def load(self) -> None:
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        except json.JSONDecodeError as e:
+            self.log.warning(f"Ignoring unreadable key cache {self.path}: {e}")
+            return
+
+        if saved.get("mode") != self.mode or saved.get("key_format") != self.key_format:
+            self.log.warning(f"Ignoring key cache {self.path} written for other key settings")
+            return
+
+        # saved least recently used first, keep the most recent ones
+        for value, key in saved["entries"][-self.max_entries :]:
+            self._entries[value] = key
+        self.log.info(f"Loaded {len(self._entries)} cached dimension keys from {self.path}")
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "mode": self.mode,
+                    "key_format": self.key_format,
+                    "entries": list(self._entries.items()),
+                },
+                f,
+            )
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,150 @@
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+
+# Arrow and Parquet type of every enumerated column
+DICTIONARY_TYPE = pa.dictionary(pa.int32(), pa.string())
+
+_RECRUITMENT_STATUSES = (
+    "ACTIVE_NOT_RECRUITING",
+    "COMPLETED",
+    "ENROLLING_BY_INVITATION",
+    "NOT_YET_RECRUITING",
+    "RECRUITING",
+    "SUSPENDED",
+    "TERMINATED",
+    "WITHDRAWN",
+    "AVAILABLE",
+)
+
+_OVERALL_STATUSES = (
+    *_RECRUITMENT_STATUSES,
+    "NO_LONGER_AVAILABLE",
+    "TEMPORARILY_NOT_AVAILABLE",
+    "APPROVED_FOR_MARKETING",
+    "WITHHELD",
+    "UNKNOWN",
+)
+
+# Low-cardinality columns of the transform output -> values documented by the ClinicalTrials.gov
+# API (or produced by the transform itself). They are dictionary-encoded end to end: pandas
+# categoricals in the transform frames, dictionary<int32, string> in Arrow and Parquet. Values
+# outside the list are kept and counted, see encode_tables. None marks an open enumeration: free
+# text that repeats heavily, encoded without a list of known values.
+# Keyed by column name like output_schema.COLUMN_TYPES, so a column is encoded in every table.
+ENUMERATIONS: Dict[str, Tuple[str, ...] | None] = {
+    # studies
+    "overall_status": _OVERALL_STATUSES,
+    "study_type": ("EXPANDED_ACCESS", "INTERVENTIONAL", "OBSERVATIONAL"),
+    "sex": ("ALL", "FEMALE", "MALE"),
+    # sponsors
+    "sponsor_class": (
+        "NIH", "FED", "OTHER_GOV", "INDIV", "INDUSTRY", "NETWORK", "AMBIG", "OTHER", "UNKNOWN",
+    ),
+    # interventions and arm groups
+    "intervention_type": (
+        "BEHAVIORAL", "BIOLOGICAL", "COMBINATION_PRODUCT", "DEVICE", "DIAGNOSTIC_TEST",
+        "DIETARY_SUPPLEMENT", "DRUG", "GENETIC", "PROCEDURE", "RADIATION", "OTHER",
+    ),
+    "arm_type": (
+        "EXPERIMENTAL", "ACTIVE_COMPARATOR", "PLACEBO_COMPARATOR", "SHAM_COMPARATOR",
+        "NO_INTERVENTION", "OTHER",
+    ),
+    # locations. A location without site statuses takes the overall status, see data_quality
+    "country": None,
+    "status": (*_OVERALL_STATUSES, "RECRUITING_STATUS_UNCLEAR"),
+    "status_type": ("ACTUAL", "INFERRED", "OVERALL"),
+    # participant flow. Period titles, group IDs (FG000, ...), milestone and withdrawal types are
+    # free text
+    "period_title": None,
+    "event_class": ("ACHIEVEMENT", "WITHDRAWAL"),
+    "event_type": None,
+    "group_id": None,
+}
+
+
+def encode_column(values: pd.Series, known: Tuple[str, ...] | None) -> Tuple[pd.Series, Dict[str, int]]:
+    """
+    Encode a column as a pandas categorical.
+
+    Categories are the known values and every other value of the column, sorted, so that codes
+    order like the values: sorting or grouping on codes gives the same order as on strings.
+
+    Args:
+        values: String column, object or Arrow-backed
+        known: Known values of the column, None for an open enumeration
+
+    Returns:
+        Tuple of (categorical column, unknown value -> count)
+    """
+    counts = values.value_counts(dropna=True)
+    unknown = {}
+    if known is not None:
+        known_values = frozenset(known)
+        unknown = {value: int(count) for value, count in counts.items() if value not in known_values}
+
+    categories = sorted(set(known or ()).union(counts.index))
+    encoded = pd.Categorical(values.astype(object), categories=categories)
+    return pd.Series(encoded, index=values.index, name=values.name), unknown
+
+
+def encode_tables(
+    tables: Dict[str, pd.DataFrame], enumerations: Dict[str, Tuple[str, ...] | None] = ENUMERATIONS
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Dict[str, int]]]:
+    """
+    Encode the enumerated columns of every table.
+
+    Returns:
+        Tuple of (tables, column -> unknown value -> count, for columns with unknown values)
+    """
+    tables = dict(tables)
+    unknown_values: Dict[str, Dict[str, int]] = {}
+    for name, df in tables.items():
+        columns = [column for column in df.columns if column in enumerations]
+        if not columns:
+            continue
+        df = df.copy(deep=False)
+        for column in columns:
+            df[column], unknown = encode_column(df[column], enumerations[column])
+            counted = unknown_values.setdefault(column, {}) if unknown else {}
+            for value, count in unknown.items():
+                counted[value] = counted.get(value, 0) + count
+        tables[name] = df
+    return tables, unknown_values
+
+
+def integer_codes(values: pd.Series) -> np.ndarray:
+    """
+    Integer codes of a column, -1 for nulls. Categoricals use their own codes, other columns
+    are factorized in sorted order so codes order like the values either way.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy()
+    codes, _ = pd.factorize(values, sort=True)
+    return codes
+
+
+def group_codes(codes: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Group rows on several columns of integer codes (see integer_codes, no nulls).
+
+    The columns are combined into one int64 per row, compressed whenever the next column could
+    overflow it, so grouping costs one integer hash whatever the column types.
+
+    Returns:
+        Tuple of (group id of each row, numbered in the order of the codes, first row of each
+        group)
+    """
+    combined = np.zeros(len(codes[0]), dtype=np.int64)
+    for column in codes:
+        size = int(column.max()) + 1 if len(column) else 1
+        if combined.max(initial=0) >= np.iinfo(np.int64).max // size:
+            combined = pd.factorize(combined, sort=True)[0].astype(np.int64)
+        combined = combined * size + column
+
+    group_ids, groups = pd.factorize(combined, sort=True)
+    first = np.full(len(groups), len(combined), dtype=np.int64)
+    np.minimum.at(first, group_ids, np.arange(len(combined)))
+    return group_ids, first
@@ -0,0 +1,269 @@
+from typing import Dict, List, Tuple
+import pyarrow as pa
+
+from include.etl.transformation.transformer_config import (
+    SINGLE_FIELDS, SINGLE_FIELD_TYPES, NESTED_FIELDS,
+)
+from include.etl.extraction.landing import STUDY_TYPE
+
+
+# Entities with hand-written ColumnarExtractor methods. They carry rules the config cannot
+# express (lead sponsor flags, intervention other names, location status resolution, flow event
+# aggregation) and keep their own tables, see output_schema.TABLE_COLUMNS. Every other entity is
+# extracted from its compiled plan, so adding one is a NESTED_FIELDS change.
+HANDWRITTEN_METHODS = frozenset(
+    {
+        "extract_sponsors",
+        "extract_conditions",
+        "extract_keywords",
+        "extract_interventions",
+        "extract_arm_groups",
+        "extract_central_contacts",
+        "extract_locations",
+        "extract_references",
+        "extract_links",
+        "extract_ipds",
+        "extract_flow_groups",
+        "extract_flow_events",
+    }
+)
+
+# Keys that describe a NESTED_FIELDS entity. Any other key of an entry is a constant column of
+# the entity's study-level rows, e.g. outcome_type or is_primary
+ENTITY_KEYS = frozenset(
+    {
+        "index_field",
+        "object_type",
+        "type",
+        "fields",
+        "field_name",
+        "extract_fields",
+        "nested",
+        "table_name",
+        "bridge_table_name",
+        "transformer_method",
+        "key_name",
+    }
+)
+
+GENERIC_OBJECT_TYPES = ("simple_array", "array_of_dicts")
+
+
+def landing_type(path: Tuple[str, ...], root: pa.DataType = STUDY_TYPE) -> pa.DataType | None:
+    """Arrow type at a path of the landed study struct, None if the path is not landed."""
+    node = root
+    for name in path:
+        if not pa.types.is_struct(node) or node.get_field_index(name) < 0:
+            return None
+        node = node.field(name).type
+    return node
+
+
+def _singular(name: str) -> str:
+    return name[:-1] if name.endswith("s") else name
+
+
+class FieldProjection:
+    """
+    One output column read from a field of an entity's elements.
+
+    Attributes:
+        column: Output column
+        source: Field of the element struct, None for the elements of a simple array
+        arrow_type: Landed type of the field
+    """
+
+    def __init__(self, column: str, source: str | None, arrow_type: pa.DataType):
+        self.column = column
+        self.source = source
+        self.arrow_type = arrow_type
+
+    def __repr__(self) -> str:
+        return f"FieldProjection({self.column!r}, {self.source!r}, {self.arrow_type})"
+
+
+class EntityPlan:
+    """
+    Compiled extraction of one NESTED_FIELDS entity.
+
+    Attributes:
+        name: Entity name in NESTED_FIELDS
+        index_field: Dotted path of the entity in the study document
+        path: index_field split into its parts
+        object_type: "simple_array", "array_of_dicts", ...
+        method: transformer_method of the entity
+        generic: True when extracted from this plan, False for HANDWRITTEN_METHODS
+        fields: Output columns of each element (generic entities only)
+        table_name: Table of the entity's members
+        bridge_table_name: Table linking studies to members, None for study-level tables
+        key_column: Surrogate key column of the members (generic entities only)
+        constants: Constant columns of the study-level rows
+    """
+
+    def __init__(self, name: str, spec: Dict, study_type: pa.DataType):
+        self.name = name
+        self.index_field = spec["index_field"]
+        self.path = tuple(self.index_field.split("."))
+        self.object_type = spec.get("object_type", spec.get("type"))
+        self.method = spec.get("transformer_method")
+        self.generic = self.method not in HANDWRITTEN_METHODS
+        self.table_name = spec.get("table_name")
+        self.bridge_table_name = spec.get("bridge_table_name")
+        self.constants = {k: v for k, v in spec.items() if k not in ENTITY_KEYS}
+        self.fields: List[FieldProjection] = []
+        self.key_column = None
+
+        self.landed_type = landing_type(self.path, study_type)
+        if self.landed_type is None:
+            raise ValueError(f"{name}: {self.index_field} is not in the landing schema")
+        if self.generic:
+            self._compile(spec)
+
+    def _compile(self, spec: Dict) -> None:
+        if self.object_type not in GENERIC_OBJECT_TYPES:
+            raise ValueError(
+                f"{self.name}: {self.method} is not hand-written and object_type "
+                f"{self.object_type!r} cannot be extracted generically"
+            )
+        if not self.table_name:
+            raise ValueError(f"{self.name}: table_name is required")
+        if not pa.types.is_list(self.landed_type):
+            raise ValueError(f"{self.name}: {self.index_field} is not a list")
+        element = self.landed_type.value_type
+
+        if self.object_type == "simple_array":
+            column = spec["field_name"]
+            self.fields = [FieldProjection(column, None, element)]
+            self.key_column = spec.get("key_name", f"{column}_key")
+        else:
+            for field in spec["fields"]:
+                column, source = field if isinstance(field, tuple) else (field, field)
+                arrow_type = landing_type((source,), element)
+                if arrow_type is None:
+                    raise ValueError(f"{self.name}: {source} is not a field of {self.index_field}")
+                self.fields.append(FieldProjection(column, source, arrow_type))
+
+            table = self.table_name
+            if not self.bridge_table_name and table.startswith("study_"):
+                table = table[len("study_"):]
+            self.key_column = spec.get("key_name", f"{_singular(table)}_key")
+
+    @property
+    def constant_types(self) -> Dict[str, pa.DataType]:
+        return {
+            column: pa.bool_() if isinstance(value, bool) else pa.string()
+            for column, value in self.constants.items()
+        }
+
+    def tables(self) -> Dict[str, Dict[str, pa.DataType]]:
+        """
+        Tables this entity feeds and their non-key column types (key columns are typed by the
+        run's key format).
+
+        With a bridge table the members are a dimension: the member table holds the key and
+        fields, the bridge links studies to keys. Without one, members belong to their study
+        and the table holds both.
+        """
+        key = {self.key_column: None}
+        fields = {f.column: f.arrow_type for f in self.fields}
+        if self.bridge_table_name:
+            return {
+                self.table_name: {**key, **fields},
+                self.bridge_table_name: {"study_key": None, **key, **self.constant_types},
+            }
+        return {self.table_name: {"study_key": None, **key, **fields, **self.constant_types}}
+
+
+class ExtractionPlan:
+    """
+    SINGLE_FIELDS and NESTED_FIELDS compiled against the landing schema.
+
+    Paths are split and checked once, every projected field is typed from the landing schema,
+    and the output tables of the generic entities are derived. Entities feeding the same table
+    (e.g. primary, secondary and other outcomes) must agree on its columns.
+
+    Attributes:
+        single_fields: Column -> (path, landed type, declared kind or None) of each study fact
+        entities: Entity name -> EntityPlan, in NESTED_FIELDS order
+        generic: The entities extracted from their plan
+    """
+
+    def __init__(self, single_fields: Dict[str, str], nested_fields: Dict[str, Dict], study_type: pa.DataType):
+        self.single_fields: Dict[str, Tuple[Tuple[str, ...], pa.DataType, str | None]] = {}
+        for column, index_field in single_fields.items():
+            path = tuple(index_field.split("."))
+            arrow_type = landing_type(path, study_type)
+            if arrow_type is None:
+                raise ValueError(f"{column}: {index_field} is not in the landing schema")
+            self.single_fields[column] = (path, arrow_type, SINGLE_FIELD_TYPES.get(column))
+
+        self.entities = {
+            name: EntityPlan(name, spec, study_type) for name, spec in nested_fields.items()
+        }
+        self.generic = [entity for entity in self.entities.values() if entity.generic]
+
+        self._tables: Dict[str, Dict[str, pa.DataType]] = {}
+        for entity in self.generic:
+            for table, columns in entity.tables().items():
+                known = self._tables.setdefault(table, columns)
+                if list(known) != list(columns):
+                    raise ValueError(
+                        f"{entity.name}: columns of {table} {list(columns)} differ from "
+                        f"{list(known)} declared by another entity"
+                    )
+
+    @property
+    def paths(self) -> List[Tuple[str, ...]]:
+        """Every path read from a study, each once."""
+        paths = [path for path, _, _ in self.single_fields.values()]
+        paths += [entity.path for entity in self.entities.values()]
+        return list(dict.fromkeys(paths))
+
+    def table_columns(self) -> Dict[str, List[str]]:
+        return {table: list(columns) for table, columns in self._tables.items()}
+
+    def column_types(self) -> Dict[str, Dict[str, pa.DataType]]:
+        """Types of the non-key columns of each generic table."""
+        return {
+            table: {column: t for column, t in columns.items() if t is not None}
+            for table, columns in self._tables.items()
+        }
+
+    def dimension_keys(self) -> Dict[str, str]:
+        """Member tables of generic entities with a bridge table -> their key column."""
+        return {
+            entity.table_name: entity.key_column
+            for entity in self.generic
+            if entity.bridge_table_name
+        }
+
+    def dedupe_subsets(self) -> Dict[str, List[str]]:
+        subsets = {}
+        for entity in self.generic:
+            if entity.bridge_table_name:
+                subsets[entity.table_name] = [entity.key_column]
+                subsets[entity.bridge_table_name] = [
+                    "study_key", entity.key_column, *entity.constants
+                ]
+            else:
+                subsets[entity.table_name] = ["study_key", entity.key_column]
+        return subsets
+
+
+def compile_plan(
+    single_fields: Dict[str, str] = SINGLE_FIELDS,
+    nested_fields: Dict[str, Dict] = NESTED_FIELDS,
+    study_type: pa.DataType = STUDY_TYPE,
+) -> ExtractionPlan:
+    """
+    Compile the transformer config into an extraction plan.
+
+    Raises:
+        ValueError: A configured path or field is not landed, or a generic entity is
+            incomplete
+    """
+    return ExtractionPlan(single_fields, nested_fields, study_type)
+
+
+# compiled once on import, so a config error fails the DAG import rather than a run
+PLAN = compile_plan()
@@ -0,0 +1,356 @@
+from typing import Dict, Iterable, List, Sequence
+import argparse
+import fcntl
+import logging
+import os
+import time
+import uuid
+import numpy as np
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from include.etl.transformation.keys import keys_to_int64
+
+
+BLOOM_BITS_PER_KEY = 10
+BLOOM_HASHES = 7
+
+# pending appends of runs that never committed (failed runs) are dropped by compact after this
+PENDING_TTL_SECONDS = 2 * 24 * 3600
+
+
+def as_int64_keys(keys: Sequence) -> np.ndarray:
+    """Keys of either format as int64. The index always stores the int64 form."""
+    keys = np.asarray(keys)
+    if keys.dtype == np.int64:
+        return keys
+    if not len(keys):
+        return np.array([], dtype=np.int64)
+    return keys_to_int64(keys.astype(object).tolist())
+
+
+class BloomFilter:
+    """
+    Bloom filter over int64 keys.
+
+    Keys are already uniform hashes, so the probe positions are derived from the key itself
+    by double hashing (low and high halves) rather than by hashing again.
+    """
+
+    def __init__(self, bits: np.ndarray):
+        self.bits = bits
+        self.size = len(bits) * 8
+
+    @classmethod
+    def build(cls, keys: np.ndarray) -> "BloomFilter":
+        size = 64
+        while size < len(keys) * BLOOM_BITS_PER_KEY:
+            size *= 2
+        bloom = cls(np.zeros(size // 8, dtype=np.uint8))
+        for positions in bloom._positions(keys):
+            np.bitwise_or.at(bloom.bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+        return bloom
+
+    def _positions(self, keys: np.ndarray) -> Iterable[np.ndarray]:
+        keys = keys.view(np.uint64)
+        low = keys & np.uint64(0xFFFFFFFF)
+        high = (keys >> np.uint64(32)) | np.uint64(1)
+        mask = np.uint64(self.size - 1)
+        for i in range(BLOOM_HASHES):
+            yield ((low + np.uint64(i) * high) & mask).astype(np.int64)
+
+    def might_contain(self, keys: np.ndarray) -> np.ndarray:
+        result = np.ones(len(keys), dtype=bool)
+        for positions in self._positions(keys):
+            result &= (self.bits[positions >> 3] >> (positions & 7) & 1).astype(bool)
+        return result
+
+
+class DimensionKeyIndex:
+    """
+    Persistent set of the keys of one dimension that have been emitted by any run.
+
+    Layout of the dimension's directory:
+        base.npy: Sorted, unique int64 keys, memory-mapped
+        bloom.npy: Bloom filter over base.npy, checked before the sorted search
+        {run}.{pid}.pending: Keys appended by a worker of a run that has not committed yet
+        {run}.{pid}.keys: Keys appended by committed runs, until compacted into base.npy
+
+    Every process appends to its own file, so concurrent workers never write the same file.
+    Appends hold a shared lock on .lock and compaction an exclusive one, so compaction never
+    drops keys appended while it runs. Workers pick up each other's appends (of committed runs,
+    and of their own run) by reading the new tails of the append files on every claim.
+
+    Args:
+        directory: Directory of the dimension, created if missing
+        run_id: Run that pending appends belong to
+    """
+
+    def __init__(self, directory: str, run_id: str):
+        self.directory = directory
+        self.run_id = run_id
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock_path = os.path.join(directory, ".lock")
+        self._own_path = os.path.join(directory, f"{run_id}.{os.getpid()}.pending")
+        self._base_stat = None
+        self._base = np.array([], dtype=np.int64)
+        self._bloom = None
+        self._offsets: Dict[str, int] = {}
+        self._appended = np.array([], dtype=np.int64)
+
+    def claim(self, keys: Sequence) -> np.ndarray:
+        """
+        Record keys as emitted.
+
+        Returns:
+            np.ndarray: True for keys never emitted before (first occurrence in keys only)
+        """
+        int_keys = as_int64_keys(keys)
+        with self._locked(fcntl.LOCK_SH):
+            self._refresh()
+            new = ~self.contains(int_keys)
+            _, first = np.unique(int_keys, return_index=True)
+            first_mask = np.zeros(len(int_keys), dtype=bool)
+            first_mask[first] = True
+            new &= first_mask
+
+            if new.any():
+                fd = os.open(self._own_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                try:
+                    os.write(fd, int_keys[new].astype("<i8").tobytes())
+                finally:
+                    os.close(fd)
+                self._appended = np.union1d(self._appended, int_keys[new])
+        return new
+
+    def contains(self, keys: np.ndarray) -> np.ndarray:
+        """Membership of int64 keys, as of the last refresh."""
+        found = np.isin(keys, self._appended)
+        if len(self._base):
+            candidates = np.flatnonzero(~found & self._bloom.might_contain(keys))
+            positions = np.searchsorted(self._base, keys[candidates])
+            positions[positions == len(self._base)] = 0
+            found[candidates] = self._base[positions] == keys[candidates]
+        return found
+
+    def _refresh(self) -> None:
+        base_path = os.path.join(self.directory, "base.npy")
+        try:
+            stat = os.stat(base_path)
+            base_stat = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            base_stat = None
+
+        if base_stat != self._base_stat:
+            # compacted since the last claim: the append files it merged are gone
+            self._base_stat = base_stat
+            self._offsets = {}
+            self._appended = np.array([], dtype=np.int64)
+            if base_stat is None:
+                self._base, self._bloom = np.array([], dtype=np.int64), None
+            else:
+                self._base = np.load(base_path, mmap_mode="r")
+                self._bloom = BloomFilter(np.load(os.path.join(self.directory, "bloom.npy")))
+
+        new_keys = []
+        for path in self._append_files(include_pending_of=self.run_id):
+            offset = self._offsets.get(path, 0)
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+            # a concurrent append may be partly visible, keep whole keys only
+            data = data[: len(data) - len(data) % 8]
+            if data:
+                new_keys.append(np.frombuffer(data, dtype="<i8").astype(np.int64))
+                self._offsets[path] = offset + len(data)
+        if new_keys:
+            self._appended = np.union1d(self._appended, np.concatenate(new_keys))
+
+    def _append_files(self, include_pending_of: str | None = None) -> List[str]:
+        paths = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".keys") or (
+                include_pending_of and name.startswith(f"{include_pending_of}.") and name.endswith(".pending")
+            ):
+                paths.append(os.path.join(self.directory, name))
+        return sorted(paths)
+
+    def _locked(self, operation: int):
+        return _FileLock(self._lock_path, operation)
+
+    def commit(self) -> int:
+        """Make the pending appends of this run permanent. Returns the number of files."""
+        committed = 0
+        with self._locked(fcntl.LOCK_SH):
+            for name in os.listdir(self.directory):
+                if name.startswith(f"{self.run_id}.") and name.endswith(".pending"):
+                    path = os.path.join(self.directory, name)
+                    os.replace(path, path[: -len(".pending")] + ".keys")
+                    committed += 1
+        return committed
+
+    def compact(self, pending_ttl_seconds: int = PENDING_TTL_SECONDS) -> Dict[str, int]:
+        """
+        Merge the committed append files into base.npy and rebuild the Bloom filter. Pending
+        files older than the TTL (runs that failed) are deleted.
+
+        Returns:
+            Dict with keys (in base.npy after compaction), merged (append files) and expired
+        """
+        with self._locked(fcntl.LOCK_EX):
+            base_path = os.path.join(self.directory, "base.npy")
+            parts = [np.load(base_path)] if os.path.exists(base_path) else []
+            merged = self._append_files()
+            for path in merged:
+                with open(path, "rb") as f:
+                    data = f.read()
+                parts.append(np.frombuffer(data[: len(data) - len(data) % 8], dtype="<i8").astype(np.int64))
+
+            keys = np.unique(np.concatenate(parts)) if parts else np.array([], dtype=np.int64)
+            self._write_base(keys)
+            for path in merged:
+                os.remove(path)
+
+            expired = 0
+            cutoff = time.time() - pending_ttl_seconds
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if name.endswith(".pending") and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    expired += 1
+
+        return {"keys": len(keys), "merged": len(merged), "expired": expired}
+
+    def rebuild(self, keys: Sequence) -> int:
+        """
+        Replace the index with the given keys, e.g. every key of the dimension table in the
+        warehouse. Committed and pending appends are discarded.
+
+        Returns:
+            Number of keys in the index
+        """
+        with self._locked(fcntl.LOCK_EX):
+            unique = np.unique(as_int64_keys(keys))
+            self._write_base(unique)
+            for name in os.listdir(self.directory):
+                if name.endswith((".keys", ".pending")):
+                    os.remove(os.path.join(self.directory, name))
+        return len(unique)
+
+    def _write_base(self, keys: np.ndarray) -> None:
+        for name, array in (("bloom", BloomFilter.build(keys).bits), ("base", keys)):
+            tmp_path = os.path.join(self.directory, f"{name}.tmp.npy")
+            np.save(tmp_path, array)
+            os.replace(tmp_path, os.path.join(self.directory, f"{name}.npy"))
+
+
+class _FileLock:
+    def __init__(self, path: str, operation: int):
+        self.path = path
+        self.operation = operation
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self.fd, self.operation)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+
+
+class KeyIndex:
+    """
+    Persistent dimension key indexes under one root directory, one DimensionKeyIndex per
+    dimension table.
+
+    Args:
+        root: Index directory, shared by every worker and run
+        run_id: Run the appends belong to. A new id is generated by default
+    """
+
+    def __init__(self, root: str, run_id: str | None = None):
+        self.root = root
+        self.run_id = run_id or f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.log = logging.getLogger("airflow.task")
+        self._dimensions: Dict[str, DimensionKeyIndex] = {}
+        self.suppressed = 0
+
+    def dimension(self, name: str) -> DimensionKeyIndex:
+        index = self._dimensions.get(name)
+        if index is None or index.run_id != self.run_id:
+            index = DimensionKeyIndex(os.path.join(self.root, name), self.run_id)
+            self._dimensions[name] = index
+        return index
+
+    def claim(self, dimension: str, keys: Sequence) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: True for dimension members no run has emitted before
+        """
+        new = self.dimension(dimension).claim(keys)
+        self.suppressed += int(len(new) - new.sum())
+        return new
+
+    def dimensions(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def commit(self) -> None:
+        """Make every append of this run permanent, once its output has been loaded."""
+        for name in self.dimensions():
+            self.dimension(name).commit()
+
+    def compact(self, pending_ttl_seconds: int = PENDING_TTL_SECONDS) -> Dict[str, Dict[str, int]]:
+        stats = {}
+        for name in self.dimensions():
+            stats[name] = self.dimension(name).compact(pending_ttl_seconds)
+            self.log.info(f"Compacted key index {name}: {stats[name]}")
+        return stats
+
+    def rebuild(self, dimension: str, paths: List[str], key_column: str) -> int:
+        """
+        Rebuild a dimension's index from its emitted tables.
+
+        Args:
+            dimension: Dimension table name
+            paths: Parquet or Arrow IPC files of the table
+            key_column: Key column of the table
+        """
+        keys = [np.array([], dtype=np.int64)]
+        for path in paths:
+            if path.endswith(".arrow"):
+                with open(path, "rb") as f:
+                    column = ipc.open_file(f).read_all().column(key_column)
+            else:
+                column = pq.read_table(path, columns=[key_column]).column(key_column)
+            keys.append(as_int64_keys(column.drop_null().to_numpy(zero_copy_only=False)))
+        count = self.dimension(dimension).rebuild(np.concatenate(keys))
+        self.log.info(f"Rebuilt key index {dimension} from {len(paths)} files: {count} keys")
+        return count
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Maintain the persistent dimension key index")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compact = commands.add_parser("compact", help="Merge appended keys and rebuild Bloom filters")
+    compact.add_argument("root")
+    compact.add_argument("--pending-ttl-hours", type=float, default=PENDING_TTL_SECONDS / 3600)
+
+    rebuild = commands.add_parser("rebuild", help="Rebuild a dimension from its emitted tables")
+    rebuild.add_argument("root")
+    rebuild.add_argument("dimension")
+    rebuild.add_argument("key_column")
+    rebuild.add_argument("paths", nargs="+", help="Parquet or Arrow IPC files of the table")
+
+    args = parser.parse_args()
+    if args.command == "compact":
+        KeyIndex(args.root).compact(int(args.pending_ttl_hours * 3600))
+    else:
+        KeyIndex(args.root).rebuild(args.dimension, args.paths, args.key_column)
@@ -0,0 +1,164 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Sequence
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+# sha256: the original key, first 16 hex characters of the SHA-256 of the "|"-joined values.
+#   Keys of existing warehouse tables must keep using it.
+# fast: 64-bit SipHash of the same joined string (pandas hash_array with its fixed hash key),
+#   as 16 hex characters. Much cheaper, not cryptographic. For new tables only: its keys never
+#   match sha256 keys.
+KEY_MODES = ("sha256", "fast")
+
+# KEY_FORMATS: a key is carried either as its 16 hex characters or as the int64 with the same
+# 8 bytes (big-endian, two's complement). The two convert losslessly with keys_to_int64 and
+# keys_to_hex, so int64 keys can always be mapped back to the legacy hex keys.
+KEY_FORMATS = ("hex", "int64")
+
+# below this many rows a process pool costs more than it saves
+PARALLEL_MIN_ROWS = 200_000
+
+
+def generate_key(*args) -> str:
+    """Generates a deterministic surrogate key from input values."""
+    combined = "|".join(str(arg) for arg in args if arg is not None)
+    return hashlib.sha256(combined.encode()).hexdigest()[:16]
+
+
+def generate_keys(
+    *columns: Sequence, mode: str = "sha256", workers: int = 1, key_format: str = "hex"
+) -> np.ndarray:
+    """
+    Generate the keys of whole columns at once.
+
+    Row i gets the key of generate_key(columns[0][i], columns[1][i], ...): nulls are skipped and
+    the remaining values are joined with "|". The join is done by Arrow over the whole batch,
+    and hashing reads the joined UTF-8 straight from the Arrow data buffer. In sha256 mode a
+    large batch is split over a process pool when workers > 1; workers receive one bytes
+    buffer and its offsets and return the packed digests, so nothing is pickled per row. fast
+    mode hashes the batch in one vectorized call.
+
+    Args:
+        columns: Equal-length sequences (lists, ndarrays, Series or Arrow arrays)
+        mode: One of KEY_MODES
+        workers: Processes for sha256 hashing. 0 uses every core
+        key_format: One of KEY_FORMATS
+
+    Returns:
+        np.ndarray: Object array of 16-character hex keys, or int64 array
+    """
+    return hash_joined(join_columns(*columns), mode=mode, workers=workers, key_format=key_format)
+
+
+def hash_joined(
+    joined: pa.Array, mode: str = "sha256", workers: int = 1, key_format: str = "hex"
+) -> np.ndarray:
+    """Keys of values already joined by join_columns. See generate_keys for the arguments."""
+    if mode not in KEY_MODES:
+        raise ValueError(f"Unknown key mode: {mode}")
+    if key_format not in KEY_FORMATS:
+        raise ValueError(f"Unknown key format: {key_format}")
+
+    if mode == "fast":
+        values = np.asarray(joined.to_numpy(zero_copy_only=False), dtype=object)
+        hashes = pd.util.hash_array(values, categorize=False)
+        return hashes.view(np.int64) if key_format == "int64" else _hex(hashes)
+
+    offsets = np.frombuffer(joined.buffers()[1], dtype=np.int32)[
+        joined.offset : joined.offset + len(joined) + 1
+    ]
+    data = joined.buffers()[2] or pa.py_buffer(b"")
+
+    workers = os.cpu_count() if workers == 0 else workers
+    if workers > 1 and len(joined) >= PARALLEL_MIN_ROWS:
+        bounds = np.linspace(0, len(joined), workers + 1).astype(int)
+        chunks = [
+            (
+                data[offsets[a] : offsets[b]].to_pybytes(),
+                offsets[a : b + 1] - offsets[a],
+            )
+            for a, b in zip(bounds[:-1], bounds[1:])
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            digests = b"".join(pool.map(_sha256_digests, *zip(*chunks)))
+    else:
+        digests = _sha256_digests(data, offsets)
+
+    if key_format == "int64":
+        return np.frombuffer(digests, dtype=">i8").astype(np.int64)
+    return _hex_digests(digests)
+
+
+def keys_to_int64(keys: Sequence) -> np.ndarray:
+    """Convert 16-character hex keys to int64 keys."""
+    return np.frombuffer(bytes.fromhex("".join(keys)), dtype=">i8").astype(np.int64)
+
+
+def keys_to_hex(keys: Sequence) -> np.ndarray:
+    """Convert int64 keys back to their legacy 16-character hex form."""
+    return _hex_digests(np.asarray(keys, dtype=np.int64).astype(">i8").tobytes())
+
+
+def join_columns(*columns: Sequence) -> pa.Array:
+    """'|'-join the non-null values of each row, like generate_key does for one row."""
+    arrays = [_as_strings(column) for column in columns]
+    if not arrays:
+        raise ValueError("generate_keys needs at least one column")
+    if len(arrays) == 1:
+        return pc.fill_null(arrays[0], "")
+
+    # generate_key gives rows of only nulls the key of "". Seeding them with "" also avoids
+    # binary_join_element_wise dropping such rows from its output (pyarrow 22)
+    all_null = arrays[0].is_null()
+    for array in arrays[1:]:
+        all_null = pc.and_(all_null, array.is_null())
+    arrays[0] = pc.if_else(all_null, "", arrays[0])
+
+    return pc.binary_join_element_wise(*arrays, "|", null_handling="skip")
+
+
+def _as_strings(column: Sequence) -> pa.Array:
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+    if isinstance(column, pa.Array):
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            return column.cast(pa.string())
+        column = column.to_pylist()
+    if isinstance(column, pd.Series) and isinstance(column.dtype, pd.StringDtype):
+        return pa.array(column, from_pandas=True).cast(pa.string())
+
+    try:
+        return pa.array(column, type=pa.string(), from_pandas=False)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        # str() of each value keeps keys identical to generate_key for non-string values
+        # (e.g. True -> "True", nan -> "nan"), which Arrow's own casts would not
+        return pa.array([None if v is None else str(v) for v in column], type=pa.string())
+
+
+def _sha256_digests(data, offsets: np.ndarray) -> bytes:
+    """First 8 bytes of the SHA-256 of each value, packed. Their hex is the legacy key."""
+    values = pa.Array.from_buffers(
+        pa.binary(),
+        len(offsets) - 1,
+        [None, pa.py_buffer(np.ascontiguousarray(offsets, dtype=np.int32)), pa.py_buffer(data)],
+    ).to_numpy(zero_copy_only=False)
+    sha256 = hashlib.sha256
+    return b"".join([sha256(value).digest()[:8] for value in values])
+
+
+def _hex(hashes: np.ndarray) -> np.ndarray:
+    """uint64 hashes as zero-padded 16-character hex strings."""
+    return _hex_digests(hashes.astype(">u8").tobytes())
+
+
+def _hex_digests(digests: bytes) -> np.ndarray:
+    """Packed 8-byte digests as 16-character hex strings."""
+    digits = digests.hex()
+    keys = np.empty(len(digests) // 8, dtype=object)
+    keys[:] = [digits[i : i + 16] for i in range(0, len(digits), 16)]
+    return keys
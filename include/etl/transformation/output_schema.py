@@ -0,0 +1,92 @@
+from typing import Dict
+import pyarrow as pa
+
+from include.etl.transformation.transformer_config import SINGLE_FIELDS, SINGLE_FIELD_TYPES
+from include.etl.transformation.extraction_plan import PLAN
+from include.etl.transformation.enumerations import DICTIONARY_TYPE, ENUMERATIONS
+
+
+# Columns of every transform output table, in order. Columns ending in _key hold surrogate keys
+# (string or int64, see keys.KEY_FORMATS); enumerated columns are dictionary-encoded (see
+# enumerations.ENUMERATIONS); types of other columns are in COLUMN_TYPES, and anything not
+# listed there is a string. Tables of the generic entities come from the extraction
+# plan, typed as landed.
+TABLE_COLUMNS = {
+    "studies": ["study_key", *SINGLE_FIELDS],
+    "sponsors": ["sponsor_key", "name", "sponsor_class"],
+    "study_sponsors": ["study_key", "sponsor_key", "is_lead"],
+    "conditions": ["condition_key", "condition_name"],
+    "study_conditions": ["study_key", "condition_key"],
+    "keywords": ["keyword_key", "keyword_name"],
+    "study_keywords": ["study_key", "keyword_key"],
+    "arm_group_interventions": [
+        "study_key", "arm_intervention_key", "arm_label", "arm_description", "arm_type",
+        "arm_intervention_name",
+    ],
+    "interventions": [
+        "intervention_key", "intervention_name", "intervention_type", "description",
+        "is_primary_name",
+    ],
+    "study_interventions": ["study_key", "intervention_key", "is_primary_name"],
+    "central_contacts": [
+        "contact_key", "contact_name", "contact_role", "contact_phone", "contact_email",
+    ],
+    "study_central_contacts": ["study_key", "contact_key"],
+    "locations": ["location_key", "facility", "city", "state", "country", "status", "lat", "lon"],
+    "study_locations": ["study_key", "location_key", "status", "status_type", "contacts"],
+    "references": ["study_key", "ref_key", "pmid", "type", "citation"],
+    "links": ["study_key", "link_key", "label", "url"],
+    "ipds": ["study_key", "ipd_key", "id", "type", "url", "comment"],
+    "flow_groups": ["study_key", "group_key", "id", "title", "description"],
+    "flow_period_events": [
+        "study_key", "period_title", "event_class", "event_type", "group_id", "num_subjects",
+        "period_key",
+    ],
+    **PLAN.table_columns(),
+    # change detection, see change_index
+    "study_versions": ["nct_id", "content_hash", "last_updated", "change"],
+    "study_changes": ["nct_id", "change", "last_updated"],
+}
+
+_CONTACTS = pa.list_(
+    pa.struct([(name, pa.string()) for name in ("name", "role", "phone", "phoneExt", "email")])
+)
+
+_SINGLE_FIELD_ARROW_TYPES = {
+    "date": pa.date32(),
+    "bool": pa.bool_(),
+    "int": pa.int64(),
+    "float": pa.float64(),
+}
+
+COLUMN_TYPES: Dict[str, pa.DataType] = {
+    "is_lead": pa.bool_(),
+    "is_primary_name": pa.bool_(),
+    "lat": pa.float64(),
+    "lon": pa.float64(),
+    "num_subjects": pa.int64(),
+    "content_hash": pa.int64(),
+    "contacts": _CONTACTS,
+}
+
+_PLAN_TYPES = PLAN.column_types()
+
+_STUDY_TYPES = {
+    column: _SINGLE_FIELD_ARROW_TYPES[kind] for column, kind in SINGLE_FIELD_TYPES.items()
+}
+
+
+def table_schema(name: str, key_format: str = "hex") -> pa.Schema:
+    """Arrow schema of a transform output table."""
+    key_type = pa.int64() if key_format == "int64" else pa.string()
+    types = _STUDY_TYPES if name == "studies" else _PLAN_TYPES.get(name, COLUMN_TYPES)
+
+    fields = []
+    for column in TABLE_COLUMNS[name]:
+        if column.endswith("_key"):
+            fields.append(pa.field(column, key_type))
+        elif column in ENUMERATIONS:
+            fields.append(pa.field(column, DICTIONARY_TYPE))
+        else:
+            fields.append(pa.field(column, types.get(column, pa.string())))
+    return pa.schema(fields)
@@ -0,0 +1,184 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List
+import multiprocessing
+import os
+import tempfile
+import time
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from include.etl.transformation.streaming import IpcTableWriter, TableSink
+from config.env_config import config
+
+
+def default_spill_dir() -> str:
+    """
+    config.TRANSFORM_SPILL_DIR, or the system temporary directory. Spills are as large as the
+    run's output, so they belong on disk rather than in RAM-backed storage like /dev/shm.
+    """
+    return config.TRANSFORM_SPILL_DIR or tempfile.gettempdir()
+
+
+def spill_study_file(transformer, file_index: int, data_loc: str, spill_dir: str) -> Dict:
+    """
+    Stream one file through a transformer into Arrow IPC streams in spill_dir.
+
+    Tables are flushed to the files as their buffers reach config.TRANSFORM_FLUSH_ROWS or
+    config.TRANSFORM_FLUSH_MB, so the memory held per file stays flat however large it is.
+
+    Returns:
+        Dict with file, seconds, studies, rows (table -> row count), tables (table -> path) and
+        unknown_values (see Transformer.unknown_values)
+    """
+    start = time.perf_counter()
+    sink = TableSink(
+        IpcTableWriter(spill_dir, f"{os.getpid()}-{file_index:06d}"),
+        transformer.key_format,
+        max_rows=config.TRANSFORM_FLUSH_ROWS,
+        max_bytes=config.TRANSFORM_FLUSH_MB * 1024 * 1024,
+    )
+    transformer.unknown_values = {}
+    rows = transformer.stream_study_file(data_loc, sink)
+    paths = sink.close()
+
+    return {
+        "file": data_loc,
+        "seconds": round(time.perf_counter() - start, 4),
+        "studies": rows.get("studies", 0),
+        "rows": rows,
+        "tables": paths,
+        "unknown_values": transformer.unknown_values,
+    }
+
+
+def transform_file_worker(
+    file_index: int,
+    data_loc: str,
+    spill_dir: str,
+    execution_date: str | None,
+    key_format: str,
+    key_index_run: str | None = None,
+) -> Dict:
+    """
+    Transform one file in a pool worker and spill its tables as Arrow IPC files.
+
+    Only the spill paths and timings go back to the parent, which streams the IPC files into
+    the output instead of unpickling DataFrames. Each worker keeps its own Transformer, and with
+    it its own dimension key cache, for every file it is given.
+
+    Returns:
+        See spill_study_file. With a persistent key cache, also key_cache: the entries the
+        worker hashed for this file, for the parent to merge and save
+    """
+    transformer = _worker_transformer(execution_date, key_format)
+    if transformer.key_index is not None:
+        # appends stay pending until the parent commits the run
+        transformer.key_index.run_id = key_index_run
+    result = spill_study_file(transformer, file_index, data_loc, spill_dir)
+    if transformer.key_cache is not None and transformer.key_cache.track_new:
+        result["key_cache"] = transformer.key_cache.take_new()
+    return result
+
+
+_transformer = None
+
+
+def _worker_transformer(execution_date: str | None, key_format: str):
+    global _transformer
+    if _transformer is None:
+        from include.etl.transformation.transformation import Transformer
+
+        # transform_study_file does no S3 I/O, the hook is never used
+        _transformer = Transformer({"ds": execution_date}, s3_dest_hook=object())
+        _transformer.key_format = key_format
+        if _transformer.key_cache is not None:
+            _transformer.key_cache.key_format = key_format
+            # only the parent run persists the cache, the worker returns what it learns
+            _transformer.key_cache.track_new = bool(_transformer.key_cache.path)
+            _transformer.key_cache.path = None
+    return _transformer
+
+
+def write_spilled(
+    results: List[Dict],
+    writer,
+    dimension_keys: Dict[str, str],
+    keep: Iterable[str] = (),
+) -> Dict[str, List[pa.RecordBatch]]:
+    """
+    Stream the spilled tables of every file into an output writer, one record batch at a time,
+    dropping dimension members written by an earlier file (first occurrence wins).
+
+    Only the dimension keys written so far are held, never the rows of a table, so memory does
+    not grow with the size of the run. Each spill file is deleted once it has been written.
+
+    Args:
+        results: Worker results in file order, see spill_study_file
+        writer: ParquetTableWriter receiving the tables
+        dimension_keys: Dimension table -> key column
+        keep: Tables returned to the caller instead of written
+
+    Returns:
+        Dict of kept table -> its record batches
+    """
+    keep = set(keep)
+    kept: Dict[str, List[pa.RecordBatch]] = {name: [] for name in keep}
+    written: Dict[str, set] = {}
+    created = set()
+    for result in results:
+        for name, path in result["tables"].items():
+            key_column = dimension_keys.get(name)
+            with pa.memory_map(path) as source:
+                reader = ipc.open_stream(source)
+                if name not in keep and name not in created:
+                    # an empty table has no batches, its file still gets the schema
+                    writer.write(name, reader.schema.empty_table())
+                    created.add(name)
+                for batch in reader:
+                    if name in keep:
+                        kept[name].append(batch)
+                        continue
+                    if key_column and batch.num_rows:
+                        new = _first_written(batch, key_column, written.setdefault(name, set()))
+                        batch = batch.filter(pa.array(new))
+                    writer.write(name, pa.Table.from_batches([batch]))
+            os.remove(path)
+    return kept
+
+
+def _first_written(batch: pa.RecordBatch, key_column: str, written: set) -> np.ndarray:
+    """Mask of the rows whose key is not in written, adding those keys to it."""
+    keys = batch.column(key_column).to_numpy(zero_copy_only=False)
+    new = np.zeros(len(keys), dtype=bool)
+    for i, key in enumerate(keys.tolist()):
+        if key not in written:
+            written.add(key)
+            new[i] = True
+    return new
+
+
+def run_pool(
+    data_locs: List[str],
+    workers: int,
+    execution_date: str | None,
+    key_format: str,
+    spill_dir: str,
+    key_index_run: str | None = None,
+) -> List[Dict]:
+    """
+    Transform files in a process pool.
+
+    Returns:
+        Worker results in file order, see transform_file_worker
+    """
+    # spawn: the Airflow task process runs threads, which fork does not copy safely
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [
+            pool.submit(
+                transform_file_worker, i, loc, spill_dir, execution_date, key_format, key_index_run
+            )
+            for i, loc in enumerate(data_locs)
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,177 @@
+from typing import Callable, Dict, List
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from include.etl.transformation.output_schema import table_schema
+
+
+def to_record_batch(df: pd.DataFrame, schema: pa.Schema) -> pa.RecordBatch:
+    """Convert a transform DataFrame to its declared Arrow schema."""
+    if df.empty:
+        # empty extractions may not carry every column
+        return pa.RecordBatch.from_pylist([], schema=schema)
+    return pa.RecordBatch.from_pandas(df, schema=schema, preserve_index=False).replace_schema_metadata(None)
+
+
+class ColumnAccumulator:
+    """
+    Typed column buffers of one output table.
+
+    Appended rows are converted once to the table's declared Arrow types and kept as
+    per-column chunks, not as Python objects. When the buffered rows or bytes reach the
+    threshold, the chunks are written out as one table and released, so memory is bounded by
+    the threshold rather than by the size of the input.
+
+    Args:
+        name: Table name
+        schema: Declared schema, see output_schema.table_schema
+        write: Receives each flushed table
+        max_rows: Flush threshold in rows
+        max_bytes: Flush threshold in Arrow buffer bytes
+    """
+
+    def __init__(
+        self,
+        name: str,
+        schema: pa.Schema,
+        write: Callable[[str, pa.Table], None],
+        max_rows: int,
+        max_bytes: int,
+    ):
+        self.name = name
+        self.schema = schema
+        self.write = write
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+
+        self.columns: List[List[pa.Array]] = [[] for _ in schema]
+        self.buffered_rows = 0
+        self.buffered_bytes = 0
+        self.total_rows = 0
+        self.flushes = 0
+
+    def append(self, df: pd.DataFrame) -> None:
+        batch = to_record_batch(df, self.schema)
+        for chunks, column in zip(self.columns, batch.columns):
+            chunks.append(column)
+        self.buffered_rows += batch.num_rows
+        self.buffered_bytes += batch.nbytes
+        self.total_rows += batch.num_rows
+
+        if self.buffered_rows >= self.max_rows or self.buffered_bytes >= self.max_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.buffered_rows and self.flushes:
+            return
+        arrays = [
+            pa.concat_arrays(chunks) if chunks else pa.array([], type=field.type)
+            for chunks, field in zip(self.columns, self.schema)
+        ]
+        self.write(self.name, pa.Table.from_arrays(arrays, schema=self.schema))
+
+        self.columns = [[] for _ in self.schema]
+        self.buffered_rows = 0
+        self.buffered_bytes = 0
+        self.flushes += 1
+
+
+class TableSink:
+    """
+    Streams transform output to a table writer through one ColumnAccumulator per table.
+
+    Args:
+        writer: IpcTableWriter or ParquetTableWriter
+        key_format: Key format of the tables, for their schemas
+        max_rows: Per-table flush threshold in rows
+        max_bytes: Per-table flush threshold in bytes
+    """
+
+    def __init__(self, writer, key_format: str, max_rows: int, max_bytes: int):
+        self.writer = writer
+        self.key_format = key_format
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.accumulators: Dict[str, ColumnAccumulator] = {}
+
+    def append(self, tables: Dict[str, pd.DataFrame]) -> None:
+        for name, df in tables.items():
+            accumulator = self.accumulators.get(name)
+            if accumulator is None:
+                accumulator = ColumnAccumulator(
+                    name, table_schema(name, self.key_format), self.writer.write,
+                    self.max_rows, self.max_bytes,
+                )
+                self.accumulators[name] = accumulator
+            accumulator.append(df)
+
+    @property
+    def rows(self) -> Dict[str, int]:
+        return {name: acc.total_rows for name, acc in self.accumulators.items()}
+
+    def close(self) -> Dict[str, str]:
+        """
+        Flush every table and close the writer.
+
+        Returns:
+            Dict of table name -> output path
+        """
+        for accumulator in self.accumulators.values():
+            accumulator.flush()
+        paths = self.writer.close()
+        # in append order, not in the order the tables first flushed
+        return {name: paths[name] for name in self.accumulators}
+
+
+class IpcTableWriter:
+    """
+    Writes each table to {directory}/{prefix}-{table}.arrow as an Arrow IPC stream.
+
+    The stream format, unlike the IPC file format, lets each flush carry its own dictionaries
+    for the dictionary-encoded columns.
+    """
+
+    def __init__(self, directory: str, prefix: str):
+        self.directory = directory
+        self.prefix = prefix
+        self._writers: Dict[str, ipc.RecordBatchStreamWriter] = {}
+        self._paths: Dict[str, str] = {}
+
+    def write(self, name: str, table: pa.Table) -> None:
+        if name not in self._writers:
+            path = os.path.join(self.directory, f"{self.prefix}-{name}.arrow")
+            self._writers[name] = ipc.new_stream(path, table.schema)
+            self._paths[name] = path
+        self._writers[name].write_table(table)
+
+    def close(self) -> Dict[str, str]:
+        for writer in self._writers.values():
+            writer.close()
+        return dict(self._paths)
+
+
+class ParquetTableWriter:
+    """Writes each table to {directory}/{table}/{prefix}.parquet, one row group per flush."""
+
+    def __init__(self, directory: str, prefix: str, compression: str = "zstd"):
+        self.directory = directory
+        self.prefix = prefix
+        self.compression = compression
+        self._writers: Dict[str, pq.ParquetWriter] = {}
+        self._paths: Dict[str, str] = {}
+
+    def write(self, name: str, table: pa.Table) -> None:
+        if name not in self._writers:
+            os.makedirs(os.path.join(self.directory, name), exist_ok=True)
+            path = os.path.join(self.directory, name, f"{self.prefix}.parquet")
+            self._writers[name] = pq.ParquetWriter(path, table.schema, compression=self.compression)
+            self._paths[name] = path
+        self._writers[name].write_table(table)
+
+    def close(self) -> Dict[str, str]:
+        for writer in self._writers.values():
+            writer.close()
+        return dict(self._paths)
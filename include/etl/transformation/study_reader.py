@@ -0,0 +1,66 @@
+from typing import Dict, Iterable, Tuple
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from include.etl.transformation.casting import STRING_DTYPE
+from include.etl.transformation.extraction_plan import PLAN, ExtractionPlan
+
+
+# pandas types of landed scalars. Strings stay Arrow-backed, booleans and integers nullable
+_PANDAS_TYPES = {
+    pa.string(): STRING_DTYPE,
+    pa.bool_(): pd.BooleanDtype(),
+    pa.int64(): pd.Int64Dtype(),
+}
+
+
+class StudyReader:
+    """
+    Selective flattening of a batch of landed studies.
+
+    Replaces pd.json_normalize, which turns every nested dict of every study into Python
+    objects and then into hundreds of sparse columns, most of them never read. Only the paths
+    of the extraction plan are materialized, straight from the landed Arrow struct: each struct
+    along a path is resolved once (struct_field, no copy of the leaf buffers), scalar leaves are
+    converted to pandas column by column, and list-valued fields stay Arrow lists for the
+    columnar extractors.
+
+    Args:
+        studies: StructArray of study documents (LANDING_SCHEMA "studies" column)
+        plan: Compiled extraction plan, see extraction_plan
+    """
+
+    def __init__(self, studies: pa.StructArray | pa.ChunkedArray, plan: ExtractionPlan = PLAN):
+        if isinstance(studies, pa.ChunkedArray):
+            studies = studies.combine_chunks()
+        self.studies = studies
+        self.plan = plan
+        self._columns: Dict[Tuple[str, ...], pa.Array] = {(): studies}
+
+    def column(self, path: str | Tuple[str, ...]) -> pa.Array:
+        """Field at a dotted path, null wherever any ancestor is null."""
+        path = tuple(path.split(".")) if isinstance(path, str) else path
+        values = self._columns.get(path)
+        if values is None:
+            values = pc.struct_field(self.column(path[:-1]), [path[-1]])
+            self._columns[path] = values
+        return values
+
+    def flatten(self, paths: Iterable[str]) -> pd.DataFrame:
+        """
+        Scalar fields at the given dotted paths as a frame with one column per path, like the
+        matching columns of pd.json_normalize. Paths that are not landed become null columns.
+        """
+        columns = {}
+        for path in paths:
+            try:
+                values = self.column(path)
+            except pa.ArrowInvalid:
+                values = pa.nulls(len(self.studies), pa.string())
+            columns[path] = values.to_pandas(types_mapper=_PANDAS_TYPES.get)
+        return pd.DataFrame(columns, index=pd.RangeIndex(len(self.studies)))
+
+    def study_fields(self) -> pd.DataFrame:
+        """The SINGLE_FIELDS paths, the input of casting.project_study_fields."""
+        return self.flatten(".".join(path) for path, _, _ in self.plan.single_fields.values())
@@ -1,16 +1,80 @@
 from typing import Dict, List, Tuple, Hashable
 import logging
+import os
+import shutil
+import tempfile
 import pandas as pd
 import numpy as np
-import hashlib
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import json
 
-from transformer_config import SINGLE_FIELDS, NESTED_FIELDS
-from data_quality import DataQualityHandler
+from include.etl.transformation.transformer_config import (
+    SINGLE_FIELDS, SINGLE_FIELD_TYPES, NESTED_FIELDS,
+)
+from include.etl.transformation.data_quality import DataQualityHandler
+from include.etl.transformation.columnar import ColumnarExtractor
+from include.etl.transformation.extraction_plan import PLAN
+from include.etl.transformation.study_reader import StudyReader
+from include.etl.transformation.casting import STRING_DTYPE, project_study_fields
+from include.etl.transformation.keys import generate_key, generate_keys, hash_joined, join_columns
+from include.etl.transformation.dimension_cache import DimensionKeyCache
+from include.etl.transformation.key_index import KeyIndex
+from include.etl.transformation.change_index import ChangeIndex, UNCHANGED, is_full_snapshot
+from include.etl.transformation.output_schema import table_schema
+from include.etl.transformation.enumerations import encode_tables, group_codes, integer_codes
+from include.etl.transformation.parallel import (
+    default_spill_dir, run_pool, spill_study_file, write_spilled,
+)
+from include.etl.transformation.streaming import ParquetTableWriter, TableSink
+from config.env_config import config
 from airflow.utils.context import Context
 from airflow.providers.amazon.aws.hooks.s3 import S3Hook
 
 
+# tables of the hand-written extractors, in extraction order. The generic entity tables follow,
+# see extraction_plan
+TABLE_NAMES = (
+    "sponsors", "study_sponsors",
+    "conditions", "study_conditions",
+    "keywords", "study_keywords",
+    "arm_group_interventions", "interventions", "study_interventions",
+    "central_contacts", "study_central_contacts",
+    "locations", "study_locations",
+    "references", "links", "ipds",
+    "flow_groups", "flow_period_events",
+)
+
+# dimension tables and their keys. A member is emitted once per run, see drop_emitted
+DIMENSION_KEYS = {
+    "sponsors": "sponsor_key",
+    "conditions": "condition_key",
+    "keywords": "keyword_key",
+    "interventions": "intervention_key",
+    "locations": "location_key",
+    "central_contacts": "contact_key",
+    **PLAN.dimension_keys(),
+}
+
+DEDUPE_SUBSETS = {
+    "sponsors": ["sponsor_key"],
+    "conditions": ["condition_key"],
+    "keywords": ["keyword_key"],
+    "interventions": ["intervention_key"],
+    "arm_group_interventions": ["arm_intervention_key", "study_key", "arm_intervention_name"],
+    "locations": ["location_key"],
+    "central_contacts": ["contact_key"],
+    "references": ["study_key", "ref_key"],
+    "links": ["study_key", "link_key", "url"],
+    "ipds": ["study_key", "ipd_key"],
+    "flow_groups": ["study_key", "group_key"],
+    **PLAN.dedupe_subsets(),
+}
+
+# flow events are aggregated over these columns, see dedupe_tables
+FLOW_EVENT_GROUP = ["study_key", "period_title", "event_class", "event_type", "group_id"]
+
 class Transformer:
     def __init__(self, context: Context, s3_dest_hook: S3Hook = None):
         self.context = context
@@ -19,191 +83,440 @@ class Transformer:
 
         self.s3 = s3_dest_hook or S3Hook(aws_conn_id="aws_airflow")
         self.dq_handler = DataQualityHandler()
+        # "hex" or "int64" (same hash, see keys.KEY_FORMATS)
+        self.key_format = config.TRANSFORM_KEY_FORMAT
+        # per-file timings of the last transform_all_studies
+        self.file_timings: List[Dict] = []
+        # natural key -> key memo shared by every file of the run
+        self.key_cache = (
+            DimensionKeyCache(
+                config.TRANSFORM_KEY_CACHE_SIZE,
+                key_format=self.key_format,
+                path=config.TRANSFORM_KEY_CACHE_PATH or None,
+            )
+            if config.TRANSFORM_KEY_CACHE_SIZE
+            else None
+        )
+        # dimension keys emitted by every earlier run, members in it are not emitted again
+        self.key_index = KeyIndex(config.TRANSFORM_KEY_INDEX_DIR) if config.TRANSFORM_KEY_INDEX_DIR else None
+        # content hash of every study as of the last successful run, unchanged studies are skipped
+        self.change_index = (
+            ChangeIndex(config.TRANSFORM_CHANGE_INDEX_DIR) if config.TRANSFORM_CHANGE_INDEX_DIR else None
+        )
+        # inserted, updated and deleted studies of the last transform_all_studies
+        self.changes: pd.DataFrame | None = None
+        # study versions and snapshot flag of the last transform_all_studies, saved by commit_run
+        self._versions: Tuple[pd.DataFrame, bool] | None = None
+        # column -> values nulled because they did not fit the declared type
+        self.coercion_failures: Dict[str, int] = {}
+        # column -> value -> count of values missing from enumerations.ENUMERATIONS
+        self.unknown_values: Dict[str, Dict[str, int]] = {}
 
     @staticmethod
     def generate_key(*args) -> str:
         """Generates a deterministic surrogate key from input values."""
-        combined = "|".join(str(arg) for arg in args if arg is not None)
-        return hashlib.sha256(combined.encode()).hexdigest()[:16]
+        return generate_key(*args)
 
-    def transform_all_studies(self, folder: str) -> None:
-        for study_file in folder:
-            study_file_loc = ""
-            try:
-                # pull from s3
-                self.transform_study_file(study_file_loc)
-                # checkpoint
+    def generate_keys(self, *columns, mode: str = "sha256") -> np.ndarray:
+        """
+        Generates the keys of whole columns at once, see keys.generate_keys.
+        Existing tables must use the default sha256 mode, fast is for new tables only.
+        Keys are hex strings or int64 depending on self.key_format
+        """
+        return generate_keys(
+            *columns, mode=mode, workers=config.TRANSFORM_KEY_WORKERS, key_format=self.key_format
+        )
 
-            # inner loop will fail gracefully wherever possible and errors will only raise for critical issues
-            except Exception as e:
-                raise
+    def dimension_keys(self, *columns) -> np.ndarray:
+        """
+        Keys of dimension members, answered from the run's key cache where possible.
+        Same keys as generate_keys
+        """
+        if self.key_cache is None:
+            return self.generate_keys(*columns)
+        return self.key_cache.keys(
+            join_columns(*columns),
+            lambda joined: hash_joined(
+                joined, workers=config.TRANSFORM_KEY_WORKERS, key_format=self.key_format
+            ),
+        )
 
-    def transform_study_file(self, data_loc: str):
+    def drop_emitted(self, tables: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        Drop dimension rows already emitted by an earlier file of this run, or by an earlier
+        run when the persistent key index is enabled.
+        Args:
+            tables: Deduplicated tables of one file
+        Returns:
+            Dict of table name -> DataFrame
+        """
+        if self.key_cache is None and self.key_index is None:
+            return tables
+
+        tables = dict(tables)
+        for name, key_column in DIMENSION_KEYS.items():
+            df = tables.get(name)
+            if df is not None and not df.empty:
+                keys = df[key_column].to_numpy()
+                new = np.ones(len(df), dtype=bool)
+                if self.key_cache is not None:
+                    new &= self.key_cache.claim(name, keys.tolist())
+                if self.key_index is not None:
+                    new[new] = self.key_index.claim(name, keys[new])
+                tables[name] = df[new].reset_index(drop=True)
+        return tables
+
+    def transform_all_studies(
+        self, data_locs: List[str], output_dir: str, workers: int | None = None,
+        manifest: Dict | None = None,
+    ) -> Dict[str, str]:
+        """
+        Transform every landed page file into one Parquet file per output table.
+        Files are transformed in a process pool. Each file is streamed in batches and its
+        tables are spilled as Arrow IPC files (see parallel.default_spill_dir). The parent
+        streams the spills into the output batch by batch, in file order, dropping dimension
+        members emitted by more than one file, so no table is ever held whole in memory.
+        Args:
+            data_locs: Local paths of the landing files
+            output_dir: Tables are written to {output_dir}/{table}/{execution_date}.parquet
+            workers: Pool size. Defaults to config.TRANSFORM_WORKERS, 0 uses every core and
+                1 transforms serially in this process (for debugging)
+            manifest: Extraction manifest the files were landed with. Studies missing from the
+                files are only reported as deleted when it is a full snapshot of the registry,
+                see change_index.is_full_snapshot (change index only)
+        Returns:
+            Dict of table name -> Parquet path. Per-file timings are in self.file_timings.
+            With the change index, only changed studies are transformed and "study_changes"
+            lists the inserted, updated and deleted NCT IDs (also in self.changes)
+        """
+        workers = config.TRANSFORM_WORKERS if workers is None else workers
+        workers = min(os.cpu_count() if workers == 0 else workers, max(len(data_locs), 1))
+        self.file_timings = []
+        unknown_values = {}
+
+        writer = ParquetTableWriter(output_dir, self.execution_date or "transform")
+        run_dir = tempfile.mkdtemp(prefix="ctgov-transform-", dir=default_spill_dir())
+        try:
+            if workers <= 1:
+                results = [
+                    spill_study_file(self, i, data_loc, run_dir) for i, data_loc in enumerate(data_locs)
+                ]
+            else:
+                results = run_pool(
+                    data_locs, workers, self.execution_date, self.key_format, run_dir,
+                    key_index_run=self.key_index.run_id if self.key_index is not None else None,
+                )
+            for result in results:
+                self.file_timings.append(
+                    {
+                        k: v for k, v in result.items()
+                        if k not in ("tables", "unknown_values", "key_cache")
+                    }
+                )
+                if self.key_cache is not None and "key_cache" in result:
+                    # saved with the parent's own entries by commit_run
+                    self.key_cache.merge(result["key_cache"])
+                self.count_unknown_values(result["unknown_values"], unknown_values)
+                self.log.info(
+                    f"Transformed {result['file']}: {result['studies']} studies "
+                    f"in {result['seconds']}s"
+                )
+
+            kept = write_spilled(results, writer, DIMENSION_KEYS, keep=["study_versions"])
+            if self.change_index is not None:
+                self.record_changes(kept["study_versions"], writer, is_full_snapshot(manifest))
+        finally:
+            paths = writer.close()
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+        self.unknown_values = unknown_values
+        for column, values in unknown_values.items():
+            self.log.warning(
+                f"{sum(values.values())} values of {column} are not in its enumeration: "
+                f"{sorted(values, key=values.get, reverse=True)[:10]}"
+            )
+
+        self.log.info(
+            f"Transformed {len(data_locs)} files with {workers} worker(s) in "
+            f"{sum(t['seconds'] for t in self.file_timings):.2f}s of file time into {output_dir}"
+        )
+
+        if self.key_cache is not None:
+            self.log.info(f"Dimension key cache: {self.key_cache.stats}")
+
+        return paths
+
+    def commit_run(self) -> None:
+        """
+        Persist the state of the last transform_all_studies for the next run. Called by the
+        load step once the output has been loaded: until then the run has not succeeded, and a
+        run that is never committed leaves the state of the previous successful run in place,
+        so its dimension members and changed studies are emitted again by the next run.
+        """
+        if self.key_cache is not None:
+            self.key_cache.save()
+
+        if self.key_index is not None:
+            # the members claimed by this run are only skipped by later runs from here on
+            self.key_index.commit()
+            self.log.info(f"Committed key index run {self.key_index.run_id} under {self.key_index.root}")
+
+        if self.change_index is not None and self._versions is not None:
+            # unchanged studies are only skipped by later runs from here on
+            self.change_index.save(*self._versions)
+            self._versions = None
+            self.log.info(f"Saved change index {self.change_index.path}")
+
+    def record_changes(
+        self, version_batches: List[pa.RecordBatch], writer: ParquetTableWriter, full_snapshot: bool
+    ) -> None:
+        """
+        Write the change set of a run as the study_changes table. The per-study versions
+        become the change index of the next run once commit_run saves them.
+        """
+        versions = (
+            pa.Table.from_batches(version_batches).to_pandas() if version_batches
+            else pd.DataFrame(columns=["nct_id", "content_hash", "last_updated", "change"])
+        ).drop_duplicates("nct_id", keep="last")
+
+        self.changes = self.change_index.change_set(versions, full_snapshot)
+        writer.write(
+            "study_changes",
+            pa.Table.from_pandas(
+                self.changes, schema=table_schema("study_changes"), preserve_index=False
+            ).replace_schema_metadata(None),
+        )
+        self._versions = (versions, full_snapshot)
+
+        unchanged = int((versions["change"] == UNCHANGED).sum())
+        self.log.info(f"Study changes: {ChangeIndex.summary(self.changes)}, {unchanged} unchanged")
+
+    def transform_study_file(self, data_loc: str) -> Dict[str, pd.DataFrame]:
         """
         Transform a batch of raw study dicts in a file.
+        Holds the whole file in memory, stream_study_file is the bounded-memory equivalent.
         Args:
             data_loc: Location of the  file
+        Returns:
+            Dict of table name -> DataFrame: "studies" and every nested entity table
         """
-        all_studies = []
-        all_sponsors = []
-        all_study_sponsors = []
+        return self.transform_batch(pq.read_table(data_loc, columns=["studies"]).column("studies"))
 
-        all_conditions = []
-        all_study_conditions = []
+    def stream_study_file(self, data_loc: str, sink: TableSink, batch_rows: int | None = None) -> Dict[str, int]:
+        """
+        Transform a file batch by batch into a sink.
+        Only one batch of studies and the sink's buffers (bounded by its flush thresholds) are
+        held in memory, however large the file. A study's rows always come from a single batch,
+        dimension members repeated across batches are dropped by drop_emitted or when files
+        are merged.
+        Args:
+            data_loc: Location of the file
+            sink: Receives the tables of every batch
+            batch_rows: Studies per batch. Defaults to config.TRANSFORM_BATCH_ROWS
+        Returns:
+            Dict of table name -> rows written
+        """
+        batch_rows = batch_rows or config.TRANSFORM_BATCH_ROWS
+        landing = pq.ParquetFile(data_loc)
+        for batch in landing.iter_batches(batch_size=batch_rows, columns=["studies"]):
+            sink.append(self.transform_batch(batch.column("studies")))
+        return sink.rows
+
+    def transform_batch(self, studies: pa.Array | pa.ChunkedArray) -> Dict[str, pd.DataFrame]:
+        """
+        Transform a batch of landed studies.
+        Args:
+            studies: The landed "studies" column, or a slice of it
+        Returns:
+            Dict of table name -> DataFrame: "studies" and every nested entity table
+        """
+        versions = None
+        if self.change_index is not None:
+            studies, versions = self.skip_unchanged(studies)
+
+        df_studies = self.extract_study_facts(StudyReader(studies).study_fields())
 
-        all_keywords = []
-        all_study_keywords = []
+        # nested entities for every study at once
+        tables = self.extract_nested_columnar(studies)
+        tables, unknown_values = encode_tables({"studies": df_studies, **tables})
+        self.count_unknown_values(unknown_values, self.unknown_values)
+        tables = self.dedupe_tables(tables)
+        tables = self.drop_emitted(tables)
+
+        if versions is not None:
+            tables["study_versions"] = versions
+        return tables
+
+    @staticmethod
+    def count_unknown_values(unknown_values: Dict[str, Dict[str, int]], counts: Dict[str, Dict[str, int]]) -> None:
+        """Add the unknown enumeration values of a batch or file to counts."""
+        for column, values in unknown_values.items():
+            counted = counts.setdefault(column, {})
+            for value, count in values.items():
+                counted[value] = counted.get(value, 0) + count
+
+    def skip_unchanged(self, studies: pa.Array | pa.ChunkedArray) -> Tuple[pa.Array, pd.DataFrame]:
+        """
+        Drop the studies whose content is unchanged since the last successful run.
+        Args:
+            studies: The landed "studies" column, or a slice of it
+        Returns:
+            Tuple of (changed studies, version of every study with an NCT ID, see
+            ChangeIndex.detect)
+        """
+        if isinstance(studies, pa.ChunkedArray):
+            studies = studies.combine_chunks()
 
-        all_study_arm_group_interventions = []
-        all_interventions = []
-        all_study_interventions = []
+        versions = self.change_index.detect(studies)
+        changed = (versions["change"] != UNCHANGED).to_numpy()
+        has_nct_id = versions["nct_id"].fillna("").str.len().to_numpy() > 0
+        return studies.filter(pa.array(changed)), versions[has_nct_id].reset_index(drop=True)
 
-        all_locations = []
-        all_study_locations = []
-        all_central_contacts = []
-        all_study_central_contacts = []
+    def extract_study_facts(self, df_normalized: pd.DataFrame) -> pd.DataFrame:
+        """
+        Project and type the SINGLE_FIELDS columns of every study in one step.
+        Studies without an NCT ID are dropped. Values that do not fit their declared type are
+        nulled and counted in self.coercion_failures
+        Args:
+            df_normalized: Studies flattened to dotted-path columns, one row per study
+                (StudyReader.study_fields, or pd.json_normalize)
+        Returns:
+            DataFrame with study_key followed by the SINGLE_FIELDS columns
+        """
+        df_studies, failures = project_study_fields(df_normalized)
+
+        has_nct_id = df_studies["nct_id"].fillna("").str.len() > 0
+        if not has_nct_id.all():
+            self.log.warning(f"{int((~has_nct_id).sum())} studies missing NCT ID, skipping")
+        df_studies = df_studies[has_nct_id].reset_index(drop=True)
+
+        study_keys = self.generate_keys(df_studies["nct_id"])
+        if self.key_format == "hex":
+            study_keys = pd.Series(study_keys, dtype=STRING_DTYPE)
+        df_studies.insert(0, "study_key", study_keys)
+
+        for column, count in failures.items():
+            self.coercion_failures[column] = self.coercion_failures.get(column, 0) + count
+            self.log.warning(
+                f"{count} values of {column} could not be cast to "
+                f"{SINGLE_FIELD_TYPES.get(column)} and were nulled"
+            )
 
-        all_study_references = []
-        all_study_links = []
+        return df_studies
 
-        all_ipds = []
-        all_flow_groups = []
-        all_flow_period_events = []
+    def extract_nested_columnar(self, studies: pa.Array | pa.ChunkedArray) -> Dict[str, pd.DataFrame]:
+        """
+        Extract every nested entity of a file with the columnar engine.
+        Args:
+            studies: The landed "studies" column
+        Returns:
+            Dict of table name -> DataFrame, before deduplication
+        """
+        if isinstance(studies, pa.ChunkedArray):
+            studies = studies.combine_chunks()
 
+        nct_ids = pc.struct_field(studies, SINGLE_FIELDS["nct_id"].split("."))
+        has_nct_id = pc.fill_null(pc.greater(pc.utf8_length(nct_ids), 0), False)
+        studies = studies.filter(has_nct_id)
 
+        study_keys = self.generate_keys(nct_ids.filter(has_nct_id))
+        return ColumnarExtractor(
+            studies, study_keys, self.generate_keys, self.dq_handler, self.dimension_keys
+        ).extract_all()
 
-        df_studies = pd.read_parquet(data_loc)
-        df_studies = pd.json_normalize(df_studies["studies"])
+    def extract_nested_per_row(self, df_studies: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """
+        Extract every nested entity of a file study by study with the extract_* methods.
+        Reference implementation for the columnar engine, see include/tests/transform_parity.py
+        Args:
+            df_studies: Normalized studies, one row per study
+        Returns:
+            Dict of table name -> DataFrame, before deduplication
+        """
+        rows = {name: [] for name in TABLE_NAMES}
 
         for idx, study in df_studies.iterrows():
-            nct_index = SINGLE_FIELDS['nct_id']
-            nct_id = study.get(nct_index)
-            
+            nct_id = study.get(SINGLE_FIELDS['nct_id'])
             if not nct_id:
-                self.log.warning(f"Study missing NCT ID, skipping {idx}")  
                 continue
-
             study_key = self.generate_key(nct_id)
 
-            # study
-            study_record = self.extract_study_fields(study_key, study)
-            all_studies.append(study_record)
-
             # sponsors
             sponsors, study_sponsors = self.extract_sponsors(idx, study_key, study)
-            all_sponsors.extend(sponsors)
-            all_study_sponsors.extend(study_sponsors)
+            rows["sponsors"].extend(sponsors)
+            rows["study_sponsors"].extend(study_sponsors)
 
             # conditions and keywords
             conditions, study_conditions = self.extract_conditions(idx, study_key, study)
-            all_conditions.extend(conditions)
-            all_study_conditions.extend(study_conditions)
+            rows["conditions"].extend(conditions)
+            rows["study_conditions"].extend(study_conditions)
 
             keywords, study_keywords = self.extract_keywords(idx, study_key, study)
-            all_keywords.extend(keywords)
-            all_study_keywords.extend(study_keywords)
+            rows["keywords"].extend(keywords)
+            rows["study_keywords"].extend(study_keywords)
 
             # groups and interventions
-            arm_group_interventions = self.extract_arm_groups(idx, study_key, study)
-            all_study_arm_group_interventions.extend(arm_group_interventions)
+            rows["arm_group_interventions"].extend(self.extract_arm_groups(idx, study_key, study))
 
             interventions, study_interventions = self.extract_interventions(idx, study_key, study)
-            all_interventions.extend(interventions)
-            all_study_interventions.extend(study_interventions)
+            rows["interventions"].extend(interventions)
+            rows["study_interventions"].extend(study_interventions)
 
             # contacts and locations
-            central_contacts, study_central_contacts  = self.extract_central_contacts(idx, study_key, study)
-            all_central_contacts.extend(central_contacts)
-            all_study_central_contacts.extend(study_central_contacts)
+            central_contacts, study_central_contacts = self.extract_central_contacts(idx, study_key, study)
+            rows["central_contacts"].extend(central_contacts)
+            rows["study_central_contacts"].extend(study_central_contacts)
 
             locations, study_locations = self.extract_locations(idx, study_key, study)
-            all_locations.extend(locations)
-            all_study_locations.extend(study_locations)
-
-            references = self.extract_references(idx, study_key, study)
-            all_study_references.extend(references)
-
-            links = self.extract_links(idx, study_key, study)
-            all_study_links.extend(links)
-
-            ipds = self.extract_ipds(idx, study_key, study)
-            all_ipds.extend(ipds)
-
-            flow_groups = self.extract_flow_groups(idx,study_key, study)
-            all_flow_groups.extend(flow_groups)
-
-            flow_period_events = self.extract_flow_events(idx, study_key, study)
-            all_flow_period_events.extend(flow_period_events)
-
-
+            rows["locations"].extend(locations)
+            rows["study_locations"].extend(study_locations)
 
+            rows["references"].extend(self.extract_references(idx, study_key, study))
+            rows["links"].extend(self.extract_links(idx, study_key, study))
+            rows["ipds"].extend(self.extract_ipds(idx, study_key, study))
 
+            rows["flow_groups"].extend(self.extract_flow_groups(idx, study_key, study))
+            rows["flow_period_events"].extend(self.extract_flow_events(idx, study_key, study))
 
-        df_studies = pd.DataFrame(all_studies)
-
-        #sponsors and collaborators
-        df_sponsors = pd.DataFrame(all_sponsors)
-        df_study_sponsors = pd.DataFrame(all_study_sponsors)
-
-        #conditions and keywords
-        df_conditions = pd.DataFrame(all_conditions)
-        df_study_conditions = pd.DataFrame(all_study_conditions)
-        df_keywords = pd.DataFrame(all_keywords)
-        df_study_keywords = pd.DataFrame(all_study_keywords)
-
-        #arms and interventions
-        df_interventions = pd.DataFrame(all_interventions)
-        df_study_interventions = pd.DataFrame(all_study_interventions)
-        df_arm_group_interventions = pd.DataFrame(
-            all_study_arm_group_interventions
-        )
-
-        # contacts and locations
-        df_central_contacts = pd.DataFrame(all_central_contacts)
-        df_study_central_contacts = pd.DataFrame(all_study_central_contacts)
-        df_locations = pd.DataFrame(all_locations)
-        df_study_locations = pd.DataFrame(all_study_locations)
-
-        #links and references
-        df_references = pd.DataFrame(all_study_references)
-        df_links = pd.DataFrame(all_study_links)
-
-        #IPD
-        df_ipds = pd.DataFrame(all_ipds)
-
-        #Milestones
-        df_flow_groups = pd.DataFrame(all_flow_groups)
-        df_flow_period_events = pd.DataFrame(all_flow_period_events)
-
-        # dedupe
-        df_sponsors = df_sponsors.drop_duplicates(subset=["sponsor_key"])
-        df_conditions = df_conditions.drop_duplicates(subset=["condition_key"])
-        df_keywords = df_keywords.drop_duplicates(subset=["keyword_key"])
-        df_interventions = df_interventions.drop_duplicates(subset=["intervention_key"])
-        df_arm_group_interventions = df_arm_group_interventions.drop_duplicates(subset=["study_arm_key", "study_key", "arm_intervention_name"])
-        df_locations = df_locations.drop_duplicates(subset=["location_key"])
-        df_central_contacts = df_central_contacts.drop_duplicates(subset=["contact_key"])
-
-        df_references = df_references.drop_duplicates(subset=["study_key", "ref_key"])
-        df_links = df_links.drop_duplicates(subset=["study_key", "link_key", "url"])
-        df_ipds = df_ipds.drop_duplicates(subset=["study_key", "ipd_key"])
-
-        df_flow_groups = df_flow_groups.drop_duplicates(subset=["study_key", "group_key"])
+        return {name: pd.DataFrame(records) for name, records in rows.items()}
 
+    @staticmethod
+    def dedupe_tables(tables: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        Drop duplicate dimension and bridge rows within a file, and aggregate flow events.
+        Args:
+            tables: Output of extract_nested_columnar or extract_nested_per_row
+        Returns:
+            Dict of table name -> DataFrame
+        """
+        tables = dict(tables)
+        for name, subset in DEDUPE_SUBSETS.items():
+            # the per-row methods only produce the hand-written tables
+            if name in tables and not tables[name].empty:
+                tables[name] = tables[name].drop_duplicates(subset=subset).reset_index(drop=True)
 
         #Aggregate to mitigate data quality errors. check docs/data_quality_issues.md for details
-        df_flow_period_events = df_flow_period_events.groupby(
-            ['study_key', 'period_title', 'event_class', 'event_type', 'group_id'],
-            as_index=False
-        ).agg({
-            'num_subjects': 'sum',
-            'period_key': 'first'
-        })
+        if not tables["flow_period_events"].empty:
+            # the API sends counts as strings. a group without any count stays null, not 0
+            events = tables["flow_period_events"].assign(
+                num_subjects=lambda df: pd.to_numeric(df["num_subjects"], errors="coerce").astype("Int64")
+            )
 
+            # group on integer codes rather than strings. codes order like the values, so groups
+            # come out in the same order. rows with a null group column are dropped, like groupby
+            codes = [integer_codes(events[column]) for column in FLOW_EVENT_GROUP]
+            rows = np.flatnonzero(np.logical_and.reduce([column >= 0 for column in codes]))
+            group_ids, first = group_codes([column[rows] for column in codes])
+            first = rows[first]
 
+            num_subjects = events["num_subjects"].take(rows).reset_index(drop=True)
+            aggregated = events[FLOW_EVENT_GROUP].take(first).reset_index(drop=True)
+            aggregated["num_subjects"] = num_subjects.groupby(group_ids, sort=True).sum(min_count=1)
+            # a period's key is derived from the study and period title, the same for the group
+            aggregated["period_key"] = events["period_key"].take(first).to_numpy()
+            tables["flow_period_events"] = aggregated
 
-        # load
-        return df_studies, df_sponsors, df_study_sponsors
+        return tables
 
     @staticmethod
     def extract_study_fields(study_key: str, study_data: pd.Series) -> Dict:
@@ -376,7 +689,7 @@ class Transformer:
                             "intervention_name": other_name,
                             "intervention_type": intervention_type,
                             "description": description,  # inherits from parent
-
+                            "is_primary_name": False
                         })
 
                         study_interventions.append({
@@ -486,6 +799,11 @@ class Transformer:
         locations_list = study_data.get(locations_index)
 
         if isinstance(locations_list, (list, np.ndarray)) and len(locations_list) > 0:
+            # resolve location status once, from every site of the study
+            overall_status = study_data.get("protocolSection.statusModule.overallStatus")
+            unique_statuses = {loc.get("status") for loc in locations_list if loc.get("status")}
+            resolved_status, status_type = self.dq_handler.resolve_location_status(overall_status, unique_statuses)
+
             for location in locations_list:
                 facility = location.get("facility")
                 city = location.get("city")
@@ -498,27 +816,17 @@ class Transformer:
                     "facility": facility,
                     "city": city,
                     "state": state,
-                    "country": state,
+                    "country": country,
                     "status": location.get("status")
 
                 }
                 geopoint = location.get("geoPoint")
                 if isinstance(geopoint, dict) and geopoint:
-                    curr_location["lat"] = float(geopoint.get("lat")) if geopoint.get("lat") else None
-                    curr_location["lon"] = float(geopoint.get("lon")) if geopoint.get("lon") else None
+                    curr_location["lat"] = float(geopoint.get("lat")) if geopoint.get("lat") is not None else None
+                    curr_location["lon"] = float(geopoint.get("lon")) if geopoint.get("lon") is not None else None
 
                 locations.append(curr_location)
 
-                # resolve location status
-
-                overall_status = study_data.get("protocolSection.statusModule.overallStatus")
-
-                statuses = [loc.get("status") for loc in locations if loc.get("status")]
-                unique_statuses = set(statuses)
-
-
-                resolved_status, status_type = self.dq_handler.resolve_location_status(overall_status, unique_statuses)
-
                 study_locations.append({
                     "study_key": study_key,
                     "location_key": location_key,
@@ -562,11 +870,12 @@ class Transformer:
 
             for link in links_list:
                 label = link.get('label')
+                url = link.get("url")
                 study_links.append({
                     "study_key": study_key,
-                    "link_key": link,
+                    "link_key": self.generate_key(study_key, label, url),
                     "label": label,
-                    "url": link.get("url")
+                    "url": url
                 })
 
         return study_links
@@ -90,6 +90,30 @@ SINGLE_FIELDS = {
 
 }
 
+# Target types of study fact columns. Columns not listed are strings.
+# "date" accepts partial dates (YYYY-MM, YYYY), which resolve to the first day of the period
+SINGLE_FIELD_TYPES = {
+    "patient_registry": "bool",
+    "enrollment_count": "int",
+    "healthy_volunteers": "bool",
+    "status_verified_date": "date",
+    "start_date": "date",
+    "first_submit_date": "date",
+    "last_update_submit_date": "date",
+    "completion_date": "date",
+    "has_expanded_access": "bool",
+    "has_dmc": "bool",
+    "is_fda_regulated_drug": "bool",
+    "is_fda_regulated_device": "bool",
+    "is_unapproved_device": "bool",
+    "is_us_export": "bool",
+    "certain_agreement_pi_sponsor_employee": "bool",
+    "certain_agreement_restrictive": "bool",
+    "sub_tracking_estimated_results_date": "date",
+    "has_results": "bool",
+    "last_updated": "date",
+}
+
 NESTED_FIELDS = {
     "sponsor": { #NOT NESTED BUT TREATED AS A SEPARATE DIM
         "index_field": "protocolSection.sponsorCollaboratorsModule.leadSponsor",
@@ -315,7 +339,7 @@ NESTED_FIELDS = {
         "bridge_table_name": "study_secondary_ids",
         "fields": [
             ("id", "id"),
-            ("object_type", "object_type"),
+            ("id_type", "type"),
             ("domain", "domain"),
             ("link", "link"),
         ],
@@ -388,7 +412,7 @@ NESTED_FIELDS = {
         "index_field": "annotationSection.annotationModule.unpostedAnnotation.unpostedEvents",
         "object_type": "array_of_dicts",
         "fields": [
-            ("object_type", "object_type"),
+            ("event_type", "type"),
             ("date", "date"),
             ("dateUnknown", "dateUnknown"),
         ],
@@ -400,7 +424,7 @@ NESTED_FIELDS = {
         "index_field": "annotationSection.annotationModule.violationAnnotation.violationEvents",
         "object_type": "array_of_dicts",
         "fields": [
-            ("object_type", "object_type"),
+            ("event_type", "type"),
             ("description", "description"),
             ("creationDate", "creationDate"),
             ("issuedDate", "issuedDate"),
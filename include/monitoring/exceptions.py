@@ -17,3 +17,28 @@ class RequestExhaustionError(Exception):
     def __init__(self, page_number: int, max_attempts: int, url: str):
         message = f"Failed to fetch page {page_number} after {max_attempts} attempts. URL: {url} "
         super().__init__(message)
+
+
+class CheckpointConflictError(Exception):
+    """
+    Raised when a checkpoint write loses a compare-and-swap against a newer attempt.
+
+    Another attempt of the same task (for example a retry started while a stale attempt was
+    still running) has written the checkpoint since it was read. The stale attempt must stop
+    rather than overwrite the newer progress.
+
+    Attributes:
+        key: The checkpoint key
+        expected_version: Version the writer read
+        current_version: Version found in the store
+    """
+
+    def __init__(self, key: str, expected_version: int, current_version: int):
+        message = (
+            f"Checkpoint {key} was modified by another attempt "
+            f"(expected version {expected_version}, found {current_version})"
+        )
+        super().__init__(message)
+        self.key = key
+        self.expected_version = expected_version
+        self.current_version = current_version
@@ -0,0 +1,47 @@
+import argparse
+import os
+import random
+import time
+
+from include.etl.transformation.keys import generate_key, generate_keys
+
+
+def make_columns(rows: int, seed: int = 0):
+    """Location-like natural keys: facility, city, state, country, with some nulls."""
+    rng = random.Random(seed)
+    facility = [f"Facility {rng.randrange(rows // 4 + 1)}" for _ in range(rows)]
+    city = [f"City {rng.randrange(5000)}" for _ in range(rows)]
+    state = [None if rng.random() < 0.3 else f"State {rng.randrange(60)}" for _ in range(rows)]
+    country = [rng.choice(["United States", "France", "China", "Brazil"]) for _ in range(rows)]
+    return facility, city, state, country
+
+
+def run(rows: int, workers: int) -> None:
+    columns = make_columns(rows)
+
+    start = time.perf_counter()
+    expected = [generate_key(*row) for row in zip(*columns)]
+    per_row = time.perf_counter() - start
+    print(f"generate_key per row        {per_row:8.3f}s  {rows / per_row:12,.0f} rows/s")
+
+    for label, mode, n in (
+        ("generate_keys sha256 x1    ", "sha256", 1),
+        (f"generate_keys sha256 x{workers:<5}", "sha256", workers),
+        ("generate_keys fast         ", "fast", 1),
+    ):
+        start = time.perf_counter()
+        keys = generate_keys(*columns, mode=mode, workers=n)
+        seconds = time.perf_counter() - start
+        check = "" if mode == "fast" else ("  identical" if list(keys) == expected else "  MISMATCH")
+        print(
+            f"{label} {seconds:8.3f}s  {rows / seconds:12,.0f} rows/s  "
+            f"{per_row / seconds:5.1f}x{check}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare surrogate key generation strategies")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    run(args.rows, args.workers)
@@ -0,0 +1,53 @@
+import argparse
+import time
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from include.etl.transformation.transformation import Transformer
+from include.etl.transformation.extraction_plan import PLAN
+
+
+def run(paths, repeat: int) -> None:
+    transformer = Transformer({"ds": None}, s3_dest_hook=object())
+    transformer.key_format = "hex"
+    transformer.key_cache = None
+    transformer.key_index = None
+
+    studies = pq.read_table(paths, columns=["studies"]).column("studies")
+    generic_tables = len(PLAN.table_columns())
+
+    def legacy():
+        return transformer.extract_nested_per_row(pd.json_normalize(studies.to_pandas()))
+
+    def plan():
+        return transformer.extract_nested_columnar(studies)
+
+    timings = {}
+    for label, extract in (("legacy per-row", legacy), ("compiled plan", plan)):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            tables = extract()
+            best = min(best, time.perf_counter() - start)
+        timings[label] = best
+        rows = sum(len(df) for df in tables.values())
+        print(
+            f"{label:<16} {best:8.3f}s  {len(studies) / best:10,.0f} studies/s  "
+            f"{len(tables):3d} tables  {rows:10,d} rows"
+        )
+
+    print(
+        f"plan is {timings['legacy per-row'] / timings['compiled plan']:.1f}x faster and also "
+        f"extracts the {generic_tables} tables of the generic entities"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the compiled extraction plan with the per-row extract_* methods"
+    )
+    parser.add_argument("paths", nargs="+", help="Landing Parquet files")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.paths, args.repeat)
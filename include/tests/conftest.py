@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+# config.env_config requires these; tests never reach the API, AWS or the warehouse
+for name, value in {
+    "BASE_URL": "https://clinicaltrials.test/api/v2/studies?pageToken=",
+    "FIRST_PAGE_URL": "https://clinicaltrials.test/api/v2/studies",
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_REGION": "us-east-1",
+    "CTGOV_BUCKET": "ctgov-test",
+    "DB_NAME": "test",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "DB_CONN_STR": "postgresql://test",
+}.items():
+    os.environ.setdefault(name, value)
+
+BUCKET = "ctgov-test"
+
+
+class MotoS3Hook:
+    """The subset of S3Hook the pipeline uses, over a moto-backed boto3 client."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get_conn(self):
+        return self.client
+
+    def load_bytes(self, bytes_data, key, bucket_name=None, replace=False):
+        self.client.put_object(Bucket=bucket_name, Key=key, Body=bytes_data)
+
+    def load_string(self, string_data, key, bucket_name=None, replace=False):
+        self.load_bytes(string_data.encode(), key, bucket_name, replace)
+
+    def read_key(self, key, bucket_name=None):
+        return self.client.get_object(Bucket=bucket_name, Key=key)["Body"].read().decode()
+
+    def list_keys(self, bucket_name=None, prefix=""):
+        keys = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+            keys.extend(obj["Key"] for obj in page.get("Contents", []))
+        return keys
+
+    def delete_objects(self, bucket, keys):
+        self.client.delete_objects(Bucket=bucket, Delete={"Objects": [{"Key": k} for k in keys]})
+
+
+@pytest.fixture
+def s3_hook():
+    moto = pytest.importorskip("moto")
+    import boto3
+
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield MotoS3Hook(client)
+
+
+def landing_study(nct_id: str, sponsor: str = "Acme", title: str = "A study", updated: str = "2025-01-01"):
+    """A minimal study document with a sponsor and a condition."""
+    return {
+        "protocolSection": {
+            "identificationModule": {"nctId": nct_id, "briefTitle": title},
+            "statusModule": {"lastUpdatePostDateStruct": {"date": updated, "type": "ACTUAL"}},
+            "sponsorCollaboratorsModule": {"leadSponsor": {"name": sponsor, "class": "INDUSTRY"}},
+            "conditionsModule": {"conditions": ["Influenza"]},
+        }
+    }
+
+
+@pytest.fixture
+def landing_file(tmp_path):
+    """Write studies to a landing Parquet file and return its path."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from include.etl.extraction.landing import LandingEncoder
+
+    def write(name, studies):
+        path = str(tmp_path / f"{name}.parquet")
+        batch = LandingEncoder().encode({"studies": studies})
+        pq.write_table(pa.Table.from_batches([batch]), path)
+        return path
+
+    return write
@@ -0,0 +1,106 @@
+import pyarrow.parquet as pq
+import pytest
+
+from include.etl.extraction.landing import LandingEncoder
+from include.etl.transformation.change_index import (
+    DELETED, INSERTED, UNCHANGED, UPDATED, ChangeIndex, is_full_snapshot,
+)
+from include.tests.conftest import landing_study
+
+FULL = {"mode": "full", "shards": []}
+DELTA = {"mode": "incremental", "shards": []}
+
+
+def studies(*documents):
+    return LandingEncoder().encode({"studies": list(documents)}).column("studies")
+
+
+def changes_of(index, batch, full_snapshot):
+    changes = index.change_set(index.detect(batch), full_snapshot)
+    return dict(zip(changes["nct_id"], changes["change"]))
+
+
+@pytest.mark.parametrize(
+    "manifest, expected",
+    [
+        (FULL, True),
+        (DELTA, False),
+        # one shard of a full run only holds its shard
+        ({"mode": "full", "shard": {"shard_id": "min_to_2019-12-31"}}, False),
+        # written before incremental extraction, always full
+        ({"files": []}, True),
+        (None, False),
+    ],
+)
+def test_full_snapshot_comes_from_the_manifest(manifest, expected):
+    assert is_full_snapshot(manifest) is expected
+
+
+def test_detect_classifies_against_the_saved_index(tmp_path):
+    index = ChangeIndex(str(tmp_path))
+    first = studies(landing_study("NCT1"), landing_study("NCT2"))
+    index.save(index.detect(first), full_snapshot=True)
+
+    versions = index.detect(
+        studies(landing_study("NCT1"), landing_study("NCT2", title="Renamed"), landing_study("NCT3"))
+    )
+
+    assert versions["change"].tolist() == [UNCHANGED, UPDATED, INSERTED]
+
+
+def test_full_snapshot_reports_missing_studies_as_deleted(tmp_path):
+    index = ChangeIndex(str(tmp_path))
+    index.save(index.detect(studies(landing_study("NCT1"), landing_study("NCT2"))), True)
+
+    assert changes_of(index, studies(landing_study("NCT2")), full_snapshot=True) == {
+        "NCT1": DELETED,
+    }
+
+
+def test_studies_not_seen_by_a_delta_are_not_deleted(tmp_path):
+    index = ChangeIndex(str(tmp_path))
+    index.save(index.detect(studies(landing_study("NCT1"), landing_study("NCT2"))), True)
+
+    delta = studies(landing_study("NCT2", title="Renamed"), landing_study("NCT3"))
+    versions = index.detect(delta)
+    assert changes_of(index, delta, full_snapshot=False) == {"NCT2": UPDATED, "NCT3": INSERTED}
+
+    # the delta is upserted, the studies it did not see stay in the index
+    index.save(versions, full_snapshot=False)
+    assert sorted(ChangeIndex(str(tmp_path)).previous.index) == ["NCT1", "NCT2", "NCT3"]
+
+
+def run(tmp_path, landing_file, name, documents, manifest, commit=True):
+    from include.etl.transformation.transformation import Transformer
+
+    transformer = Transformer({"ds": "2025-11-01"}, s3_dest_hook=object())
+    transformer.key_cache = None
+    transformer.key_index = None
+    transformer.change_index = ChangeIndex(str(tmp_path / "changes"))
+    paths = transformer.transform_all_studies(
+        [landing_file(name, documents)], str(tmp_path / name), workers=1, manifest=manifest
+    )
+    if commit:
+        transformer.commit_run()
+    changes = pq.read_table(paths["study_changes"]).to_pydict()
+    return dict(zip(changes["nct_id"], changes["change"]))
+
+
+def test_incremental_runs_never_delete_studies(tmp_path, landing_file):
+    a = [landing_study(f"NCT{i}") for i in range(3)]
+    b = [landing_study(f"NCT{i}") for i in range(3, 5)]
+
+    assert set(run(tmp_path, landing_file, "a", a, FULL).values()) == {INSERTED}
+    assert run(tmp_path, landing_file, "ab", a + b, FULL) == {f"NCT{i}": INSERTED for i in (3, 4)}
+    # an incremental delta that only holds b: a was not seen, not deleted
+    assert run(tmp_path, landing_file, "b", b, DELTA) == {}
+    assert run(tmp_path, landing_file, "b_full", b, FULL) == {f"NCT{i}": DELETED for i in range(3)}
+
+
+def test_uncommitted_runs_do_not_update_the_index(tmp_path, landing_file):
+    a = [landing_study(f"NCT{i}") for i in range(3)]
+
+    run(tmp_path, landing_file, "failed", a, FULL, commit=False)
+
+    # the load of the first run failed, so its studies are still new to the next run
+    assert set(run(tmp_path, landing_file, "retry", a, FULL).values()) == {INSERTED}
@@ -0,0 +1,165 @@
+import multiprocessing
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from config.env_config import config
+from include.etl.cleanup import CleanUp
+from include.etl.extraction import checkpoint_store
+from include.etl.extraction.checkpoint_store import (
+    CheckpointStore, LocalCheckpointStore, S3CheckpointStore, VariableCheckpointStore,
+    checkpoint_key,
+)
+from include.monitoring.exceptions import CheckpointConflictError
+from include.tests.conftest import BUCKET
+
+
+class MemoryVariable:
+    """Stands in for airflow.models.Variable."""
+
+    values = {}
+
+    @classmethod
+    def get(cls, key):
+        return cls.values[key]
+
+    @classmethod
+    def set(cls, key, value):
+        cls.values[key] = value
+
+    @classmethod
+    def delete(cls, key):
+        del cls.values[key]
+
+
+@pytest.fixture
+def variables(monkeypatch):
+    monkeypatch.setattr(MemoryVariable, "values", {})
+    monkeypatch.setattr(checkpoint_store, "Variable", MemoryVariable)
+    return MemoryVariable.values
+
+
+@pytest.fixture(params=["local", "s3", "variable"])
+def store(request, tmp_path):
+    if request.param == "local":
+        return LocalCheckpointStore(str(tmp_path))
+    if request.param == "s3":
+        return S3CheckpointStore(request.getfixturevalue("s3_hook"), BUCKET)
+    request.getfixturevalue("variables")
+    return VariableCheckpointStore()
+
+
+def record(page, dag_id="process_studies", run_id="manual_1", updated_at=None):
+    return {
+        "checkpoint": {"last_saved_page": page},
+        "updated_at": time.time() if updated_at is None else updated_at,
+        "dag_id": dag_id,
+        "run_id": run_id,
+    }
+
+
+def test_base_class_requires_every_method():
+    with pytest.raises(TypeError):
+        CheckpointStore()
+
+
+def test_write_is_compare_and_swap(store):
+    assert store.read("k") == (None, 0)
+    assert store.write("k", record(1), expected_version=0) == 1
+    assert store.write("k", record(2), expected_version=1) == 2
+
+    with pytest.raises(CheckpointConflictError) as conflict:
+        store.write("k", record(3), expected_version=1)
+    assert conflict.value.current_version == 2
+
+    stored, version = store.read("k")
+    assert (stored["checkpoint"], version) == ({"last_saved_page": 2}, 2)
+
+
+def test_s3_write_loses_to_a_write_between_read_and_put(s3_hook):
+    store = S3CheckpointStore(s3_hook, BUCKET)
+    store.write("k", record(1), 0)
+    stale = store._get("k")
+    S3CheckpointStore(s3_hook, BUCKET).write("k", record(2), 1)
+
+    # the version check passes on the stale read, the conditional put does not
+    store._get = lambda key: stale
+    with pytest.raises(CheckpointConflictError):
+        store.write("k", record(3), 1)
+    assert S3CheckpointStore(s3_hook, BUCKET).read("k")[1] == 2
+
+
+def _increment(directory, key, times):
+    store = LocalCheckpointStore(directory)
+    for _ in range(times):
+        while True:
+            current, version = store.read(key)
+            page = current["checkpoint"]["last_saved_page"] if current else 0
+            try:
+                store.write(key, record(page + 1), version)
+                break
+            except CheckpointConflictError:
+                continue
+
+
+def test_concurrent_local_writers_lose_no_update(tmp_path):
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=_increment, args=(str(tmp_path), "k", 25)) for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    stored, version = LocalCheckpointStore(str(tmp_path)).read("k")
+    assert version == 100
+    assert stored["checkpoint"]["last_saved_page"] == 100
+
+
+def test_variable_store_keeps_no_shared_index(variables):
+    store = VariableCheckpointStore()
+    keys = [checkpoint_key("process_studies", "manual_1", "extract", shard) for shard in "ab"]
+    for key in keys:
+        store.write(key, record(1), 0)
+
+    assert sorted(variables) == sorted(keys)
+    assert store.keys() == []
+
+
+def test_collect_garbage_is_scoped_to_the_dag_run(store):
+    now = time.time()
+    store.write("finished", record(1), 0)
+    store.write("other_dag_same_run_id", record(1, dag_id="test_process_studies"), 0)
+    store.write("other_run", record(1, run_id="manual_2"), 0)
+    store.write("expired", record(1, run_id="manual_0", updated_at=now - 7200), 0)
+
+    # the variable backend cannot list its keys, the caller names them
+    names = ["finished", "other_dag_same_run_id", "other_run", "expired"]
+    deleted = store.collect_garbage(
+        ttl_seconds=3600, dag_id="process_studies", run_id="manual_1", keys=names, now=now
+    )
+
+    assert sorted(deleted) == ["expired", "finished"]
+    assert store.read("other_dag_same_run_id")[0] is not None
+    assert store.read("other_run")[0] is not None
+
+
+def test_cleanup_clears_the_run_and_expired_checkpoints_from_s3(s3_hook, monkeypatch):
+    monkeypatch.setattr(config, "CHECKPOINT_BACKEND", "s3")
+    monkeypatch.setattr(config, "CTGOV_BUCKET", BUCKET)
+    dag = SimpleNamespace(dag_id="process_studies", task_ids=["extract", "clean_up"])
+    context = {"ds": "2025-11-01", "dag": dag, "run_id": "manual_1"}
+    store = S3CheckpointStore(s3_hook, BUCKET, config.CHECKPOINT_S3_PREFIX)
+    shards = [{"shard_id": "s0"}, {"shard_id": "s1"}]
+    for shard in shards:
+        key = checkpoint_key("process_studies", "manual_1", "extract", shard["shard_id"])
+        store.write(key, record(5), 0)
+    store.write("failed_run", record(3, run_id="manual_0", updated_at=time.time() - 4 * 86400), 0)
+    store.write("in_flight", record(3, dag_id="test_process_studies"), 0)
+
+    result = CleanUp(context, s3_hook=s3_hook).clear_all_checkpoints(shards=shards)
+
+    assert result["checkpoints_cleared"] == 3
+    assert store.keys() == ["in_flight"]
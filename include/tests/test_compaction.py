@@ -0,0 +1,81 @@
+import threading
+
+import pyarrow.parquet as pq
+import pytest
+
+from include.etl.extraction.compaction import LandingFileWriter
+from include.etl.extraction.landing import LandingEncoder
+from include.tests.conftest import BUCKET
+
+
+def page(encoder, number):
+    studies = [
+        {"protocolSection": {"identificationModule": {"nctId": f"NCT{number:04d}{i:04d}"}}}
+        for i in range(3)
+    ]
+    return encoder.encode({"studies": studies})
+
+
+def test_out_of_order_pages_are_written_in_page_order(s3_hook, tmp_path):
+    encoder = LandingEncoder()
+    writer = LandingFileWriter(s3_hook, BUCKET, "2025-11-01", next_page=1, page_token=None)
+
+    assert writer.add(3, page(encoder, 3), "t4") == []
+    assert writer.add(2, page(encoder, 2), "t3") == []
+    assert writer.add(1, page(encoder, 1), "t2") == []
+    saved = writer.flush()
+
+    assert [(p["page"], p["page_token"]) for p in saved] == [(1, None), (2, "t2"), (3, "t3")]
+    assert saved[0]["nct_id"] == {"min": "NCT00010000", "max": "NCT00010002"}
+    path = tmp_path / "landed.parquet"
+    path.write_bytes(
+        s3_hook.get_conn().get_object(Bucket=BUCKET, Key=saved[0]["file"])["Body"].read()
+    )
+    studies = pq.read_table(path).column("studies").to_pylist()
+    nct_ids = [s["protocolSection"]["identificationModule"]["nctId"] for s in studies]
+    assert nct_ids == sorted(nct_ids)
+
+
+def test_pages_are_handed_over_while_a_file_uploads(s3_hook, monkeypatch):
+    encoder = LandingEncoder()
+    writer = LandingFileWriter(
+        s3_hook, BUCKET, "2025-11-01", next_page=1, page_token=None, target_file_bytes=0
+    )
+    uploading, release = threading.Event(), threading.Event()
+    close_file = writer._close_file
+
+    def slow_close_file():
+        uploading.set()
+        release.wait(5)
+        return close_file()
+
+    monkeypatch.setattr(writer, "_close_file", slow_close_file)
+    results = {}
+    first = threading.Thread(target=lambda: results.update(first=writer.add(1, page(encoder, 1), "t2")))
+    first.start()
+    assert uploading.wait(5)
+
+    # page 2 goes to the buffer without waiting on page 1's upload
+    assert writer.add(2, page(encoder, 2), "t3") == []
+    release.set()
+    first.join(5)
+
+    assert [p["page"] for p in results["first"]] == [1, 2]
+    assert [f["first_page"] for f in writer.files] == [1, 2]
+
+
+def test_no_page_is_accepted_after_a_failed_upload(s3_hook, monkeypatch):
+    encoder = LandingEncoder()
+    writer = LandingFileWriter(
+        s3_hook, BUCKET, "2025-11-01", next_page=1, page_token=None, target_file_bytes=0
+    )
+
+    def fail(**_):
+        raise ConnectionError("sidecar lost")
+
+    monkeypatch.setattr(s3_hook, "load_string", fail)
+    with pytest.raises(ConnectionError):
+        writer.add(1, page(encoder, 1), "t2")
+    with pytest.raises(RuntimeError):
+        writer.add(2, page(encoder, 2), "t3")
+    assert writer.flush() == []
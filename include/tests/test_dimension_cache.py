@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from include.etl.transformation.dimension_cache import DimensionKeyCache
+from include.etl.transformation.keys import hash_joined, join_columns
+from include.tests.conftest import landing_study
+
+
+def cached_keys(cache, *values):
+    return cache.keys(join_columns(list(values)), hash_joined).tolist()
+
+
+def test_take_new_returns_only_entries_hashed_since_the_last_call():
+    cache = DimensionKeyCache(10)
+    cache.track_new = True
+    cached_keys(cache, "Acme", "Beta")
+    assert [value for value, _ in cache.take_new()] == ["Acme", "Beta"]
+
+    cached_keys(cache, "Acme", "Gamma")
+    assert [value for value, _ in cache.take_new()] == ["Gamma"]
+
+
+def test_merged_entries_are_saved_and_reloaded(tmp_path):
+    worker = DimensionKeyCache(10)
+    worker.track_new = True
+    keys = cached_keys(worker, "Acme", "Beta")
+
+    path = str(tmp_path / "keys.json")
+    parent = DimensionKeyCache(10, path=path)
+    parent.merge(worker.take_new())
+    parent.save()
+
+    reloaded = DimensionKeyCache(10, path=path)
+    assert cached_keys(reloaded, "Acme", "Beta") == keys
+    assert reloaded.misses == 0
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_commit_run_saves_what_every_worker_hashed(tmp_path, landing_file, monkeypatch, workers):
+    from include.etl.transformation.transformation import Transformer
+
+    path = tmp_path / "keys.json"
+    # read again by the spawned pool workers
+    monkeypatch.setenv("TRANSFORM_KEY_CACHE_PATH", str(path))
+    files = [
+        landing_file("a", [landing_study("NCT00000001", sponsor="Acme")]),
+        landing_file("b", [landing_study("NCT00000002", sponsor="Beta")]),
+    ]
+
+    transformer = Transformer({"ds": "2025-11-01"}, s3_dest_hook=object())
+    transformer.key_cache = DimensionKeyCache(1000, path=str(path))
+    transformer.key_index = None
+    transformer.change_index = None
+    transformer.transform_all_studies(files, str(tmp_path / "out"), workers=workers)
+    transformer.commit_run()
+
+    values = {value for value, _ in json.loads(path.read_text())["entries"]}
+    # sponsors are keyed by name and class
+    assert {"Acme|INDUSTRY", "Beta|INDUSTRY"} <= values
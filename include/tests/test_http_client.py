@@ -0,0 +1,69 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from urllib3.util import connection as urllib3_connection
+
+from include.etl.extraction import http_client
+from include.etl.extraction.http_client import CTGovClient
+
+
+class StudiesHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"studies": [], "nextPageToken": None}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StudiesHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://localhost:{server.server_port}/api/v2/studies"
+    server.shutdown()
+    server.server_close()
+
+
+def test_connection_is_timed_once_and_then_reused(api_url):
+    client = CTGovClient()
+
+    _, first = client.get(api_url)
+    response, second = client.get(api_url)
+
+    assert response.json() == {"studies": [], "nextPageToken": None}
+    assert not first["reused_connection"]
+    assert second["reused_connection"]
+    assert (second["dns"], second["connect"], second["tls"]) == (0, 0, 0)
+    assert client.stats["new_connections"] == 1
+    client.close()
+
+
+def test_other_urllib3_clients_are_left_alone(api_url):
+    create_connection = urllib3_connection.create_connection
+    client = CTGovClient()
+    client.get(api_url)
+
+    assert urllib3_connection.create_connection is create_connection
+    # a plain session, like boto3's own pools, does not open timed connections
+    http_client._reset_phase_timings()
+    assert requests.get(api_url).ok
+    assert not http_client._phase_timings.new_connection
+    client.close()
+
+
+def test_refused_connection_raises_requests_connection_error():
+    client = CTGovClient(connect_timeout=1)
+    with pytest.raises(requests.ConnectionError):
+        # port 9 (discard) is closed on test machines
+        client.get("http://127.0.0.1:9/api/v2/studies")
@@ -0,0 +1,105 @@
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+from include.etl.transformation.key_index import DimensionKeyIndex, KeyIndex
+from include.tests.conftest import landing_study
+
+
+def test_claim_lets_each_key_through_once(tmp_path):
+    index = DimensionKeyIndex(str(tmp_path), "run-1")
+
+    assert index.claim(np.array([1, 2, 2, 3])).tolist() == [True, True, False, True]
+    assert index.claim(np.array([3, 4])).tolist() == [False, True]
+
+
+def test_hex_and_int64_keys_are_the_same_member(tmp_path):
+    index = DimensionKeyIndex(str(tmp_path), "run-1")
+
+    assert index.claim(["00000000000000ff"]).tolist() == [True]
+    assert index.claim(np.array([255])).tolist() == [False]
+
+
+def test_keys_of_a_run_are_only_seen_by_other_runs_once_committed(tmp_path):
+    first = DimensionKeyIndex(str(tmp_path), "run-1")
+    first.claim(np.array([1, 2]))
+
+    assert DimensionKeyIndex(str(tmp_path), "run-2").claim(np.array([1])).tolist() == [True]
+
+    first.commit()
+    assert DimensionKeyIndex(str(tmp_path), "run-3").claim(np.array([1, 2, 5])).tolist() == [
+        False, False, True,
+    ]
+
+
+def test_compact_keeps_committed_keys_and_expires_failed_runs(tmp_path):
+    committed = DimensionKeyIndex(str(tmp_path), "run-1")
+    committed.claim(np.arange(100))
+    committed.commit()
+    failed = DimensionKeyIndex(str(tmp_path), "run-2")
+    failed.claim(np.array([1000]))
+    old = time.time() - 3600
+    for name in os.listdir(tmp_path):
+        if name.endswith(".pending"):
+            os.utime(tmp_path / name, (old, old))
+
+    stats = DimensionKeyIndex(str(tmp_path), "run-3").compact(pending_ttl_seconds=60)
+
+    assert stats == {"keys": 100, "merged": 1, "expired": 1}
+    later = DimensionKeyIndex(str(tmp_path), "run-4")
+    assert later.claim(np.array([0, 99, 1000])).tolist() == [False, False, True]
+
+
+def _claim_and_commit(directory, run_id, keys):
+    index = DimensionKeyIndex(directory, run_id)
+    index.claim(np.array(keys))
+    index.commit()
+
+
+def test_concurrent_runs_lose_no_keys(tmp_path):
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(
+            target=_claim_and_commit, args=(str(tmp_path), f"run-{i}", range(i * 50, i * 50 + 100))
+        )
+        for i in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+
+    DimensionKeyIndex(str(tmp_path), "compactor").compact()
+
+    assert np.load(tmp_path / "base.npy").tolist() == list(range(250))
+
+
+def sponsor_rows(transformer, landing_file, output_dir):
+    paths = transformer.transform_all_studies([landing_file], str(output_dir), workers=1)
+    return pq.read_table(paths["sponsors"]).num_rows
+
+
+@pytest.mark.parametrize("commit", [True, False])
+def test_members_are_only_skipped_after_the_run_is_committed(tmp_path, landing_file, commit):
+    from include.etl.transformation.transformation import Transformer
+
+    path = landing_file("studies", [landing_study("NCT00000001", sponsor="Acme")])
+
+    def transformer():
+        t = Transformer({"ds": "2025-11-01"}, s3_dest_hook=object())
+        t.key_cache = None
+        t.key_index = KeyIndex(str(tmp_path / "index"))
+        return t
+
+    first = transformer()
+    assert sponsor_rows(first, path, tmp_path / "first") == 1
+    if commit:
+        first.commit_run()
+
+    # a run whose load failed is not committed, so the next run emits its members again
+    assert sponsor_rows(transformer(), path, tmp_path / "second") == (0 if commit else 1)
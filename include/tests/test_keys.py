@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from include.etl.transformation import keys
+from include.etl.transformation.keys import (
+    generate_key, generate_keys, keys_to_hex, keys_to_int64,
+)
+
+ROWS = [
+    ("NCT001", "Acme", None),
+    ("NCT002", None, None),
+    (None, None, None),
+    ("NCT003", "Ünïcode", 3),
+    ("NCT004", "", True),
+    ("NCT005", "a|b", float("nan")),
+]
+
+
+def columns():
+    return [list(column) for column in zip(*ROWS)]
+
+
+def test_batch_keys_match_generate_key():
+    expected = [generate_key(*row) for row in ROWS]
+    assert list(generate_keys(*columns())) == expected
+
+
+@pytest.mark.parametrize("wrap", [np.asarray, pd.Series, pa.array])
+def test_column_types_give_the_same_keys(wrap):
+    ids = ["NCT001", None, "NCT003"]
+    assert list(generate_keys(wrap(ids), ["x", "y", None])) == list(
+        generate_keys(ids, ["x", "y", None])
+    )
+
+
+@pytest.mark.parametrize("key_format", ["hex", "int64"])
+def test_workers_give_the_same_keys_as_one_process(monkeypatch, key_format):
+    monkeypatch.setattr(keys, "PARALLEL_MIN_ROWS", 0)
+    ids = [f"NCT{i:08d}" for i in range(1001)]
+    sponsors = [None if i % 7 == 0 else f"sponsor {i}" for i in range(1001)]
+
+    serial = generate_keys(ids, sponsors, key_format=key_format)
+    for workers in (2, 3, 0):
+        np.testing.assert_array_equal(
+            generate_keys(ids, sponsors, workers=workers, key_format=key_format), serial
+        )
+
+
+@pytest.mark.parametrize("mode", ["sha256", "fast"])
+def test_int64_keys_convert_losslessly_to_hex(mode):
+    hex_keys = generate_keys(*columns(), mode=mode)
+    int_keys = generate_keys(*columns(), mode=mode, key_format="int64")
+
+    assert int_keys.dtype == np.int64
+    np.testing.assert_array_equal(keys_to_int64(hex_keys), int_keys)
+    assert list(keys_to_hex(int_keys)) == list(hex_keys)
+
+
+def test_fast_keys_differ_from_sha256_keys():
+    assert not set(generate_keys(*columns(), mode="fast")) & set(generate_keys(*columns()))
+
+
+@pytest.mark.parametrize("kwargs", [{"mode": "md5"}, {"key_format": "uuid"}])
+def test_unknown_mode_or_format_is_rejected(kwargs):
+    with pytest.raises(ValueError):
+        generate_keys(["NCT001"], **kwargs)
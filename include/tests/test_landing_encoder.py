@@ -0,0 +1,50 @@
+import json
+
+from include.etl.extraction.landing import LANDING_SCHEMA, LandingEncoder
+
+
+def study(nct_id, **sections):
+    return {"protocolSection": {"identificationModule": {"nctId": nct_id}, **sections}}
+
+
+def test_pages_without_drift_have_no_unmapped_values():
+    encoder = LandingEncoder()
+    batch = encoder.encode(
+        {"studies": [study("NCT1"), study("NCT2", conditionsModule={"conditions": ["flu"]})]}
+    )
+
+    assert batch.schema == LANDING_SCHEMA
+    assert batch.column("unmapped").to_pylist() == [None, None]
+    assert encoder.drift_counts == {}
+
+
+def test_unknown_fields_are_kept_and_counted():
+    encoder = LandingEncoder()
+    batch = encoder.encode(
+        {
+            "studies": [
+                study(
+                    "NCT1",
+                    newModule={"x": 1},
+                    armsInterventionsModule={"armGroups": [{"label": "A"}, {"label": "B", "dose": 5}]},
+                ),
+                study("NCT2"),
+                {**study("NCT3"), "resultsSection": {"adverseEventsModule": {"events": 1}}},
+            ]
+        }
+    )
+
+    unmapped = [json.loads(u) if u else None for u in batch.column("unmapped").to_pylist()]
+    assert unmapped[0] == {
+        "protocolSection": {
+            "newModule": {"x": 1},
+            "armsInterventionsModule": {"armGroups": {"1": {"dose": 5}}},
+        }
+    }
+    assert unmapped[1] is None
+    assert unmapped[2] == {"resultsSection": {"adverseEventsModule": {"events": 1}}}
+    # untyped paths are kept without being reported as drift
+    assert encoder.drift_counts == {
+        "protocolSection.newModule": 1,
+        "protocolSection.armsInterventionsModule.armGroups[].dose": 1,
+    }
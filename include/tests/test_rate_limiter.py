@@ -0,0 +1,126 @@
+import multiprocessing
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from include.etl.extraction.rate_limiter import (
+    FileRateLimiter, LocalRateLimiter, RateLimiter, RedisRateLimiter, build_rate_limiter,
+)
+
+# 100s between requests, so a reservation's wait identifies its slot however slow the test
+SLOW = {"max_requests": 10, "window": 1000}
+
+
+def slots(waits, interval=100):
+    return sorted(round(wait / interval) for wait in waits)
+
+
+def test_base_class_requires_reserve():
+    with pytest.raises(TypeError):
+        RateLimiter()
+
+
+def test_schedule_spaces_requests_and_allows_bursts():
+    limiter = LocalRateLimiter(max_requests=10, window=10, burst=3)
+
+    tat = None
+    waits = []
+    for _ in range(5):
+        wait, tat = limiter.schedule(tat, now=100.0)
+        waits.append(wait)
+
+    # three back to back, then one interval apart
+    assert waits == [0.0, 0.0, 0.0, 1.0, 2.0]
+    # an idle bucket starts over
+    assert limiter.schedule(tat, now=1000.0)[0] == 0.0
+
+
+def test_local_limiter_gives_every_thread_its_own_slot():
+    limiter = LocalRateLimiter(**SLOW)
+    waits = []
+    lock = threading.Lock()
+
+    def reserve():
+        for _ in range(5):
+            wait = limiter.reserve()
+            with lock:
+                waits.append(wait)
+
+    threads = [threading.Thread(target=reserve) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert slots(waits) == list(range(20))
+
+
+def _reserve_from_file(path, count, queue):
+    limiter = FileRateLimiter(path, **SLOW)
+    queue.put([limiter.reserve() for _ in range(count)])
+
+
+def test_file_limiter_shares_the_quota_between_processes(tmp_path):
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    path = str(tmp_path / "bucket")
+    processes = [
+        context.Process(target=_reserve_from_file, args=(path, 5, queue)) for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    waits = [wait for _ in processes for wait in queue.get(timeout=30)]
+    for process in processes:
+        process.join()
+
+    # no two reservations share a slot: none was lost to a concurrent update
+    assert slots(waits) == list(range(20))
+
+
+def test_redis_limiter_shares_the_quota_between_clients():
+    redis = pytest.importorskip("redis")
+    from config.env_config import config
+
+    try:
+        redis.Redis.from_url(config.RATE_LIMIT_REDIS_URL, socket_connect_timeout=1).ping()
+    except redis.exceptions.RedisError:
+        pytest.skip(f"no Redis server at {config.RATE_LIMIT_REDIS_URL}")
+
+    key = f"test-{datetime.now().timestamp()}"
+    limiters = [RedisRateLimiter(config.RATE_LIMIT_REDIS_URL, key=key, **SLOW) for _ in range(2)]
+    try:
+        waits = [limiter.reserve() for _ in range(3) for limiter in limiters]
+        assert slots(waits) == list(range(6))
+    finally:
+        limiters[0].client.delete(limiters[0].key)
+
+
+def test_build_rejects_unknown_backends():
+    with pytest.raises(ValueError):
+        build_rate_limiter("memcached")
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, None),
+        ("", None),
+        ("7", 7.0),
+        ("-3", 0.0),
+        ("soon", None),
+        (format_datetime(datetime.now(timezone.utc) - timedelta(minutes=1), usegmt=True), 0.0),
+    ],
+)
+def test_retry_after_header(value, expected):
+    from include.etl.extraction.extraction import retry_after_seconds
+
+    assert retry_after_seconds(value) == expected
+
+
+def test_retry_after_date_in_the_future():
+    from include.etl.extraction.extraction import retry_after_seconds
+
+    header = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 < retry_after_seconds(header) <= 30
@@ -0,0 +1,87 @@
+import pytest
+
+from include.etl.extraction.compaction import LandingFileWriter, sidecar_key
+from include.etl.extraction.landing import LandingEncoder
+from include.etl.extraction.reconcile import reconcile_landing
+from include.tests.conftest import BUCKET
+
+REQUEST = {"filters": {}, "projection": "warehouse", "fields_sha256": "0"}
+
+
+def land_pages(s3_hook, prefix, pages, request=REQUEST):
+    """Land one file per page under prefix and return the landed keys."""
+    encoder = LandingEncoder()
+    writer = LandingFileWriter(
+        s3_hook, BUCKET, prefix, next_page=1, page_token=None, target_file_bytes=0, request=request
+    )
+    for page in range(1, pages + 1):
+        studies = [
+            {"protocolSection": {"identificationModule": {"nctId": f"NCT{page:04d}{i:04d}"}}}
+            for i in range(3)
+        ]
+        writer.add(page, encoder.encode({"studies": studies, "nextPageToken": f"t{page + 1}"}), f"t{page + 1}")
+    writer.flush()
+    return [f["key"] for f in writer.files]
+
+
+def keys_under(s3_hook, prefix):
+    return set(s3_hook.list_keys(bucket_name=BUCKET, prefix=prefix))
+
+
+def test_resumes_after_last_verified_page(s3_hook):
+    land_pages(s3_hook, "2025-11-01", 3)
+
+    state = reconcile_landing(s3_hook, BUCKET, "2025-11-01", REQUEST)
+
+    assert state["last_saved_page"] == 3
+    assert state["last_saved_token"] == "t4"
+    assert [f["first_page"] for f in state["landing_files"]] == [1, 2, 3]
+
+
+def test_partial_file_stops_the_chain_and_is_deleted(s3_hook):
+    keys = land_pages(s3_hook, "2025-11-01", 3)
+    body = s3_hook.get_conn().get_object(Bucket=BUCKET, Key=keys[1])["Body"].read()
+    s3_hook.load_bytes(body[: len(body) // 2], keys[1], BUCKET)
+
+    state = reconcile_landing(s3_hook, BUCKET, "2025-11-01", REQUEST)
+
+    assert state["last_saved_page"] == 1
+    assert keys_under(s3_hook, "2025-11-01/") == {keys[0], sidecar_key(keys[0])}
+
+
+def test_different_request_is_not_resumed(s3_hook):
+    land_pages(s3_hook, "2025-11-01", 2)
+
+    state = reconcile_landing(s3_hook, BUCKET, "2025-11-01", {**REQUEST, "projection": "full"})
+
+    assert state["last_saved_page"] == 0
+    assert state["landing_files"] == []
+
+
+def test_sibling_shards_and_legacy_files_survive(s3_hook):
+    shard_keys = land_pages(s3_hook, "2025-11-01/2024-01-01_to_max", 2)
+    legacy_key = "2025-11-01/1.parquet"
+    s3_hook.load_bytes(b"PAR1", legacy_key, BUCKET)
+    own_keys = land_pages(s3_hook, "2025-11-01", 2)
+    # an own file without a sidecar is stale
+    s3_hook.load_bytes(b"PAR1", "2025-11-01/pages-000009.parquet", BUCKET)
+
+    state = reconcile_landing(s3_hook, BUCKET, "2025-11-01", REQUEST)
+
+    assert state["last_saved_page"] == 2
+    remaining = keys_under(s3_hook, "2025-11-01/")
+    assert "2025-11-01/pages-000009.parquet" not in remaining
+    for key in shard_keys + own_keys:
+        assert {key, sidecar_key(key)} <= remaining
+    assert legacy_key in remaining
+
+
+@pytest.mark.parametrize("verify_checksums", [True, False])
+def test_shard_prefix_ignores_parent_files(s3_hook, verify_checksums):
+    land_pages(s3_hook, "2025-11-01", 2)
+    shard = "2025-11-01/min_to_2023-12-31"
+
+    state = reconcile_landing(s3_hook, BUCKET, shard, REQUEST, verify_checksums=verify_checksums)
+
+    assert state["last_saved_page"] == 0
+    assert len(keys_under(s3_hook, "2025-11-01/_landing/")) == 2
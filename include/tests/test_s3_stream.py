@@ -0,0 +1,87 @@
+import hashlib
+import os
+
+import pytest
+
+from include.etl.extraction.s3_stream import MIN_PART_SIZE, S3MultipartWriter
+from include.tests.conftest import BUCKET
+
+
+def body(size: int) -> bytes:
+    return os.urandom(1024) * (size // 1024) + os.urandom(size % 1024)
+
+
+def stored(client, key):
+    return client.get_object(Bucket=BUCKET, Key=key)["Body"].read()
+
+
+def pending_uploads(client):
+    return client.list_multipart_uploads(Bucket=BUCKET).get("Uploads", [])
+
+
+def test_small_object_is_a_single_put(s3_hook, monkeypatch):
+    client = s3_hook.get_conn()
+    monkeypatch.setattr(
+        client, "create_multipart_upload", lambda **_: pytest.fail("small object went multipart")
+    )
+    data = body(1000)
+
+    with S3MultipartWriter(client, BUCKET, "small.parquet") as writer:
+        writer.write(data)
+
+    assert stored(client, "small.parquet") == data
+    assert writer.stats["parts"] == 1
+    assert writer.stats["sha256"] == hashlib.sha256(data).hexdigest()
+
+
+def test_multipart_upload_reassembles_the_stream(s3_hook):
+    client = s3_hook.get_conn()
+    data = body(2 * MIN_PART_SIZE + 12345)
+
+    writer = S3MultipartWriter(client, BUCKET, "large.parquet", part_size=MIN_PART_SIZE, max_in_flight=1)
+    # a part is cut once the buffer fills: after the 5th and 10th MiB, then the tail on close
+    for start in range(0, len(data), 1024 * 1024):
+        writer.write(data[start:start + 1024 * 1024])
+    assert writer.tell() == len(data)
+    writer.close()
+
+    assert stored(client, "large.parquet") == data
+    assert writer.stats["bytes"] == len(data)
+    assert writer.stats["parts"] == 3
+    assert writer.stats["sha256"] == hashlib.sha256(data).hexdigest()
+    assert pending_uploads(client) == []
+
+
+def test_part_size_is_raised_to_the_s3_minimum(s3_hook):
+    writer = S3MultipartWriter(s3_hook.get_conn(), BUCKET, "k", part_size=1024, max_in_flight=0)
+    assert (writer.part_size, writer.max_in_flight) == (MIN_PART_SIZE, 1)
+    writer.abort()
+
+
+def test_abort_leaves_no_object_or_parts(s3_hook):
+    client = s3_hook.get_conn()
+    writer = S3MultipartWriter(client, BUCKET, "aborted.parquet", part_size=MIN_PART_SIZE)
+    writer.write(body(MIN_PART_SIZE + 1))
+    writer.abort()
+
+    assert writer.closed
+    assert "Contents" not in client.list_objects_v2(Bucket=BUCKET)
+    assert pending_uploads(client) == []
+    with pytest.raises(ValueError):
+        writer.write(b"x")
+
+
+def test_failed_part_aborts_the_upload(s3_hook, monkeypatch):
+    client = s3_hook.get_conn()
+
+    def fail(**_):
+        raise ConnectionError("part lost")
+
+    monkeypatch.setattr(client, "upload_part", fail)
+    writer = S3MultipartWriter(client, BUCKET, "failed.parquet", part_size=MIN_PART_SIZE)
+    writer.write(body(MIN_PART_SIZE))
+
+    with pytest.raises(ConnectionError):
+        writer.close()
+    assert writer.closed
+    assert pending_uploads(client) == []
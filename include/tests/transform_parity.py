@@ -0,0 +1,82 @@
+import math
+import sys
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from include.etl.transformation.transformation import Transformer
+
+
+def compare_nested_entities(data_loc: str, context: Dict | None = None) -> Dict[str, str | None]:
+    """
+    Check the columnar engine against the per-row extract_* methods on one landing file.
+
+    Both engines are run on the same file and deduplicated the same way, then every table is
+    compared row by row, in order.
+
+    Args:
+        data_loc: Landing Parquet file
+        context: Task context for the Transformer (a stub is used by default)
+
+    Returns:
+        Dict of table name -> None if the tables match, else a description of the first
+        difference
+    """
+    transformer = Transformer(context or {"ds": None}, s3_dest_hook=object())
+    # the per-row methods only produce hex keys, and emit every dimension row of the file
+    transformer.key_format = "hex"
+    transformer.key_cache = None
+    transformer.key_index = None
+
+    studies = pq.read_table(data_loc, columns=["studies"]).column("studies")
+    per_row = transformer.dedupe_tables(
+        transformer.extract_nested_per_row(pd.json_normalize(studies.to_pandas()))
+    )
+    columnar = transformer.dedupe_tables(transformer.extract_nested_columnar(studies))
+
+    return {name: _compare(name, per_row[name], columnar[name]) for name in per_row}
+
+
+def _compare(name: str, expected: pd.DataFrame, actual: pd.DataFrame) -> str | None:
+    if expected.empty and actual.empty:
+        return None
+    if len(expected) != len(actual):
+        return f"{len(actual)} rows, expected {len(expected)}"
+
+    expected_rows = _records(expected)
+    actual_rows = _records(actual)
+
+    for i, (e, a) in enumerate(zip(expected_rows, actual_rows)):
+        if e != a:
+            return f"row {i}: {a}, expected {e}"
+    return None
+
+
+def _records(df: pd.DataFrame) -> List[Dict]:
+    return [{k: _plain(v) for k, v in row.items()} for row in df.to_dict("records")]
+
+
+def _plain(value):
+    """Normalize pandas/numpy containers and missing values for comparison."""
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value
+
+
+if __name__ == "__main__":
+    failed = False
+    for path in sys.argv[1:]:
+        for table, problem in compare_nested_entities(path).items():
+            print(f"{path} {table}: {problem or 'ok'}")
+            failed = failed or problem is not None
+    sys.exit(1 if failed else 0)